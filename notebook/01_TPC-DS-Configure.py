@@ -70,6 +70,34 @@ dbutils.fs.mkdirs("dbfs:/databricks/scripts")
 
 # COMMAND ----------
 
+# DBTITLE 1,Option A (recommended): build dsdgen once
+# MAGIC %md
+# MAGIC The script below compiles tpcds-kit on every node at every cluster start, which adds minutes to startup and to each scale-up event.
+# MAGIC <br>Instead, you can compile dsdgen once on this cluster's driver and save the binary and `tpcds.idx` as an artifact in DBFS. The init script written next to it only copies the artifact, checks its sha256 and installs it to `/usr/local/bin/tpcds-kit/tools`.
+# MAGIC <br>If you use option A, skip the next `dbutils.fs.put` cell and continue with step 3.
+
+# COMMAND ----------
+
+# MAGIC %sh
+# MAGIC # Builds dsdgen and writes dsdgen-<hash>.tar.gz and tpcds-install-<hash>.sh to the artifact folder.
+# MAGIC # For a faster dsdgen, run it as DSDGEN_BUILD=pgo bash ... and compare the build with the stock one using scripts/bench_dsdgen_builds.py first.
+# MAGIC bash ../scripts/build_dsdgen.sh /dbfs/databricks/artifacts/tpcds-kit
+
+# COMMAND ----------
+
+# Save the init script of the newest artifact as tpcds-install.sh.
+artifact_dir = "dbfs:/databricks/artifacts/tpcds-kit"
+artifact_hash = dbutils.fs.head(f"{artifact_dir}/LATEST").strip()
+dbutils.fs.put("/databricks/scripts/tpcds-install.sh", dbutils.fs.head(f"{artifact_dir}/tpcds-install-{artifact_hash}.sh"), True)
+print(dbutils.fs.head("/databricks/scripts/tpcds-install.sh"))
+
+# COMMAND ----------
+
+# MAGIC %md
+# MAGIC Option B: compile tpcds-kit on every node.
+
+# COMMAND ----------
+
 # Save a shell script to DBFS that installs dependencies and builds the TPC-DS toolkit from source.
 
 dbutils.fs.put("/databricks/scripts/tpcds-install.sh","""
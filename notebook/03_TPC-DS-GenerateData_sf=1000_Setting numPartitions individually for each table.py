@@ -4,432 +4,108 @@
 # MAGIC Generating data at larger scales can take hours to run, and you may want to run the notebook as a job.
 # MAGIC
 # MAGIC The cell below generates the data. Read the code carefully, as it contains many parameters to control the process. See the <a href="https://github.com/databricks/spark-sql-perf" target="_blank">Databricks spark-sql-perf repository README</a> for more information.
-
-# COMMAND ----------
-
-# MAGIC
-# MAGIC %scala
-# MAGIC import com.databricks.spark.sql.perf.tpcds.TPCDSTables
-# MAGIC
-# MAGIC // Set:
-# MAGIC val scaleFactor = "1000" // scaleFactor defines the size of the dataset to generate (in GB).
-# MAGIC val scaleFactoryInt = scaleFactor.toInt
-# MAGIC
-# MAGIC val scaleName = if(scaleFactoryInt < 1000){
-# MAGIC     f"${scaleFactoryInt}%03d" + "GB"
-# MAGIC   } else {
-# MAGIC     f"${scaleFactoryInt / 1000}%03d" + "TB"
-# MAGIC   }
-# MAGIC
-# MAGIC val fileFormat = "parquet" // valid spark file format like parquet, csv, json.
-# MAGIC val rootDir = s"/mnt/datalake/raw/tpc-ds/source_files_${scaleName}_${fileFormat}"
-# MAGIC val databaseName = "tpcds" + scaleName // name of database to create.
 # MAGIC
-# MAGIC // Run:
-# MAGIC val tables = new TPCDSTables(sqlContext,
-# MAGIC     dsdgenDir = "/usr/local/bin/tpcds-kit/tools", // location of dsdgen 
-# MAGIC     scaleFactor = scaleFactor,
-# MAGIC     useDoubleForDecimal = false, // true to replace DecimalType with DoubleType 
-# MAGIC     useStringForDate = false) // true to replace DateType with StringType
+# MAGIC All 24 tables are generated in a single run: `TPCDSTables` is built once and `genData` is called for each table with its own `numPartitions`.
+# MAGIC To change the number of files for a table, edit its entry in `num_partitions`.
 # MAGIC
-# MAGIC tables.genData(
-# MAGIC     location = rootDir,
-# MAGIC     format = fileFormat,
-# MAGIC     overwrite = true, // overwrite the data that is already there
-# MAGIC     partitionTables = false, // create the partitioned fact tables 
-# MAGIC     clusterByPartitionColumns = false, // shuffle to get partitions coalesced into single files. 
-# MAGIC     filterOutNullPartitionValues = false, // true to filter out the partition with NULL key value
-# MAGIC     tableFilter = "", // "" means generate all tables
-# MAGIC     numPartitions = 1000) // how many dsdgen partitions to run - number of input tasks.
+# MAGIC Several tables are generated at the same time so that small tables fill the cores a large table leaves idle. This relies on `spark.scheduler.mode FAIR`, which is the default on Databricks.
 
 # COMMAND ----------
 
-# DBTITLE 1,View TPC-DS data
-# examine data
-df = spark.read.parquet("/mnt/datalake/raw/tpc-ds/source_files_001TB_parquet/customer")
+# DBTITLE 1,Make the tpcds_datagen package importable
+import os
+import sys
 
-display(df)
+# tpcds_datagen lives at the root of this repo, one level above the notebook folder.
+sys.path.append(os.path.abspath(".."))
 
 # COMMAND ----------
 
-# MAGIC %md
-# MAGIC
-# MAGIC ###Sample Results
-# MAGIC Below are a few sample results from generating data at the 1 and 1000 scale.
-# MAGIC
-# MAGIC | File Format | Generate Column Stats | Number of dsdgen Tasks | Partition Tables | TPC-DS Scale | Databricks Cluster Config               | Duration | Storage Size |
-# MAGIC | ----------- | --------------------- | ---------------------- | ---------------- | ------------ | --------------------------------------- | -------- | ------------ |
-# MAGIC | csv | no | 4 | no | 1 | 1 Standard_DS3_v2 worker, 4 total cores | 4.79 min | 1.2 GB |
-# MAGIC | parquet     | yes                   | 4                      | no               | 1            | 1 Standard_DS3_v2 worker, 4 total cores  | 5.88 min | 347 MB |
-# MAGIC | json | no | 4 | no | 1 | 1 Standard_DS3_v2 worker, 4 total cores | 7.35 min | 5.15 GB |
-# MAGIC | parquet | yes | 1000 | yes | 1000 | 4 Standard_DS3_v2 worker, 16 total cores | 4 hours | 333 GB |
+# DBTITLE 1,Generate all tables
+from tpcds_datagen import ConcurrentGenerator, GenerationDriver, GenerationOptions, NUM_PARTITIONS_SF1000, ProgressMonitor, pair_sales_returns, scale_name, table_specs
+
+# Set:
+scale_factor = 1000 # scaleFactor defines the size of the dataset to generate (in GB).
+file_format = "parquet" # valid spark file format like parquet, delta, csv, json (the chunks engine writes parquet or delta).
+
+# numPartitions for each table, tuned so that each Parquet file is approximately 500MB.
+num_partitions = dict(NUM_PARTITIONS_SF1000)
+
+options = GenerationOptions(
+    scale_factor = scale_factor,
+    dsdgen_dir = "/usr/local/bin/tpcds-kit/tools", # location of dsdgen
+    use_double_for_decimal = False, # true to replace DecimalType with DoubleType
+    use_string_for_date = False, # true to replace DateType with StringType
+    overwrite = True, # overwrite the data that is already there
+    partition_tables = False, # create the partitioned fact tables
+    cluster_by_partition_columns = False, # shuffle to get partitions coalesced into single files.
+    filter_out_null_partition_values = False, # true to filter out the partition with NULL key value
+    engine = "chunks", # "chunks" writes one Parquet file per dsdgen chunk and logs each finished chunk; "gendata" calls genData (needed for csv/json)
+    resume = False, # true to continue an interrupted run: keep the chunks it committed and generate only the missing ones
+    chunks_per_task = 1, # dsdgen chunks each task generates one after another; fewer, longer tasks when numPartitions is in the thousands
+    split_stragglers = True, # split chunks that run far longer than the rest of their table into finer dsdgen chunks on idle cores (same rows)
+    writer_profiles = {}, # per-table Parquet codec, row group, page and dictionary settings, e.g. tuned_writer_profiles() from tpcds_datagen (zstd fact tables)
+    cluster_by = {}, # e.g. {"store_sales": "ss_sold_date_sk"} to range-cluster its files by that key (sorted files, disjoint ranges per task); such tables are not paired
+    profile = False, # true to also measure CPU time per stage; a summary of the stage that bounds each table is printed at the end
+    profile_chunks = ()) # e.g. (("store_sales", 1),) to save flame-graph stacks of that chunk under /mnt/datalake/raw/tpc-ds/_profiles
+
+# Run:
+specs = table_specs(num_partitions, scale_factor, file_format) # writes to /mnt/datalake/raw/tpc-ds/source_files_${scaleName}_${fileFormat}/<table>
+paired_sales_returns = True # write store/catalog/web returns from the same dsdgen pass as their sales table (Parquet or Delta only)
+if paired_sales_returns:
+    specs = pair_sales_returns(specs, exclude = options.clustered_tables)
+max_jobs = 8 # tables generated at the same time, each in its own FAIR scheduler pool
+metrics_path = f"/dbfs/mnt/datalake/raw/tpc-ds/_metrics/{scale_name(scale_factor)}_{file_format}" # chunk metrics are saved here as .json and .csv
+os.makedirs(os.path.dirname(metrics_path), exist_ok = True)
+with ProgressMonitor(specs, scale_factor, interval = 60, metrics_path = metrics_path): # progress and ETA every minute (chunks engine)
+    results = ConcurrentGenerator(GenerationDriver(spark, options), max_jobs = max_jobs).run(specs)
 
 # COMMAND ----------
 
-# MAGIC %md
-# MAGIC # 以下のテーブルについてはファイル数を指定して生成
-
-# COMMAND ----------
+# DBTITLE 1,Report file sizes and compact small tables
+from tpcds_datagen import compact_dataset, dataset_root, describe_file_sizes, file_size_report
 
-# MAGIC %scala
-# MAGIC
-# MAGIC import com.databricks.spark.sql.perf.tpcds.TPCDSTables
-# MAGIC
-# MAGIC // Set:
-# MAGIC val scaleFactor = "1000" // scaleFactor defines the size of the dataset to generate (in GB).
-# MAGIC val scaleFactoryInt = scaleFactor.toInt
-# MAGIC
-# MAGIC val scaleName = if(scaleFactoryInt < 1000){
-# MAGIC     f"${scaleFactoryInt}%03d" + "GB"
-# MAGIC   } else {
-# MAGIC     f"${scaleFactoryInt / 1000}%03d" + "TB"
-# MAGIC   }
-# MAGIC
-# MAGIC val fileFormat = "parquet" // valid spark file format like parquet, csv, json.
-# MAGIC val tableName = "store_sales"
-# MAGIC val rootDir = s"/mnt/datalake/raw/tpc-ds/source_files_${scaleName}_${fileFormat}/${tableName}"
-# MAGIC val databaseName = "tpcds" + scaleName // name of database to create.
-# MAGIC
-# MAGIC // Run:
-# MAGIC val tables = new TPCDSTables(sqlContext,
-# MAGIC     dsdgenDir = "/usr/local/bin/tpcds-kit/tools", // location of dsdgen 
-# MAGIC     scaleFactor = scaleFactor,
-# MAGIC     useDoubleForDecimal = false, // true to replace DecimalType with DoubleType 
-# MAGIC     useStringForDate = false) // true to replace DateType with StringType
-# MAGIC
-# MAGIC // Generate data
-# MAGIC tables.genData(
-# MAGIC     location = rootDir,
-# MAGIC     format = fileFormat,
-# MAGIC     overwrite = true, // overwrite the data that is already there
-# MAGIC     partitionTables = false, // create the partitioned fact tables 
-# MAGIC     clusterByPartitionColumns = false, // shuffle to get partitions coalesced into single files. 
-# MAGIC     filterOutNullPartitionValues = false, // true to filter out the partition with NULL key value
-# MAGIC     tableFilter = tableName, // "" means generate all tables
-# MAGIC     numPartitions = 250) // how many dsdgen partitions to run - number of input tasks.
-# MAGIC
-
-# COMMAND ----------
-
-# MAGIC %scala
-# MAGIC
-# MAGIC import com.databricks.spark.sql.perf.tpcds.TPCDSTables
-# MAGIC
-# MAGIC // Set:
-# MAGIC val scaleFactor = "1000" // scaleFactor defines the size of the dataset to generate (in GB).
-# MAGIC val scaleFactoryInt = scaleFactor.toInt
-# MAGIC
-# MAGIC val scaleName = if(scaleFactoryInt < 1000){
-# MAGIC     f"${scaleFactoryInt}%03d" + "GB"
-# MAGIC   } else {
-# MAGIC     f"${scaleFactoryInt / 1000}%03d" + "TB"
-# MAGIC   }
-# MAGIC
-# MAGIC val fileFormat = "parquet" // valid spark file format like parquet, csv, json.
-# MAGIC val tableName = "catalog_returns"
-# MAGIC val rootDir = s"/mnt/datalake/raw/tpc-ds/source_files_${scaleName}_${fileFormat}/${tableName}"
-# MAGIC val databaseName = "tpcds" + scaleName // name of database to create.
-# MAGIC
-# MAGIC // Run:
-# MAGIC val tables = new TPCDSTables(sqlContext,
-# MAGIC     dsdgenDir = "/usr/local/bin/tpcds-kit/tools", // location of dsdgen 
-# MAGIC     scaleFactor = scaleFactor,
-# MAGIC     useDoubleForDecimal = false, // true to replace DecimalType with DoubleType 
-# MAGIC     useStringForDate = false) // true to replace DateType with StringType
-# MAGIC
-# MAGIC // Generate data
-# MAGIC tables.genData(
-# MAGIC     location = rootDir,
-# MAGIC     format = fileFormat,
-# MAGIC     overwrite = true, // overwrite the data that is already there
-# MAGIC     partitionTables = false, // create the partitioned fact tables 
-# MAGIC     clusterByPartitionColumns = false, // shuffle to get partitions coalesced into single files. 
-# MAGIC     filterOutNullPartitionValues = false, // true to filter out the partition with NULL key value
-# MAGIC     tableFilter = tableName, // "" means generate all tables
-# MAGIC     numPartitions = 20) // how many dsdgen partitions to run - number of input tasks.
-# MAGIC
-
-# COMMAND ----------
-
-# MAGIC %scala
-# MAGIC
-# MAGIC import com.databricks.spark.sql.perf.tpcds.TPCDSTables
-# MAGIC
-# MAGIC // Set:
-# MAGIC val scaleFactor = "1000" // scaleFactor defines the size of the dataset to generate (in GB).
-# MAGIC val scaleFactoryInt = scaleFactor.toInt
-# MAGIC
-# MAGIC val scaleName = if(scaleFactoryInt < 1000){
-# MAGIC     f"${scaleFactoryInt}%03d" + "GB"
-# MAGIC   } else {
-# MAGIC     f"${scaleFactoryInt / 1000}%03d" + "TB"
-# MAGIC   }
-# MAGIC
-# MAGIC val fileFormat = "parquet" // valid spark file format like parquet, csv, json.
-# MAGIC val tableName = "catalog_sales"
-# MAGIC val rootDir = s"/mnt/datalake/raw/tpc-ds/source_files_${scaleName}_${fileFormat}/${tableName}"
-# MAGIC val databaseName = "tpcds" + scaleName // name of database to create.
-# MAGIC
-# MAGIC // Run:
-# MAGIC val tables = new TPCDSTables(sqlContext,
-# MAGIC     dsdgenDir = "/usr/local/bin/tpcds-kit/tools", // location of dsdgen 
-# MAGIC     scaleFactor = scaleFactor,
-# MAGIC     useDoubleForDecimal = false, // true to replace DecimalType with DoubleType 
-# MAGIC     useStringForDate = false) // true to replace DateType with StringType
-# MAGIC
-# MAGIC // Generate data
-# MAGIC tables.genData(
-# MAGIC     location = rootDir,
-# MAGIC     format = fileFormat,
-# MAGIC     overwrite = true, // overwrite the data that is already there
-# MAGIC     partitionTables = false, // create the partitioned fact tables 
-# MAGIC     clusterByPartitionColumns = false, // shuffle to get partitions coalesced into single files. 
-# MAGIC     filterOutNullPartitionValues = false, // true to filter out the partition with NULL key value
-# MAGIC     tableFilter = tableName, // "" means generate all tables
-# MAGIC     numPartitions = 200) // how many dsdgen partitions to run - number of input tasks.
-# MAGIC
-
-# COMMAND ----------
-
-# MAGIC %scala
-# MAGIC
-# MAGIC import com.databricks.spark.sql.perf.tpcds.TPCDSTables
-# MAGIC
-# MAGIC // Set:
-# MAGIC val scaleFactor = "1000" // scaleFactor defines the size of the dataset to generate (in GB).
-# MAGIC val scaleFactoryInt = scaleFactor.toInt
-# MAGIC
-# MAGIC val scaleName = if(scaleFactoryInt < 1000){
-# MAGIC     f"${scaleFactoryInt}%03d" + "GB"
-# MAGIC   } else {
-# MAGIC     f"${scaleFactoryInt / 1000}%03d" + "TB"
-# MAGIC   }
-# MAGIC
-# MAGIC val fileFormat = "parquet" // valid spark file format like parquet, csv, json.
-# MAGIC val tableName = "customer_address"
-# MAGIC val rootDir = s"/mnt/datalake/raw/tpc-ds/source_files_${scaleName}_${fileFormat}/${tableName}"
-# MAGIC val databaseName = "tpcds" + scaleName // name of database to create.
-# MAGIC
-# MAGIC // Run:
-# MAGIC val tables = new TPCDSTables(sqlContext,
-# MAGIC     dsdgenDir = "/usr/local/bin/tpcds-kit/tools", // location of dsdgen 
-# MAGIC     scaleFactor = scaleFactor,
-# MAGIC     useDoubleForDecimal = false, // true to replace DecimalType with DoubleType 
-# MAGIC     useStringForDate = false) // true to replace DateType with StringType
-# MAGIC
-# MAGIC // Generate data
-# MAGIC tables.genData(
-# MAGIC     location = rootDir,
-# MAGIC     format = fileFormat,
-# MAGIC     overwrite = true, // overwrite the data that is already there
-# MAGIC     partitionTables = false, // create the partitioned fact tables 
-# MAGIC     clusterByPartitionColumns = false, // shuffle to get partitions coalesced into single files. 
-# MAGIC     filterOutNullPartitionValues = false, // true to filter out the partition with NULL key value
-# MAGIC     tableFilter = tableName, // "" means generate all tables
-# MAGIC     numPartitions = 1) // how many dsdgen partitions to run - number of input tasks.
-# MAGIC
+root_dir = dataset_root(scale_factor, file_format)
+target_file_bytes = 500 * 1024 * 1024 # the file size numPartitions aims for
+print(describe_file_sizes(file_size_report(root_dir, target_bytes = target_file_bytes)))
+compact_small_tables = True # rewrite tables whose files are far below the target into ~500MB files, keeping row order and row counts (Parquet or Delta only)
+if compact_small_tables and file_format in ("parquet", "delta"):
+    compact_dataset(root_dir, target_bytes = target_file_bytes, writer_profiles = options.writer_profiles) # same codec, row group and dictionary settings as the generated files
+    print(describe_file_sizes(file_size_report(root_dir, target_bytes = target_file_bytes)))
 
 # COMMAND ----------
 
-# MAGIC %scala
-# MAGIC
-# MAGIC import com.databricks.spark.sql.perf.tpcds.TPCDSTables
-# MAGIC
-# MAGIC // Set:
-# MAGIC val scaleFactor = "1000" // scaleFactor defines the size of the dataset to generate (in GB).
-# MAGIC val scaleFactoryInt = scaleFactor.toInt
-# MAGIC
-# MAGIC val scaleName = if(scaleFactoryInt < 1000){
-# MAGIC     f"${scaleFactoryInt}%03d" + "GB"
-# MAGIC   } else {
-# MAGIC     f"${scaleFactoryInt / 1000}%03d" + "TB"
-# MAGIC   }
-# MAGIC
-# MAGIC val fileFormat = "parquet" // valid spark file format like parquet, csv, json.
-# MAGIC val tableName = "customer_demographics"
-# MAGIC val rootDir = s"/mnt/datalake/raw/tpc-ds/source_files_${scaleName}_${fileFormat}/${tableName}"
-# MAGIC val databaseName = "tpcds" + scaleName // name of database to create.
-# MAGIC
-# MAGIC // Run:
-# MAGIC val tables = new TPCDSTables(sqlContext,
-# MAGIC     dsdgenDir = "/usr/local/bin/tpcds-kit/tools", // location of dsdgen 
-# MAGIC     scaleFactor = scaleFactor,
-# MAGIC     useDoubleForDecimal = false, // true to replace DecimalType with DoubleType 
-# MAGIC     useStringForDate = false) // true to replace DateType with StringType
-# MAGIC
-# MAGIC // Generate data
-# MAGIC tables.genData(
-# MAGIC     location = rootDir,
-# MAGIC     format = fileFormat,
-# MAGIC     overwrite = true, // overwrite the data that is already there
-# MAGIC     partitionTables = false, // create the partitioned fact tables 
-# MAGIC     clusterByPartitionColumns = false, // shuffle to get partitions coalesced into single files. 
-# MAGIC     filterOutNullPartitionValues = false, // true to filter out the partition with NULL key value
-# MAGIC     tableFilter = tableName, // "" means generate all tables
-# MAGIC     numPartitions = 1) // how many dsdgen partitions to run - number of input tasks.
-# MAGIC
+# DBTITLE 1,Validate row counts from the Parquet footers
+from tpcds_datagen import dataset_root, describe_validation, validate_dataset
 
-# COMMAND ----------
-
-# MAGIC %scala
-# MAGIC
-# MAGIC import com.databricks.spark.sql.perf.tpcds.TPCDSTables
-# MAGIC
-# MAGIC // Set:
-# MAGIC val scaleFactor = "1000" // scaleFactor defines the size of the dataset to generate (in GB).
-# MAGIC val scaleFactoryInt = scaleFactor.toInt
-# MAGIC
-# MAGIC val scaleName = if(scaleFactoryInt < 1000){
-# MAGIC     f"${scaleFactoryInt}%03d" + "GB"
-# MAGIC   } else {
-# MAGIC     f"${scaleFactoryInt / 1000}%03d" + "TB"
-# MAGIC   }
-# MAGIC
-# MAGIC val fileFormat = "parquet" // valid spark file format like parquet, csv, json.
-# MAGIC val tableName = "inventory"
-# MAGIC val rootDir = s"/mnt/datalake/raw/tpc-ds/source_files_${scaleName}_${fileFormat}/${tableName}"
-# MAGIC val databaseName = "tpcds" + scaleName // name of database to create.
-# MAGIC
-# MAGIC // Run:
-# MAGIC val tables = new TPCDSTables(sqlContext,
-# MAGIC     dsdgenDir = "/usr/local/bin/tpcds-kit/tools", // location of dsdgen 
-# MAGIC     scaleFactor = scaleFactor,
-# MAGIC     useDoubleForDecimal = false, // true to replace DecimalType with DoubleType 
-# MAGIC     useStringForDate = false) // true to replace DateType with StringType
-# MAGIC
-# MAGIC // Generate data
-# MAGIC tables.genData(
-# MAGIC     location = rootDir,
-# MAGIC     format = fileFormat,
-# MAGIC     overwrite = true, // overwrite the data that is already there
-# MAGIC     partitionTables = false, // create the partitioned fact tables 
-# MAGIC     clusterByPartitionColumns = false, // shuffle to get partitions coalesced into single files. 
-# MAGIC     filterOutNullPartitionValues = false, // true to filter out the partition with NULL key value
-# MAGIC     tableFilter = tableName, // "" means generate all tables
-# MAGIC     numPartitions = 6) // how many dsdgen partitions to run - number of input tasks.
-# MAGIC
+if file_format in ("parquet", "delta"):
+    validation = validate_dataset(dataset_root(scale_factor, file_format), scale_factor) # reads only the footers, in parallel
+    print(describe_validation(validation)) # expected counts are exact for fixed-size tables, approximate (1%) for sales/returns
+    assert all(v.ok for v in validation), "row counts differ from TPC-DS, or chunks are missing or duplicated"
 
 # COMMAND ----------
 
-# MAGIC %scala
-# MAGIC
-# MAGIC import com.databricks.spark.sql.perf.tpcds.TPCDSTables
-# MAGIC
-# MAGIC // Set:
-# MAGIC val scaleFactor = "1000" // scaleFactor defines the size of the dataset to generate (in GB).
-# MAGIC val scaleFactoryInt = scaleFactor.toInt
-# MAGIC
-# MAGIC val scaleName = if(scaleFactoryInt < 1000){
-# MAGIC     f"${scaleFactoryInt}%03d" + "GB"
-# MAGIC   } else {
-# MAGIC     f"${scaleFactoryInt / 1000}%03d" + "TB"
-# MAGIC   }
-# MAGIC
-# MAGIC val fileFormat = "parquet" // valid spark file format like parquet, csv, json.
-# MAGIC val tableName = "store_returns"
-# MAGIC val rootDir = s"/mnt/datalake/raw/tpc-ds/source_files_${scaleName}_${fileFormat}/${tableName}"
-# MAGIC val databaseName = "tpcds" + scaleName // name of database to create.
-# MAGIC
-# MAGIC // Run:
-# MAGIC val tables = new TPCDSTables(sqlContext,
-# MAGIC     dsdgenDir = "/usr/local/bin/tpcds-kit/tools", // location of dsdgen 
-# MAGIC     scaleFactor = scaleFactor,
-# MAGIC     useDoubleForDecimal = false, // true to replace DecimalType with DoubleType 
-# MAGIC     useStringForDate = false) // true to replace DateType with StringType
-# MAGIC
-# MAGIC // Generate data
-# MAGIC tables.genData(
-# MAGIC     location = rootDir,
-# MAGIC     format = fileFormat,
-# MAGIC     overwrite = true, // overwrite the data that is already there
-# MAGIC     partitionTables = false, // create the partitioned fact tables 
-# MAGIC     clusterByPartitionColumns = false, // shuffle to get partitions coalesced into single files. 
-# MAGIC     filterOutNullPartitionValues = false, // true to filter out the partition with NULL key value
-# MAGIC     tableFilter = tableName, // "" means generate all tables
-# MAGIC     numPartitions = 32) // how many dsdgen partitions to run - number of input tasks.
-# MAGIC
+# DBTITLE 1,Register the tables with statistics from the footers
+from tpcds_datagen import database_name, dataset_root, describe_statistics, register_dataset
 
-# COMMAND ----------
-
-# MAGIC %scala
-# MAGIC
-# MAGIC import com.databricks.spark.sql.perf.tpcds.TPCDSTables
-# MAGIC
-# MAGIC // Set:
-# MAGIC val scaleFactor = "1000" // scaleFactor defines the size of the dataset to generate (in GB).
-# MAGIC val scaleFactoryInt = scaleFactor.toInt
-# MAGIC
-# MAGIC val scaleName = if(scaleFactoryInt < 1000){
-# MAGIC     f"${scaleFactoryInt}%03d" + "GB"
-# MAGIC   } else {
-# MAGIC     f"${scaleFactoryInt / 1000}%03d" + "TB"
-# MAGIC   }
-# MAGIC
-# MAGIC val fileFormat = "parquet" // valid spark file format like parquet, csv, json.
-# MAGIC val tableName = "web_returns"
-# MAGIC val rootDir = s"/mnt/datalake/raw/tpc-ds/source_files_${scaleName}_${fileFormat}/${tableName}"
-# MAGIC val databaseName = "tpcds" + scaleName // name of database to create.
-# MAGIC
-# MAGIC // Run:
-# MAGIC val tables = new TPCDSTables(sqlContext,
-# MAGIC     dsdgenDir = "/usr/local/bin/tpcds-kit/tools", // location of dsdgen 
-# MAGIC     scaleFactor = scaleFactor,
-# MAGIC     useDoubleForDecimal = false, // true to replace DecimalType with DoubleType 
-# MAGIC     useStringForDate = false) // true to replace DateType with StringType
-# MAGIC
-# MAGIC // Generate data
-# MAGIC tables.genData(
-# MAGIC     location = rootDir,
-# MAGIC     format = fileFormat,
-# MAGIC     overwrite = true, // overwrite the data that is already there
-# MAGIC     partitionTables = false, // create the partitioned fact tables 
-# MAGIC     clusterByPartitionColumns = false, // shuffle to get partitions coalesced into single files. 
-# MAGIC     filterOutNullPartitionValues = false, // true to filter out the partition with NULL key value
-# MAGIC     tableFilter = tableName, // "" means generate all tables
-# MAGIC     numPartitions = 12) // how many dsdgen partitions to run - number of input tasks.
-# MAGIC
+register_tables = True # create database tpcds${scaleName} and an external table over each generated table, with row counts, min/max and null counts set from the Parquet footers instead of ANALYZE TABLE scans
+if register_tables and file_format in ("parquet", "delta"):
+    statistics = register_dataset(spark, dataset_root(scale_factor, file_format), database_name(scale_factor), file_format)
+    print(describe_statistics(statistics))
 
 # COMMAND ----------
 
-# MAGIC %scala
-# MAGIC
-# MAGIC import com.databricks.spark.sql.perf.tpcds.TPCDSTables
-# MAGIC
-# MAGIC // Set:
-# MAGIC val scaleFactor = "1000" // scaleFactor defines the size of the dataset to generate (in GB).
-# MAGIC val scaleFactoryInt = scaleFactor.toInt
-# MAGIC
-# MAGIC val scaleName = if(scaleFactoryInt < 1000){
-# MAGIC     f"${scaleFactoryInt}%03d" + "GB"
-# MAGIC   } else {
-# MAGIC     f"${scaleFactoryInt / 1000}%03d" + "TB"
-# MAGIC   }
-# MAGIC
-# MAGIC val fileFormat = "parquet" // valid spark file format like parquet, csv, json.
-# MAGIC val tableName = "web_sales"
-# MAGIC val rootDir = s"/mnt/datalake/raw/tpc-ds/source_files_${scaleName}_${fileFormat}/${tableName}"
-# MAGIC val databaseName = "tpcds" + scaleName // name of database to create.
+# MAGIC %md
 # MAGIC
-# MAGIC // Run:
-# MAGIC val tables = new TPCDSTables(sqlContext,
-# MAGIC     dsdgenDir = "/usr/local/bin/tpcds-kit/tools", // location of dsdgen 
-# MAGIC     scaleFactor = scaleFactor,
-# MAGIC     useDoubleForDecimal = false, // true to replace DecimalType with DoubleType 
-# MAGIC     useStringForDate = false) // true to replace DateType with StringType
+# MAGIC ###Sample Results
+# MAGIC Below are a few sample results from generating data at the 1 and 1000 scale.
 # MAGIC
-# MAGIC // Generate data
-# MAGIC tables.genData(
-# MAGIC     location = rootDir,
-# MAGIC     format = fileFormat,
-# MAGIC     overwrite = true, // overwrite the data that is already there
-# MAGIC     partitionTables = false, // create the partitioned fact tables 
-# MAGIC     clusterByPartitionColumns = false, // shuffle to get partitions coalesced into single files. 
-# MAGIC     filterOutNullPartitionValues = false, // true to filter out the partition with NULL key value
-# MAGIC     tableFilter = tableName, // "" means generate all tables
-# MAGIC     numPartitions = 90) // how many dsdgen partitions to run - number of input tasks.
+# MAGIC | File Format | Generate Column Stats | Number of dsdgen Tasks | Partition Tables | TPC-DS Scale | Databricks Cluster Config               | Duration | Storage Size |
+# MAGIC | ----------- | --------------------- | ---------------------- | ---------------- | ------------ | --------------------------------------- | -------- | ------------ |
+# MAGIC | csv | no | 4 | no | 1 | 1 Standard_DS3_v2 worker, 4 total cores | 4.79 min | 1.2 GB |
+# MAGIC | parquet     | yes                   | 4                      | no               | 1            | 1 Standard_DS3_v2 worker, 4 total cores  | 5.88 min | 347 MB |
+# MAGIC | json | no | 4 | no | 1 | 1 Standard_DS3_v2 worker, 4 total cores | 7.35 min | 5.15 GB |
+# MAGIC | parquet | yes | 1000 | yes | 1000 | 4 Standard_DS3_v2 worker, 16 total cores | 4 hours | 333 GB |
 # MAGIC
+# MAGIC To add your own rows, run the 06 notebook (or `scripts/run_benchmarks.py` on one machine); it records each configuration and renders this table.
 
-# COMMAND ----------
-
-# MAGIC %md
-# MAGIC # 
\ No newline at end of file
@@ -0,0 +1,106 @@
+# Databricks notebook source
+# DBTITLE 1,Generate TPC-DS data
+# MAGIC %md
+# MAGIC This notebook generates all 24 tables like the 03 notebooks, but `numPartitions` is not tuned by hand.
+# MAGIC
+# MAGIC Each table's size is estimated from the TPC-DS row count at the chosen scale factor and a bytes-per-row figure, and `numPartitions` is chosen so that each file is approximately `target_file_mb`.
+# MAGIC Review the plan printed by the next cell before starting the run.
+# MAGIC
+# MAGIC Several tables are generated at the same time so that small tables fill the cores a large table leaves idle. This relies on `spark.scheduler.mode FAIR`, which is the default on Databricks.
+
+# COMMAND ----------
+
+# DBTITLE 1,Make the tpcds_datagen package importable
+import os
+import sys
+
+# tpcds_datagen lives at the root of this repo, one level above the notebook folder.
+sys.path.append(os.path.abspath(".."))
+
+# COMMAND ----------
+
+# DBTITLE 1,Plan numPartitions
+from tpcds_datagen import CalibrationProfile, describe_partition_plan, plan_num_partitions
+
+# Set:
+scale_factor = 10000 # scaleFactor defines the size of the dataset to generate (in GB).
+file_format = "parquet" # valid spark file format like parquet, delta, csv, json (the chunks engine writes parquet or delta).
+target_file_mb = 500 # approximate size of each generated file
+calibration_profile = "" # profile saved by the 05 notebook, "" to use the built-in bytes-per-row figures
+
+profile = CalibrationProfile.load(calibration_profile) if calibration_profile else None
+bytes_per_row = profile.bytes_per_row if profile else None
+num_partitions = plan_num_partitions(scale_factor, target_file_bytes = target_file_mb * 1024 * 1024, bytes_per_row = bytes_per_row)
+print(describe_partition_plan(num_partitions, scale_factor, bytes_per_row))
+
+# COMMAND ----------
+
+# DBTITLE 1,Generate all tables
+from tpcds_datagen import ConcurrentGenerator, GenerationDriver, GenerationOptions, ProgressMonitor, pair_sales_returns, scale_name, table_specs
+
+options = GenerationOptions(
+    scale_factor = scale_factor,
+    dsdgen_dir = "/usr/local/bin/tpcds-kit/tools", # location of dsdgen
+    use_double_for_decimal = False, # true to replace DecimalType with DoubleType
+    use_string_for_date = False, # true to replace DateType with StringType
+    overwrite = True, # overwrite the data that is already there
+    partition_tables = False, # create the partitioned fact tables
+    cluster_by_partition_columns = False, # shuffle to get partitions coalesced into single files.
+    filter_out_null_partition_values = False, # true to filter out the partition with NULL key value
+    engine = "chunks", # "chunks" writes one Parquet file per dsdgen chunk and logs each finished chunk; "gendata" calls genData (needed for csv/json)
+    resume = False, # true to continue an interrupted run: keep the chunks it committed and generate only the missing ones
+    chunks_per_task = 1, # dsdgen chunks each task generates one after another; fewer, longer tasks when numPartitions is in the thousands
+    split_stragglers = True, # split chunks that run far longer than the rest of their table into finer dsdgen chunks on idle cores (same rows)
+    writer_profiles = {}, # per-table Parquet codec, row group, page and dictionary settings, e.g. tuned_writer_profiles() from tpcds_datagen (zstd fact tables)
+    cluster_by = {}, # e.g. {"store_sales": "ss_sold_date_sk"} to range-cluster its files by that key (sorted files, disjoint ranges per task); such tables are not paired
+    profile = False, # true to also measure CPU time per stage; a summary of the stage that bounds each table is printed at the end
+    profile_chunks = ()) # e.g. (("store_sales", 1),) to save flame-graph stacks of that chunk under /mnt/datalake/raw/tpc-ds/_profiles
+
+# Run:
+specs = table_specs(num_partitions, scale_factor, file_format)
+paired_sales_returns = True # write store/catalog/web returns from the same dsdgen pass as their sales table (Parquet or Delta only)
+if paired_sales_returns:
+    specs = pair_sales_returns(specs, exclude = options.clustered_tables)
+max_jobs = 8 # tables generated at the same time, each in its own FAIR scheduler pool
+generator = ConcurrentGenerator(
+    GenerationDriver(spark, options),
+    max_jobs = max_jobs,
+    core_seconds_per_row = profile.core_seconds_per_row if profile else None, # used to start the longest tables first
+    bytes_per_row = bytes_per_row)
+metrics_path = f"/dbfs/mnt/datalake/raw/tpc-ds/_metrics/{scale_name(scale_factor)}_{file_format}" # chunk metrics are saved here as .json and .csv
+os.makedirs(os.path.dirname(metrics_path), exist_ok = True)
+with ProgressMonitor(specs, scale_factor, interval = 60, metrics_path = metrics_path): # progress and ETA every minute (chunks engine)
+    results = generator.run(specs) # prints the predicted makespan before starting
+
+# COMMAND ----------
+
+# DBTITLE 1,Report file sizes and compact small tables
+from tpcds_datagen import compact_dataset, dataset_root, describe_file_sizes, file_size_report
+
+root_dir = dataset_root(scale_factor, file_format)
+target_file_bytes = target_file_mb * 1024 * 1024 # the file size numPartitions aimed for
+print(describe_file_sizes(file_size_report(root_dir, target_bytes = target_file_bytes)))
+compact_small_tables = True # rewrite tables whose files are far below the target into target-size files, keeping row order and row counts (Parquet or Delta only)
+if compact_small_tables and file_format in ("parquet", "delta"):
+    compact_dataset(root_dir, target_bytes = target_file_bytes, writer_profiles = options.writer_profiles) # same codec, row group and dictionary settings as the generated files
+    print(describe_file_sizes(file_size_report(root_dir, target_bytes = target_file_bytes)))
+
+# COMMAND ----------
+
+# DBTITLE 1,Validate row counts from the Parquet footers
+from tpcds_datagen import dataset_root, describe_validation, validate_dataset
+
+if file_format in ("parquet", "delta"):
+    validation = validate_dataset(dataset_root(scale_factor, file_format), scale_factor) # reads only the footers, in parallel
+    print(describe_validation(validation)) # expected counts are exact for fixed-size tables, approximate (1%) for sales/returns
+    assert all(v.ok for v in validation), "row counts differ from TPC-DS, or chunks are missing or duplicated"
+
+# COMMAND ----------
+
+# DBTITLE 1,Register the tables with statistics from the footers
+from tpcds_datagen import database_name, dataset_root, describe_statistics, register_dataset
+
+register_tables = True # create database tpcds${scaleName} and an external table over each generated table, with row counts, min/max and null counts set from the Parquet footers instead of ANALYZE TABLE scans
+if register_tables and file_format in ("parquet", "delta"):
+    statistics = register_dataset(spark, dataset_root(scale_factor, file_format), database_name(scale_factor), file_format)
+    print(describe_statistics(statistics))
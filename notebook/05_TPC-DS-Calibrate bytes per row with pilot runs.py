@@ -0,0 +1,48 @@
+# Databricks notebook source
+# DBTITLE 1,Calibrate bytes per row
+# MAGIC %md
+# MAGIC The numPartitions planner needs to know how many bytes one row of each table takes once it is written.
+# MAGIC That figure changes with the file format, the compression codec, `useDoubleForDecimal` / `useStringForDate` and the dsdgen version.
+# MAGIC
+# MAGIC This notebook runs a cheap pilot: for each table it generates a few dsdgen child chunks at the target scale factor, writes them with the real settings and measures rows, bytes and time.
+# MAGIC The result is saved as a calibration profile that the 04 notebook can load.
+
+# COMMAND ----------
+
+# DBTITLE 1,Make the tpcds_datagen package importable
+import os
+import sys
+
+# tpcds_datagen lives at the root of this repo, one level above the notebook folder.
+sys.path.append(os.path.abspath(".."))
+
+# COMMAND ----------
+
+# DBTITLE 1,Run the pilot
+from tpcds_datagen import GenerationOptions, calibrate, scale_name
+
+# Set:
+scale_factor = 100000 # scaleFactor of the dataset you are going to generate (in GB).
+file_format = "parquet" # valid spark file format like parquet, csv, json.
+codec = "snappy" # compression codec of the writer, None for the Spark default
+pilot_chunks = 3 # dsdgen child chunks to generate per table
+
+options = GenerationOptions(
+    scale_factor = scale_factor,
+    dsdgen_dir = "/usr/local/bin/tpcds-kit/tools", # location of dsdgen
+    use_double_for_decimal = False, # true to replace DecimalType with DoubleType
+    use_string_for_date = False) # true to replace DateType with StringType
+
+calibration_dir = "/mnt/datalake/raw/tpc-ds/_calibration"
+scratch_dir = f"{calibration_dir}/scratch_{scale_name(scale_factor)}_{file_format}"
+
+profile = calibrate(spark, options, scratch_dir, file_format, codec, chunks = pilot_chunks)
+print(profile.describe())
+
+# COMMAND ----------
+
+# DBTITLE 1,Save the profile and remove the pilot output
+profile_path = f"/dbfs{calibration_dir}/{scale_name(scale_factor)}_{file_format}_{codec}.json"
+profile.save(profile_path)
+dbutils.fs.rm(scratch_dir, True)
+print(f"Saved {profile_path}")
@@ -0,0 +1,51 @@
+# Databricks notebook source
+# DBTITLE 1,Benchmark generation configurations
+# MAGIC %md
+# MAGIC This notebook generates the dataset once for every combination of the settings below and records wall time, rows, bytes and files per table.
+# MAGIC Each result is appended as one JSON line to `results_path`, and the "Sample Results" table of the 03 sf=1000 notebook is rendered from all results recorded so far.
+# MAGIC
+# MAGIC The same benchmark runs without a cluster on the local engine: `python scripts/run_benchmarks.py --help`.
+
+# COMMAND ----------
+
+# DBTITLE 1,Make the tpcds_datagen package importable
+import os
+import sys
+
+# tpcds_datagen lives at the root of this repo, one level above the notebook folder.
+sys.path.append(os.path.abspath(".."))
+
+# COMMAND ----------
+
+# DBTITLE 1,Run the benchmark matrix
+from tpcds_datagen import config_matrix, render_table_metrics, run_benchmark
+
+# Set:
+scale_factors = [1, 100] # scaleFactor values to generate (in GB).
+file_formats = ["parquet"] # valid spark file format like parquet, csv, json (csv/json need engine "gendata").
+num_partitions = [4, None] # dsdgen tasks for every table; None plans them per table for ~500MB files
+partition_tables = [False] # create the partitioned fact tables (on the chunks engine, written with one open file per task)
+codecs = ["snappy", "zstd"] # Parquet compression codecs
+column_stats = [False] # True to also register the tables with column statistics from the footers (in a benchmark_tpcds... database)
+engine = "chunks" # "chunks" or "gendata"
+cluster_config = "4 Standard_DS3_v2 worker, 16 total cores" # text for the Databricks Cluster Config column
+
+results_path = "/dbfs/mnt/datalake/raw/tpc-ds/_benchmark/results.jsonl"
+os.makedirs(os.path.dirname(results_path), exist_ok = True)
+
+configs = config_matrix(scale_factors, file_formats, num_partitions, partition_tables, codecs, engine, column_stats = column_stats)
+results = run_benchmark(
+    configs,
+    results_path,
+    base = "/mnt/datalake/raw/tpc-ds/_benchmark", # each configuration is generated here and removed afterwards
+    spark = spark,
+    environment = cluster_config)
+for result in results:
+    print(render_table_metrics(result))
+
+# COMMAND ----------
+
+# DBTITLE 1,Render the Sample Results table
+from tpcds_datagen import load_results, render_results
+
+print(render_results(load_results(results_path)))
@@ -0,0 +1,72 @@
+"""Measure the fixed cost per dsdgen child chunk at high numPartitions.
+
+Generates one table locally at several numPartitions, once with one chunk
+per task and once with ``--chunks-per-task`` chunks per task (the next
+dsdgen started while the current chunk is parsed). The total rows are the
+same at every numPartitions, so the extra time per extra chunk is the
+per-chunk overhead:
+
+    python scripts/bench_chunk_overhead.py --dsdgen-dir /usr/local/bin/tpcds-kit/tools \\
+        --table store_sales --scale-factor 10 --num-partitions 100 1000 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+# tpcds_datagen lives at the root of this repo, one level above the scripts folder.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from tpcds_datagen.dsdgen import dsdgen_command  # noqa: E402
+from tpcds_datagen.local import LocalGenerator  # noqa: E402
+from tpcds_datagen.spec import GenerationOptions, TableSpec  # noqa: E402
+
+
+def dsdgen_startup_seconds(dsdgen_dir: str, scale_factor: int, runs: int = 20) -> float:
+    """Wall time of a dsdgen process that prints almost nothing (income_band has 20 rows)."""
+    start = time.monotonic()
+    for _ in range(runs):
+        subprocess.run(dsdgen_command("income_band", scale_factor), cwd=dsdgen_dir, capture_output=True, check=True)
+    return (time.monotonic() - start) / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsdgen-dir", required=True)
+    parser.add_argument("--table", default="store_sales")
+    parser.add_argument("--scale-factor", type=int, default=1)
+    parser.add_argument("--num-partitions", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--chunks-per-task", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default="/tmp/tpcds-bench-overhead")
+    args = parser.parse_args()
+
+    print(f"dsdgen start-up: {dsdgen_startup_seconds(args.dsdgen_dir, args.scale_factor) * 1000:.1f} ms per process")
+    timings = {}
+    for chunks_per_task in sorted({1, args.chunks_per_task}):
+        for num_partitions in sorted(args.num_partitions):
+            options = GenerationOptions(
+                args.scale_factor, dsdgen_dir=args.dsdgen_dir, engine="chunks", chunks_per_task=chunks_per_task
+            )
+            spec = TableSpec(args.table, num_partitions, "parquet", args.out)
+            shutil.rmtree(args.out, ignore_errors=True)
+            start = time.monotonic()
+            LocalGenerator(options, args.workers).run([spec])
+            timings[chunks_per_task, num_partitions] = time.monotonic() - start
+    shutil.rmtree(args.out, ignore_errors=True)
+
+    lowest = min(args.num_partitions)
+    print(f"\n{'chunks/task':>11}{'numPartitions':>15}{'seconds':>10}{'overhead/chunk (core-ms)':>26}")
+    for (chunks_per_task, num_partitions), seconds in timings.items():
+        extra = num_partitions - lowest
+        overhead = (seconds - timings[chunks_per_task, lowest]) * args.workers / extra * 1000 if extra else 0.0
+        print(f"{chunks_per_task:>11}{num_partitions:>15}{seconds:>10.1f}{overhead:>26.1f}")
+
+
+if __name__ == "__main__":
+    main()
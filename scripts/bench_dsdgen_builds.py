@@ -0,0 +1,112 @@
+"""Compare dsdgen builds: rows per CPU-second per table, and byte-identical output.
+
+Each build is a directory holding ``dsdgen`` and ``tpcds.idx``, or a
+``dsdgen-<hash>.tar.gz`` written by build_dsdgen.sh. The first build is
+the baseline (normally the stock one). Every table is generated by every
+build with spark-sql-perf's arguments and the sha256 of the output is
+compared with the baseline's; the script exits with status 1 if any
+output differs:
+
+    python scripts/bench_dsdgen_builds.py --scale-factor 10 \\
+        --build stock=/dbfs/databricks/artifacts/tpcds-kit/dsdgen-<hash>.tar.gz \\
+        --build pgo=/dbfs/databricks/artifacts/tpcds-kit/dsdgen-<hash>.tar.gz
+
+Large scale factors can be sampled with ``--parallel``/``--child``, which
+generate one child chunk of each table.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import resource
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+# tpcds_datagen lives at the root of this repo, one level above the scripts folder.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from tpcds_datagen.dsdgen import dsdgen_command  # noqa: E402
+from tpcds_datagen.tables import TABLES  # noqa: E402
+
+
+def build_dir(path: str) -> str:
+    """The directory of a build, extracting an artifact archive if needed."""
+    if os.path.isdir(path):
+        return path
+    directory = tempfile.mkdtemp(prefix="dsdgen-build-")
+    with tarfile.open(path) as archive:
+        archive.extractall(directory, filter="data")
+    return directory
+
+
+def children_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def measure(directory: str, table: str, scale_factor: int, parallel: int, child: int) -> tuple[int, str, float, float]:
+    """Rows, sha256 of the output, CPU seconds and wall seconds of one dsdgen run."""
+    digest = hashlib.sha256()
+    rows = 0
+    cpu_start, wall_start = children_cpu_seconds(), time.monotonic()
+    process = subprocess.Popen(
+        dsdgen_command(table, scale_factor, parallel, child), cwd=directory, stdout=subprocess.PIPE
+    )
+    for block in iter(lambda: process.stdout.read(1 << 20), b""):
+        digest.update(block)
+        rows += block.count(b"\n")
+    if process.wait() != 0:
+        raise RuntimeError(f"dsdgen in {directory} failed for {table}")
+    return rows, digest.hexdigest(), children_cpu_seconds() - cpu_start, time.monotonic() - wall_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--build", action="append", required=True, metavar="NAME=PATH", help="first one is the baseline")
+    parser.add_argument("--tables", nargs="+", default=TABLES, choices=TABLES, metavar="TABLE")
+    parser.add_argument("--scale-factor", type=int, default=1)
+    parser.add_argument("--parallel", type=int, default=1)
+    parser.add_argument("--child", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per table and build; the fastest counts")
+    args = parser.parse_args()
+
+    builds = [(name, build_dir(path)) for name, path in (b.split("=", 1) for b in args.build)]
+    baseline = builds[0][0]
+    totals = {name: [0, 0.0] for name, _ in builds}
+    mismatches = []
+    header = f"{'table':<24}{'build':<12}{'rows':>12}{'CPU s':>9}{'rows/CPU s':>13}{'vs ' + baseline:>12}  output"
+    print(header)
+    for table in args.tables:
+        reference = None
+        for name, directory in builds:
+            runs = [measure(directory, table, args.scale_factor, args.parallel, args.child) for _ in range(args.repeat)]
+            rows, digest, cpu, _ = min(runs, key=lambda run: run[2])
+            totals[name][0] += rows
+            totals[name][1] += cpu
+            if reference is None:
+                reference = (digest, cpu)
+            identical = digest == reference[0]
+            if not identical:
+                mismatches.append((table, name))
+            speedup = reference[1] / cpu if cpu else float("nan")
+            rate = rows / cpu if cpu else float("nan")
+            print(
+                f"{table:<24}{name:<12}{rows:>12,}{cpu:>9.2f}{rate:>13,.0f}{speedup:>11.2f}x"
+                f"  {'identical' if identical else 'DIFFERENT'}"
+            )
+    print()
+    base_rows, base_cpu = totals[baseline]
+    for name, (rows, cpu) in totals.items():
+        print(f"{'all tables':<24}{name:<12}{rows:>12,}{cpu:>9.2f}{rows / cpu:>13,.0f}{base_cpu / cpu:>11.2f}x")
+    if mismatches:
+        print(f"\nOutput differs from {baseline} for: {', '.join(f'{t} ({n})' for t, n in mismatches)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare Parquet writer profiles on file size, write throughput and scan speed.
+
+Generates one dsdgen chunk of each table once, keeps it in memory, and
+writes it with every profile: the writer defaults with snappy, zstd, and
+the table's profile from ``tuned_writer_profiles()``. Each file is then
+read back in full and with a two-column projection, the shape of most
+TPC-DS scans:
+
+    python scripts/bench_writer_profiles.py --dsdgen-dir /usr/local/bin/tpcds-kit/tools \\
+        --scale-factor 10 --parallel 10 --tables store_sales customer item
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import time
+
+# tpcds_datagen lives at the root of this repo, one level above the scripts folder.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from tpcds_datagen.convert import ParquetSink, read_batches  # noqa: E402
+from tpcds_datagen.dsdgen import DsdgenProcess  # noqa: E402
+from tpcds_datagen.spec import GenerationOptions  # noqa: E402
+from tpcds_datagen.tables import COLUMNS  # noqa: E402
+from tpcds_datagen.writer_profiles import WriterProfile, tuned_writer_profiles  # noqa: E402
+
+
+def generate_chunk(options: GenerationOptions, table: str, parallel: int) -> list:
+    """Record batches of child 1 of ``parallel`` of ``table``."""
+    process = DsdgenProcess(table, options.scale_factor, parallel, 1, options.dsdgen_dir)
+    batches = list(read_batches(table, process.stdout, options))
+    process.finish()
+    return batches
+
+
+def best_of(runs: int, fn) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    import pyarrow.parquet as pq
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsdgen-dir", required=True)
+    parser.add_argument("--scale-factor", type=int, default=1)
+    parser.add_argument("--parallel", type=int, default=1, help="generate child 1 of PARALLEL of each table")
+    parser.add_argument("--tables", nargs="+", default=["store_sales", "inventory", "customer", "item", "date_dim"])
+    parser.add_argument("--runs", type=int, default=3, help="best of RUNS for every timing")
+    parser.add_argument("--out", default="/tmp/tpcds-bench-writer-profiles")
+    args = parser.parse_args()
+
+    tuned = tuned_writer_profiles()
+    print(f"{'table':<24}{'profile':<8}{'rows':>12}{'MB':>9}{'write MB/s':>12}{'scan MB/s':>11}{'2 cols MB/s':>13}")
+    os.makedirs(args.out, exist_ok=True)
+    try:
+        for table in args.tables:
+            options = GenerationOptions(args.scale_factor, dsdgen_dir=args.dsdgen_dir)
+            batches = generate_chunk(options, table, args.parallel)
+            rows = sum(b.num_rows for b in batches)
+            arrow_mb = sum(b.nbytes for b in batches) / 2**20  # throughput is in uncompressed MB
+            columns = [COLUMNS[table][0][0], COLUMNS[table][-1][0]]
+            profiles = {"snappy": WriterProfile(codec="snappy"), "zstd": WriterProfile(codec="zstd"), "tuned": tuned.get(table, WriterProfile())}
+            for name, profile in profiles.items():
+                path = os.path.join(args.out, f"{table}-{name}.parquet")
+                profile_options = GenerationOptions(args.scale_factor, writer_profiles={table: profile})
+
+                def write():
+                    with ParquetSink(path, table, profile_options) as sink:
+                        sink.write(batches)
+
+                write_seconds = best_of(args.runs, write)
+                scan_seconds = best_of(args.runs, lambda: pq.read_table(path))
+                projection_seconds = best_of(args.runs, lambda: pq.read_table(path, columns=columns))
+                print(
+                    f"{table:<24}{name:<8}{rows:>12,}{os.path.getsize(path) / 2**20:>9.1f}{arrow_mb / write_seconds:>12.0f}"
+                    f"{arrow_mb / scan_seconds:>11.0f}{arrow_mb / projection_seconds:>13.0f}"
+                )
+    finally:
+        shutil.rmtree(args.out, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/bin/bash
+# Build dsdgen once and package it as a content-addressed artifact.
+#
+# Usage: [DSDGEN_BUILD=stock|o3|o3-lto|pgo] build_dsdgen.sh OUTPUT_DIR [MAKE_ARGS...]
+#
+# DSDGEN_BUILD selects the compiler flags:
+#   stock   the Makefile's own flags, like the compile-on-boot init script
+#   o3      -O3
+#   o3-lto  -O3 with link-time optimization
+#   pgo     -O3 and LTO, optimized with a profile of a full sf=PGO_SCALE
+#           (default 1) generation of every table
+# Check any variant against stock with bench_dsdgen_builds.py before using it:
+# the output must stay byte-identical.
+#
+# Writes to OUTPUT_DIR (e.g. /dbfs/databricks/artifacts/tpcds-kit):
+#   dsdgen-<hash>.tar.gz         dsdgen, tpcds.idx and BUILD_INFO
+#   dsdgen-<hash>.tar.gz.sha256  checksum of the archive
+#   tpcds-install-<hash>.sh      cluster init script that installs this archive
+#   LATEST                       <hash> of the most recent build
+#
+# <hash> is the first 16 hex digits of the archive's sha256. The archive is
+# reproducible, so rebuilding the same sources with the same flags gives the
+# same name. MAKE_ARGS are passed on to make, after OS=LINUX.
+
+set -euo pipefail
+
+OUTPUT_DIR=${1:?usage: build_dsdgen.sh OUTPUT_DIR [MAKE_ARGS...]}
+shift
+TPCDS_KIT_REPO=${TPCDS_KIT_REPO:-https://github.com/databricks/tpcds-kit.git}
+TPCDS_KIT_REF=${TPCDS_KIT_REF:-master}
+SCRIPT_DIR=$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)
+
+# Install the build tools only where they are missing.
+for tool in gcc make flex bison byacc git; do
+  if ! command -v "$tool" > /dev/null; then
+    sudo apt-get update
+    sudo apt-get --assume-yes install gcc make flex bison byacc git
+    break
+  fi
+done
+
+WORK_DIR=$(mktemp -d)
+trap 'rm -rf "$WORK_DIR"' EXIT
+
+# Clone the tpcds-kit repository and build the toolkit
+git clone --quiet "$TPCDS_KIT_REPO" "$WORK_DIR/tpcds-kit"
+git -C "$WORK_DIR/tpcds-kit" checkout --quiet "$TPCDS_KIT_REF"
+TOOLS_DIR="$WORK_DIR/tpcds-kit/tools"
+DSDGEN_BUILD=${DSDGEN_BUILD:-stock}
+# -fcommon: tpcds-kit defines some globals in headers, which gcc 10+ rejects by default.
+OPT_CFLAGS="-O3 -g -Wall -fcommon"
+LTO_CFLAGS="$OPT_CFLAGS -flto=auto"
+case "$DSDGEN_BUILD" in
+  stock)
+    make -C "$TOOLS_DIR" OS=LINUX "$@"
+    ;;
+  o3)
+    BUILD_FLAGS="$OPT_CFLAGS"
+    make -C "$TOOLS_DIR" OS=LINUX LINUX_CFLAGS="$OPT_CFLAGS" "$@"
+    ;;
+  o3-lto)
+    BUILD_FLAGS="$LTO_CFLAGS"
+    make -C "$TOOLS_DIR" OS=LINUX LINUX_CFLAGS="$LTO_CFLAGS" LINUX_LIBS="-lm -flto=auto" "$@"
+    ;;
+  pgo)
+    BUILD_FLAGS="$LTO_CFLAGS -fprofile-use, trained at sf=${PGO_SCALE:-1}"
+    PROFILE_DIR="$WORK_DIR/profile"
+    make -C "$TOOLS_DIR" OS=LINUX LINUX_CFLAGS="$LTO_CFLAGS -fprofile-generate=$PROFILE_DIR" \
+      LINUX_LIBS="-lm -flto=auto -fprofile-generate=$PROFILE_DIR" "$@"
+    # Training run: every table, with the same RNG seed as spark-sql-perf.
+    mkdir -p "$WORK_DIR/training"
+    (cd "$TOOLS_DIR" && ./dsdgen -scale "${PGO_SCALE:-1}" -RNGSEED 100 -dir "$WORK_DIR/training" -force Y -quiet Y)
+    rm -rf "$WORK_DIR/training"
+    make -C "$TOOLS_DIR" clean
+    make -C "$TOOLS_DIR" OS=LINUX LINUX_CFLAGS="$LTO_CFLAGS -fprofile-use=$PROFILE_DIR -fprofile-correction -Wno-missing-profile" \
+      LINUX_LIBS="-lm -flto=auto -fprofile-use=$PROFILE_DIR" "$@"
+    ;;
+  *)
+    echo "Unknown DSDGEN_BUILD: $DSDGEN_BUILD (expected stock, o3, o3-lto or pgo)" >&2
+    exit 1
+    ;;
+esac
+
+STAGE_DIR="$WORK_DIR/stage"
+mkdir -p "$STAGE_DIR"
+cp "$TOOLS_DIR/dsdgen" "$TOOLS_DIR/tpcds.idx" "$STAGE_DIR"
+{
+  echo "repo: $TPCDS_KIT_REPO"
+  echo "commit: $(git -C "$WORK_DIR/tpcds-kit" rev-parse HEAD)"
+  echo "build: $DSDGEN_BUILD"
+  echo "cflags: ${BUILD_FLAGS:-Makefile defaults}"
+  echo "make: OS=LINUX $*"
+  echo "gcc: $(gcc -dumpfullversion 2> /dev/null || gcc -dumpversion)"
+} > "$STAGE_DIR/BUILD_INFO"
+
+# Fixed names, owners and timestamps so the same build gives the same archive.
+tar --sort=name --mtime=@0 --owner=0 --group=0 --numeric-owner -C "$STAGE_DIR" -cf - . | gzip -n > "$WORK_DIR/dsdgen.tar.gz"
+SHA256=$(sha256sum "$WORK_DIR/dsdgen.tar.gz" | cut -d ' ' -f 1)
+HASH=${SHA256:0:16}
+ARTIFACT="dsdgen-$HASH.tar.gz"
+
+mkdir -p "$OUTPUT_DIR"
+cp "$WORK_DIR/dsdgen.tar.gz" "$OUTPUT_DIR/$ARTIFACT"
+echo "$SHA256  $ARTIFACT" > "$OUTPUT_DIR/$ARTIFACT.sha256"
+sed -e "s|@ARTIFACT_DIR@|$OUTPUT_DIR|" -e "s|@ARTIFACT@|$ARTIFACT|" -e "s|@SHA256@|$SHA256|" \
+  "$SCRIPT_DIR/tpcds-install-prebuilt.sh" > "$OUTPUT_DIR/tpcds-install-$HASH.sh"
+echo "$HASH" > "$OUTPUT_DIR/LATEST"
+
+echo "Built $OUTPUT_DIR/$ARTIFACT"
+echo "Init script: $OUTPUT_DIR/tpcds-install-$HASH.sh"
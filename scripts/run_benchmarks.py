@@ -0,0 +1,76 @@
+"""Run a matrix of generation configurations on the local engine and render the results.
+
+Appends one JSON line per configuration to ``--results`` and prints the
+"Sample Results" table for everything in that file:
+
+    python scripts/run_benchmarks.py --dsdgen-dir /usr/local/bin/tpcds-kit/tools \\
+        --scale-factor 1 10 --num-partitions 4 16 --codec snappy zstd
+
+Pass ``--render-only`` to print the table of an existing results file.
+With ``--partition-tables`` every configuration is run with the fact
+tables flat and partitioned by date, and their files and seconds are
+compared table by table.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+# tpcds_datagen lives at the root of this repo, one level above the scripts folder.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from tpcds_datagen.benchmark import (  # noqa: E402
+    config_matrix,
+    load_results,
+    render_layout_comparison,
+    render_results,
+    render_table_metrics,
+    run_benchmark,
+)
+from tpcds_datagen.spec import DSDGEN_DIR  # noqa: E402
+from tpcds_datagen.tables import TABLES  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--results", default="benchmark_results.jsonl")
+    parser.add_argument("--render-only", action="store_true")
+    parser.add_argument("--dsdgen-dir", default=DSDGEN_DIR)
+    parser.add_argument("--base", default="/tmp/tpcds-benchmark", help="where the datasets are generated")
+    parser.add_argument("--scale-factor", type=int, nargs="+", default=[1])
+    parser.add_argument(
+        "--num-partitions", nargs="+", default=["planned"], help="dsdgen tasks per table, or 'planned'"
+    )
+    parser.add_argument("--codec", nargs="+", default=["snappy"])
+    parser.add_argument("--partition-tables", action="store_true", help="also run with the fact tables partitioned")
+    parser.add_argument("--column-stats", action="store_true", help="also run with column statistics from the footers")
+    parser.add_argument("--chunks-per-task", type=int, default=1, help="dsdgen chunks each unit generates")
+    parser.add_argument("--tables", nargs="+", default=TABLES, choices=TABLES, metavar="TABLE")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--environment", default=None, help="description for the cluster config column")
+    args = parser.parse_args()
+
+    if not args.render_only:
+        configs = config_matrix(
+            args.scale_factor,
+            num_partitions=[None if n == "planned" else int(n) for n in args.num_partitions],
+            partition_tables=(False, True) if args.partition_tables else (False,),
+            codecs=args.codec,
+            chunks_per_task=args.chunks_per_task,
+            column_stats=(False, True) if args.column_stats else (False,),
+        )
+        results = run_benchmark(
+            configs, args.results, args.base, args.dsdgen_dir, args.tables, workers=args.workers, environment=args.environment
+        )
+        for result in results:
+            print(render_table_metrics(result))
+    results = load_results(args.results)
+    print(render_results(results))
+    if any(r.config.partition_tables for r in results):
+        print(render_layout_comparison(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+#!/bin/bash
+# Cluster init script: install a prebuilt dsdgen instead of compiling tpcds-kit on every node.
+#
+# build_dsdgen.sh writes a copy of this template with the artifact and its
+# checksum filled in. The node fails to start if the archive does not match
+# the checksum or the binary cannot generate a small table.
+
+set -euo pipefail
+
+ARTIFACT_DIR=@ARTIFACT_DIR@
+ARTIFACT=@ARTIFACT@
+SHA256=@SHA256@
+INSTALL_DIR=/usr/local/bin/tpcds-kit/tools # the dsdgenDir the notebooks use
+
+ARCHIVE=$(mktemp)
+trap 'rm -f "$ARCHIVE"' EXIT
+cp "$ARTIFACT_DIR/$ARTIFACT" "$ARCHIVE"
+if ! echo "$SHA256  $ARCHIVE" | sha256sum --check --quiet; then
+  echo "$ARTIFACT_DIR/$ARTIFACT does not match its checksum $SHA256" >&2
+  exit 1
+fi
+
+mkdir -p "$INSTALL_DIR"
+tar -xzf "$ARCHIVE" -C "$INSTALL_DIR"
+
+# income_band has 20 rows: a quick check that the binary runs on this image.
+cd "$INSTALL_DIR"
+./dsdgen -table income_band -filter Y -scale 1 > /dev/null
@@ -0,0 +1,56 @@
+import os
+import stat
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+from tpcds_datagen.spec import GenerationOptions, TableSpec  # noqa: E402
+
+FAKE_ROWS = 1000
+
+
+@pytest.fixture
+def dsdgen_dir(tmp_path, monkeypatch):
+    """A directory with a ``./dsdgen`` that runs tests/fake_dsdgen.py."""
+    directory = tmp_path / "dsdgen"
+    directory.mkdir()
+    script = directory / "dsdgen"
+    script.write_text(
+        "#!/bin/sh\n"
+        f"PYTHONPATH='{ROOT}' exec '{sys.executable}' '{os.path.join(ROOT, 'tests', 'fake_dsdgen.py')}' \"$@\"\n"
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    (directory / "tpcds.idx").write_bytes(b"")
+    monkeypatch.setenv("FAKE_DSDGEN_ROWS", str(FAKE_ROWS))
+    return str(directory)
+
+
+@pytest.fixture
+def options(dsdgen_dir):
+    return GenerationOptions(1, dsdgen_dir=dsdgen_dir, engine="chunks")
+
+
+@pytest.fixture
+def root_dir(tmp_path):
+    return str(tmp_path / "data")
+
+
+def spec(root_dir: str, table: str, num_partitions: int, paired_returns_partitions: int | None = None, file_format: str = "parquet"):
+    return TableSpec(table, num_partitions, file_format, root_dir, paired_returns_partitions)
+
+
+def read_rows(root_dir: str, table: str):
+    """The rows of a table in file order, as one pyarrow table."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    directory = os.path.join(root_dir, table)
+    paths = []
+    for subdirectory, dirs, names in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(("_", ".")))
+        paths += [os.path.join(subdirectory, n) for n in sorted(names) if n.endswith(".parquet")]
+    return pa.concat_tables(pq.read_table(path) for path in sorted(paths))
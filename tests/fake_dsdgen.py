@@ -0,0 +1,70 @@
+"""A stand-in for dsdgen with the command line and chunking the pipeline relies on.
+
+Every table has ``FAKE_DSDGEN_ROWS`` rows per unit of scale factor, and
+each row depends only on its number, so child ``k`` of ``-parallel N``
+holds rows ``(k-1)*rows//N`` up to ``k*rows//N`` and finer children line
+up with coarser ones, as with dsdgen. ``-filter Y`` writes the chunk to
+stdout; otherwise it goes to ``.dat`` files under ``-dir``, together with
+the returns of a sales table (every tenth row). ``FAKE_DSDGEN_FAIL=<table>``
+makes it fail for that table, and ``FAKE_DSDGEN_DELAY`` makes every run
+take that many seconds longer.
+"""
+
+import datetime
+import os
+import sys
+import time
+
+from tpcds_datagen.tables import COLUMNS, SALES_RETURNS
+
+FIRST_DATE_SK = 2450816
+
+
+def field(table: str, row: int, index: int, name: str, type_name: str) -> str:
+    if index > 0 and (row + index) % 37 == 0:
+        return ""
+    if name.endswith("_date_sk"):
+        return str(FIRST_DATE_SK + row % 30)
+    if type_name in ("int", "bigint"):
+        return str(row if index == 0 else (row * 13 + index) % 100000)
+    if type_name.startswith("decimal"):
+        return f"{(row * 31 + index) % 100000 / 100:.2f}"
+    if type_name == "date":
+        return (datetime.date(1998, 1, 1) + datetime.timedelta((row * 7 + index) % 2000)).isoformat()
+    return f"{table[:2]}{row % 97}"
+
+
+def lines(table: str, first: int, last: int, every: int = 1):
+    for row in range(first, last):
+        if row % every == 0:
+            yield "|".join(field(table, row, i, name, t) for i, (name, t) in enumerate(COLUMNS[table])) + "|\n"
+
+
+def main(argv: list[str]) -> int:
+    if argv and argv[0].upper() == "-RELEASE":
+        print("fake dsdgen 0.0")
+        return 0
+    args = {argv[i].lstrip("-").lower(): argv[i + 1] for i in range(0, len(argv), 2)}
+    table = args["table"]
+    if os.environ.get("FAKE_DSDGEN_FAIL") == table:
+        print(f"{table}: failing on purpose", file=sys.stderr)
+        return 3
+    time.sleep(float(os.environ.get("FAKE_DSDGEN_DELAY", "0")))
+    rows = int(os.environ.get("FAKE_DSDGEN_ROWS", "1000")) * int(args.get("scale", "1"))
+    parallel, child = int(args.get("parallel", "1")), int(args.get("child", "1"))
+    first, last = (child - 1) * rows // parallel, child * rows // parallel
+    if args.get("filter", "N").upper() == "Y":
+        sys.stdout.writelines(lines(table, first, last))
+        return 0
+    suffix = f"_{child}_{parallel}.dat" if parallel > 1 else ".dat"
+    with open(os.path.join(args["dir"], table + suffix), "w") as f:
+        f.writelines(lines(table, first, last))
+    if table in SALES_RETURNS:
+        returns = SALES_RETURNS[table]
+        with open(os.path.join(args["dir"], returns + suffix), "w") as f:
+            f.writelines(lines(returns, first, last, every=10))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,72 @@
+import pytest
+from conftest import FAKE_ROWS
+
+from tpcds_datagen import benchmark
+from tpcds_datagen.benchmark import (
+    BenchmarkConfig,
+    BenchmarkResult,
+    TableMetrics,
+    config_matrix,
+    load_results,
+    render_results,
+    render_table_metrics,
+    run_benchmark,
+)
+
+
+def _result(config, wall_seconds, sizes):
+    tables = [TableMetrics(table, n, wall_seconds / 2, rows, size, n) for table, n, rows, size in sizes]
+    return BenchmarkResult(config, "4 Standard_DS3_v2 workers, 16 total cores", "2026-01-01T00:00:00", wall_seconds, None, tables)
+
+
+def test_configs_are_checked_and_multiplied():
+    configs = config_matrix([1, 10], num_partitions=[None, 8], codecs=["snappy", "zstd"])
+    assert len(configs) == 8 and len(set(configs)) == 8
+    with pytest.raises(ValueError):
+        BenchmarkConfig(1, engine="spark")
+    with pytest.raises(ValueError):
+        BenchmarkConfig(1, file_format="csv")
+    with pytest.raises(ValueError, match="footers"):
+        BenchmarkConfig(1, file_format="csv", engine="gendata", column_stats=True)
+    assert BenchmarkConfig(1, file_format="csv", engine="gendata").num_partitions_by_table(["item"]) == {"item": 1}
+    assert BenchmarkConfig(1, num_partitions=8).num_partitions_by_table(["item", "reason"]) == {"item": 8, "reason": 8}
+
+
+def test_render_results_as_the_sample_results_table():
+    sizes = [("store_sales", 250, 10, 3 * 10**11), ("item", 1, 5, 10**8)]
+    planned = _result(BenchmarkConfig(1000, engine="chunks"), 4 * 3600, sizes)
+    fixed = _result(BenchmarkConfig(1, "csv", 8, True, engine="gendata"), 90.0, [("item", 8, 5, 2 * 10**5)])
+    stats = _result(BenchmarkConfig(1, num_partitions=8, column_stats=True), 90.0, [("item", 8, 5, 2 * 10**5)])
+    lines = render_results([planned, fixed, stats]).splitlines()
+    assert lines[0].startswith("| File Format | Generate Column Stats | Number of dsdgen Tasks |")
+    assert lines[2] == (
+        "| parquet (snappy) | no | 251 (planned) | no | 1000 | 4 Standard_DS3_v2 workers, 16 total cores "
+        "| 4.00 hours | 300 GB |"
+    )
+    assert lines[3] == "| csv | no | 8 | yes | 1 | 4 Standard_DS3_v2 workers, 16 total cores | 1.50 min | 200 KB |"
+    assert lines[4].startswith("| parquet (snappy) | yes | 8 | no | 1 |")
+
+
+def test_local_benchmark_measures_and_saves_every_config(dsdgen_dir, tmp_path, monkeypatch):
+    gathered = []
+
+    def dataset_statistics(root_dir, tables):
+        gathered.append([s.table for s in statistics(root_dir, tables)])
+
+    statistics = benchmark.dataset_statistics
+    monkeypatch.setattr(benchmark, "dataset_statistics", dataset_statistics)
+    results_path = str(tmp_path / "results.jsonl")
+    configs = config_matrix([1], num_partitions=[2], codecs=["snappy", "zstd"], column_stats=[False, True])
+    assert len(configs) == 4
+    results = run_benchmark(configs, results_path, str(tmp_path / "out"), dsdgen_dir, ["item", "reason"], workers=2)
+
+    assert load_results(results_path) == results
+    for result in results:
+        assert [(t.table, t.rows, t.files) for t in result.tables] == [("item", FAKE_ROWS, 2), ("reason", FAKE_ROWS, 2)]
+        assert result.cpu_seconds > 0
+        assert result.environment.startswith("local, 2 processes")
+    assert [r.config.column_stats for r in results] == [False, True, False, True]
+    assert gathered == [["item", "reason"]] * 2  # inside the measured run of the column_stats configs
+    assert list((tmp_path / "out").iterdir()) == []  # removed unless keep_output
+    lines = render_table_metrics(results[0]).splitlines()
+    assert lines[-1].startswith("wall ") and ", CPU " in lines[-1]
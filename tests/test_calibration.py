@@ -0,0 +1,53 @@
+import datetime
+import decimal
+
+import pytest
+from conftest import FAKE_ROWS
+
+from tpcds_datagen.calibration import CalibrationProfile, TableCalibration, _generate_rows, pilot_children
+from tpcds_datagen.dsdgen import dsdgen_release
+from tpcds_datagen.tables import COLUMNS
+
+
+def test_pilot_children_spread_over_the_table():
+    assert pilot_children(1000, 3) == [1, 501, 1000]
+    assert pilot_children(250, 1) == [1]
+    assert pilot_children(4, 3) == [1, 3, 4]
+    assert pilot_children(2, 3) == [1, 2]
+    assert pilot_children(5, 4) == [1, 2, 4, 5]
+
+
+def test_profile_round_trips_through_json(tmp_path):
+    profile = CalibrationProfile(1000, "parquet", "zstd", False, False, "fake dsdgen 0.0")
+    profile.tables["store_sales"] = TableCalibration("store_sales", 250, [1, 125, 250], 3000, 150000, 6.0)
+    profile.tables["reason"] = TableCalibration("reason", 1, [1], 0, 0, 0.1)
+    path = str(tmp_path / "profile.json")
+    profile.save(path)
+
+    loaded = CalibrationProfile.load(path)
+    assert loaded == profile
+    assert loaded.bytes_per_row == {"store_sales": 50.0}  # tables without rows are left to the defaults
+    assert loaded.seconds_per_row == {"store_sales": 0.002}
+    assert loaded.core_seconds_per_row == {"store_sales": 0.006}  # three pilot tasks ran at once
+    assert loaded.describe().splitlines()[1].split() == ["store_sales", "3", "3,000", "0.1", "50.0", "2000.00"]
+
+
+def test_pilot_rows_are_typed_dsdgen_chunks(dsdgen_dir):
+    rows = list(_generate_rows("store_returns", 1, 4, dsdgen_dir, False, False)(2))
+    assert len(rows) == FAKE_ROWS // 4
+    first = rows[0]
+    assert first[0] == 2450816 + (FAKE_ROWS // 4) % 30
+    assert isinstance(first[2], int) and isinstance(first[-1], decimal.Decimal)
+
+    names = [name for name, _ in COLUMNS["store"]]
+    start, offset = names.index("s_rec_start_date"), names.index("s_gmt_offset")
+    typed = list(_generate_rows("store", 1, 1, dsdgen_dir, False, False)(1))[1]
+    assert isinstance(typed[start], datetime.date) and isinstance(typed[offset], decimal.Decimal)
+    plain = list(_generate_rows("store", 1, 1, dsdgen_dir, True, True)(1))[1]
+    assert plain[start] == typed[start].isoformat() and plain[offset] == float(typed[offset])
+
+def test_a_failing_dsdgen_is_reported(dsdgen_dir, monkeypatch):
+    monkeypatch.setenv("FAKE_DSDGEN_FAIL", "item")
+    with pytest.raises(RuntimeError, match="dsdgen failed for item child 1/2: item: failing on purpose"):
+        list(_generate_rows("item", 1, 2, dsdgen_dir, False, False)(1))
+    assert dsdgen_release(dsdgen_dir) == "fake dsdgen 0.0"
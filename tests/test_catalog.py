@@ -0,0 +1,89 @@
+import datetime
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+import pyarrow.compute as pc
+import pytest
+from conftest import FAKE_ROWS, read_rows, spec
+
+from tpcds_datagen.catalog import (
+    ColumnStatistics,
+    create_table_statement,
+    dataset_statistics,
+    register_dataset,
+    table_statistics,
+)
+from tpcds_datagen.local import LocalGenerator
+
+
+@pytest.fixture
+def pool():
+    with ThreadPoolExecutor(2) as pool:
+        yield pool
+
+
+def test_dimension_statistics_come_from_the_footers(options, root_dir, pool):
+    LocalGenerator(options, workers=2).run([spec(root_dir, "customer", 3)])
+    stats = table_statistics(root_dir, "customer", pool)
+    rows = read_rows(root_dir, "customer")
+
+    assert (stats.rows, stats.files, stats.partition_column) == (FAKE_ROWS, 3, None)
+    assert stats.schema[:2] == [("c_customer_sk", "INT"), ("c_customer_id", "STRING")]
+    key = stats.columns["c_customer_sk"]
+    assert (key.min, key.max, key.null_count, key.distinct_count) == (0, FAKE_ROWS - 1, 0, FAKE_ROWS)
+    birth_day, values = stats.columns["c_birth_day"], rows.column("c_birth_day")
+    assert birth_day.null_count == values.null_count
+    assert (birth_day.min, birth_day.max) == (pc.min(values).as_py(), pc.max(values).as_py())
+    assert birth_day.distinct_count is None
+    assert stats.columns["c_first_name"].min is None  # no min/max for strings, as with ANALYZE
+
+    properties = stats.column_stat_properties()
+    assert properties["c_customer_sk"] == {
+        "c_customer_sk.version": "2",
+        "c_customer_sk.nullCount": "0",
+        "c_customer_sk.min": "0",
+        "c_customer_sk.max": str(FAKE_ROWS - 1),
+        "c_customer_sk.distinctCount": str(FAKE_ROWS),
+    }
+
+
+def test_partition_column_statistics_come_from_the_directories(options, root_dir, pool):
+    store_sales = spec(root_dir, "store_sales", 2)
+    LocalGenerator(replace(options, partition_tables=True), workers=2).run([store_sales])
+    stats = table_statistics(root_dir, "store_sales", pool)
+
+    assert stats.rows == FAKE_ROWS and stats.partition_column == "ss_sold_date_sk"
+    assert stats.schema[-1] == ("ss_sold_date_sk", "INT")
+    date_sk = stats.columns["ss_sold_date_sk"]
+    assert (date_sk.min, date_sk.max, date_sk.null_count) == (2450816, 2450816 + 29, 0)
+    assert stats.columns["ss_item_sk"].distinct_count is None  # only dimension keys are unique
+    assert create_table_statement("tpcds001GB.store_sales", store_sales.location, "parquet", stats).endswith(
+        f"USING parquet PARTITIONED BY (`ss_sold_date_sk`) LOCATION '{store_sales.location}'"
+    )
+
+
+def test_delta_statistics_only_count_the_files_in_the_log(options, root_dir, pool):
+    customer = spec(root_dir, "customer", 3, file_format="delta")
+    LocalGenerator(options, workers=2).run([customer])
+    os.remove(os.path.join(customer.location, "_manifest.json"))  # as for a table written by Spark
+    removed = os.path.join(customer.location, "part-00009.parquet")  # dropped from the log, not vacuumed yet
+    shutil.copy(os.path.join(customer.location, "part-00001.parquet"), removed)
+
+    stats = table_statistics(root_dir, "customer", pool)
+    assert (stats.rows, stats.files) == (FAKE_ROWS, 3)
+
+
+def test_column_statistics_merge():
+    column = ColumnStatistics(null_count=3)
+    column.merge(ColumnStatistics(datetime.date(1998, 1, 2), datetime.date(1998, 3, 1), 1))
+    column.merge(ColumnStatistics(datetime.date(1997, 12, 31), datetime.date(1998, 2, 1)))
+    assert (column.min, column.max, column.null_count) == (datetime.date(1997, 12, 31), datetime.date(1998, 3, 1), 4)
+
+
+def test_tables_without_files_are_skipped(options, root_dir):
+    LocalGenerator(options, workers=2).run([spec(root_dir, "reason", 1)])
+    assert [s.table for s in dataset_statistics(root_dir, ["reason", "item"], workers=2)] == ["reason"]
+    with pytest.raises(ValueError, match="cannot register csv"):
+        register_dataset(None, root_dir, "tpcds001GB", file_format="csv")
@@ -0,0 +1,145 @@
+import os
+import random
+
+import pytest
+from check_preemption import file_digests, run_all
+from conftest import FAKE_ROWS, read_rows, spec
+
+from tpcds_datagen.chunks import (
+    commit_split,
+    finish_units,
+    plan_units,
+    prepare_units,
+    reconcile,
+    run_split_part,
+    run_unit,
+)
+from tpcds_datagen.commitlog import ChunkCommit, CommitLog
+from tpcds_datagen.stragglers import StragglerTracker, split_factor, split_parts
+
+
+def test_units_write_every_row_once(options, root_dir):
+    customer = spec(root_dir, "customer", 4)
+    for unit in reversed(prepare_units(customer, options, 2)):
+        run_unit(customer, options, "snappy", unit)
+    state = finish_units(customer)
+    assert state.complete and state.committed == 4
+
+    commits = CommitLog(customer.location).commits()
+    assert [f.path for c in commits for f in c.files] == [f"customer/part-0000{n}.parquet" for n in range(1, 5)]
+    rows = read_rows(root_dir, "customer")
+    assert rows.column("c_customer_sk").to_pylist() == list(range(FAKE_ROWS))
+
+
+def test_a_pair_has_one_unit_per_core_at_least(options, root_dir):
+    store_sales = spec(root_dir, "store_sales", 8, 2)
+    assert plan_units(store_sales, 4) == [[1, 2], [3, 4], [5, 6], [7, 8]]
+    commit = run_unit(store_sales, options, "snappy", (3, [5, 6]))
+    assert [f.path for f in commit.files] == [
+        "store_sales/part-00005.parquet",
+        "store_sales/part-00006.parquet",
+        "store_returns/part-00003.parquet",
+    ]
+
+
+def test_rerunning_a_committed_unit_does_nothing(options, root_dir):
+    customer = spec(root_dir, "customer", 2)
+    unit = prepare_units(customer, options, 2)[0]
+    assert run_unit(customer, options, "snappy", unit) is not None
+    digests = file_digests(customer)
+    assert run_unit(customer, options, "snappy", unit) is None
+    assert file_digests(customer) == digests
+
+
+def test_unfinished_tables_fail_until_resumed(options, root_dir):
+    customer = spec(root_dir, "customer", 3)
+    run_unit(customer, options, "snappy", prepare_units(customer, options, 2)[0])
+    with pytest.raises(RuntimeError, match=r"units \[2, 3\] did not commit"):
+        finish_units(customer)
+    with pytest.raises(ValueError, match="numPartitions=3"):
+        prepare_units(spec(root_dir, "customer", 4), options, 2, resume=True)
+
+
+@pytest.mark.parametrize("paired", [None, 2])
+def test_resume_after_kills_gives_the_same_files(options, tmp_path, monkeypatch, paired):
+    reference = spec(str(tmp_path / "reference"), "store_sales", 8, paired)
+    chaos = spec(str(tmp_path / "chaos"), "store_sales", 8, paired)
+    run_all(reference, options, workers=4)
+    finish_units(reference)
+    monkeypatch.setenv("FAKE_DSDGEN_DELAY", "1")  # units live long enough to be killed
+    killed = run_all(chaos, options, workers=4, kills=3, rng=random.Random(0))
+    monkeypatch.delenv("FAKE_DSDGEN_DELAY")
+    for _ in range(10):
+        if reconcile(chaos).complete:
+            break
+        run_all(chaos, options, workers=4, resume=True)
+    finish_units(chaos)
+    assert killed > 0
+    assert file_digests(chaos) == file_digests(reference)
+
+
+def test_reconcile_drops_a_commit_whose_file_changed(options, root_dir):
+    customer = spec(root_dir, "customer", 4)
+    for unit in prepare_units(customer, options, 2):
+        run_unit(customer, options, "snappy", unit)
+    expected = file_digests(customer)
+    damaged = CommitLog(customer.location).commits()[1].files[0].path
+    with open(os.path.join(root_dir, damaged), "ab") as f:
+        f.write(b"torn")
+    stray = os.path.join(root_dir, "customer", "part-09999.parquet")
+    with open(stray, "wb") as f:
+        f.write(b"left by a killed attempt")
+
+    state = reconcile(customer)
+    assert state.missing_units == [2]
+    assert [c.number for c in CommitLog(customer.location).commits()] == [1, 3, 4]
+    assert not os.path.exists(stray) and not os.path.exists(os.path.join(root_dir, damaged))
+
+    todo = prepare_units(customer, options, 2, resume=True)
+    assert todo == [(2, [2])]
+    run_unit(customer, options, "snappy", todo[0])
+    finish_units(customer)
+    assert file_digests(customer) == expected
+
+
+def test_commits_are_read_in_unit_order_past_five_digits(root_dir):
+    log = CommitLog(f"{root_dir}/store_sales")
+    for number in (100000, 2, 99999, 100001):
+        log.record(ChunkCommit("store_sales", 100001, number, [number]))
+    log.save_plan(100001, [])
+    assert [c.number for c in log.commits()] == [2, 99999, 100000, 100001]
+
+def test_a_split_unit_has_the_rows_of_the_unsplit_one(options, tmp_path):
+    whole = spec(str(tmp_path / "whole"), "store_sales", 4)
+    split = spec(str(tmp_path / "split"), "store_sales", 4)
+    for unit in prepare_units(whole, options, 4):
+        run_unit(whole, options, "snappy", unit)
+    finish_units(whole)
+
+    units = prepare_units(split, options, 4)
+    straggler = units[1]
+    factor = split_factor(split, options, straggler[1], cores=6)
+    assert factor == 6
+    assert split_parts(straggler, 2) == [(2, 2, 1), (2, 2, 2)]
+    parts = [run_split_part(split, options, "snappy", factor, part) for part in split_parts(straggler, factor)]
+    commit = commit_split(split, straggler, factor, parts)
+    assert commit.split == factor
+    assert [f.path for f in commit.files] == [f"store_sales/part-00002-{i:03d}.parquet" for i in range(1, 7)]
+    # The original attempt of the unit loses the race and writes nothing.
+    assert run_unit(split, options, "snappy", straggler) is None
+    for unit in units[:1] + units[2:]:
+        run_unit(split, options, "snappy", unit)
+    finish_units(split)
+
+    assert read_rows(split.root_dir, "store_sales").equals(read_rows(whole.root_dir, "store_sales"))
+
+
+def test_a_unit_is_a_straggler_once_it_runs_factor_times_the_median():
+    tracker = StragglerTracker(factor=2.0)
+    for seconds in (10, 12, 2000):
+        assert not tracker.is_straggler("store_sales", 1000, 1)
+        tracker.record("store_sales", seconds * 2, 2)
+    assert tracker.expected("store_sales", 1) == 12
+    assert not tracker.is_straggler("store_sales", 24, 1)
+    assert tracker.is_straggler("store_sales", 25, 1)
+    assert not tracker.is_straggler("catalog_sales", 1000, 1)
@@ -0,0 +1,75 @@
+import os
+from dataclasses import replace
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from conftest import FAKE_ROWS, read_rows, spec
+
+from tpcds_datagen.chunks import finish_units, prepare_units, run_unit
+from tpcds_datagen.clustering import _range_ids
+from tpcds_datagen.commitlog import CommitLog
+from tpcds_datagen.spec import GenerationOptions
+
+
+def test_range_ids_count_the_boundaries_at_or_below_each_key():
+    keys = pa.array([1, 5, 10, 11, 20, 25, None], pa.int64())
+    assert _range_ids(keys, [10, 20]).to_pylist() == [0, 0, 1, 1, 2, 2, 0]
+
+
+def test_range_ids_without_boundaries_are_all_zero():
+    assert _range_ids(pa.array([3, None, 7]), []).to_pylist() == [0, 0, 0]
+
+
+def test_cluster_by_needs_an_integer_column_and_the_chunks_engine():
+    with pytest.raises(ValueError, match="no integer column 'ss_sold_date'"):
+        GenerationOptions(1, engine="chunks", cluster_by={"store_sales": "ss_sold_date"})
+    with pytest.raises(ValueError, match="chunks engine"):
+        GenerationOptions(1, cluster_by={"store_sales": "ss_sold_date_sk"})
+
+
+def _generate(options, table_spec):
+    for unit in prepare_units(table_spec, options, 2):
+        run_unit(table_spec, options, "snappy", unit)
+    finish_units(table_spec)
+
+
+def test_clustered_files_hold_sorted_disjoint_key_ranges(options, tmp_path):
+    _generate(options, spec(str(tmp_path / "plain"), "store_sales", 4))
+    options = replace(options, chunks_per_task=2, cluster_by={"store_sales": "ss_sold_date_sk"})
+    root_dir = str(tmp_path / "clustered")
+    store_sales = spec(root_dir, "store_sales", 4)
+    _generate(options, store_sales)
+
+    plain, clustered = read_rows(str(tmp_path / "plain"), "store_sales"), read_rows(root_dir, "store_sales")
+    assert clustered.num_rows == FAKE_ROWS
+    assert sorted(map(str, clustered.to_pylist())) == sorted(map(str, plain.to_pylist()))
+    for commit in CommitLog(store_sales.location).commits():
+        assert len(commit.files) == 2
+        ranges = []
+        for output in commit.files:
+            keys = pq.read_table(f"{root_dir}/{output.path}").column("ss_sold_date_sk").to_pylist()
+            assert keys == sorted(keys)
+            ranges.append((keys[0], keys[-1]))
+        assert ranges[0][1] < ranges[1][0]
+
+    with pytest.raises(ValueError, match="another cluster_by"):
+        prepare_units(store_sales, replace(options, cluster_by={}, resume=True), 2, resume=True)
+
+
+def test_partition_files_are_split_to_the_target_size(options, root_dir, monkeypatch):
+    monkeypatch.setenv("FAKE_DSDGEN_ROWS", str(30 * FAKE_ROWS))  # a thousand rows per date
+    options = replace(options, partition_tables=True, partition_file_bytes=20_000)
+    store_sales = spec(root_dir, "store_sales", 1)
+    _generate(options, store_sales)
+
+    (commit,) = CommitLog(store_sales.location).commits()
+    assert sum(f.rows for f in commit.files) == 30 * FAKE_ROWS
+    by_partition = {}
+    for output in commit.files:  # in the order they were written
+        by_partition.setdefault(os.path.dirname(output.path), []).append(output)
+    assert len(by_partition) == 30
+    for i, files in enumerate(by_partition.values()):
+        assert len(files) > 1 and max(f.rows for f in files) - min(f.rows for f in files) <= 1
+        if i > 0:  # sized by the bytes per row of the files before, not the planner's figure
+            assert max(f.bytes for f in files) < 1.25 * options.partition_file_bytes
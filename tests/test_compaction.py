@@ -0,0 +1,104 @@
+import os
+import shutil
+
+import pyarrow.parquet as pq
+import pytest
+from conftest import read_rows, spec
+
+from tpcds_datagen.chunks import finish_units, prepare_units, run_unit
+from tpcds_datagen.compaction import compact_dataset, compact_table, file_size_report, group_by_size
+from tpcds_datagen.delta import DeltaLog
+from tpcds_datagen.writer_profiles import WriterProfile
+
+
+def test_group_by_size_keeps_order_and_balances():
+    runs = group_by_size([10, 10, 10, 10, 10, 10], 3)
+    assert runs == [[0, 1], [2, 3], [4, 5]]
+    assert group_by_size([100, 1, 1, 1], 2) == [[0], [1, 2, 3]]
+
+
+def test_group_by_size_never_returns_empty_runs():
+    assert group_by_size([5, 5], 4) == [[0], [1]]
+    assert group_by_size([0, 0, 0], 2) and all(group_by_size([0, 0, 0], 2))
+    assert [i for run in group_by_size([3, 1, 4, 1, 5, 9, 2, 6], 3) for i in run] == list(range(8))
+
+
+def _generate(options, table_spec):
+    for unit in prepare_units(table_spec, options, 2):
+        run_unit(table_spec, options, "snappy", unit)
+    finish_units(table_spec)
+
+
+@pytest.mark.parametrize("row_group_bytes, row_groups", [(None, 1), (1, 3)])
+def test_compaction_keeps_rows_and_applies_the_profile(options, root_dir, row_group_bytes, row_groups):
+    customer = spec(root_dir, "customer", 6)
+    _generate(options, customer)
+    before = read_rows(root_dir, "customer")
+
+    profile = WriterProfile(codec="zstd", row_group_bytes=row_group_bytes)
+    assert compact_table(root_dir, "customer", 2, writer_profiles={"customer": profile}) == (6, 2)
+    assert sorted(n for n in os.listdir(customer.location) if not n.startswith("_")) == [
+        "part-00001.parquet",
+        "part-00002.parquet",
+    ]
+    assert read_rows(root_dir, "customer").equals(before)
+    # A resume keeps the compacted files: they are in the rewritten commit log.
+    assert prepare_units(customer, options, 2, resume=True) == []
+
+    # Three small input files: one row group of the default size, or one per input batch.
+    metadata = pq.ParquetFile(os.path.join(customer.location, "part-00001.parquet")).metadata
+    assert metadata.num_row_groups == row_groups
+    assert metadata.row_group(0).column(0).compression == "ZSTD"
+
+
+def test_compaction_keeps_the_codec_a_profile_leaves_unset(options, root_dir):
+    _generate(options, spec(root_dir, "customer", 4))
+    profile = WriterProfile(dictionary=("c_salutation",))
+    assert compact_table(root_dir, "customer", 1, writer_profiles={"customer": profile}) == (4, 1)
+    metadata = pq.ParquetFile(os.path.join(root_dir, "customer", "part-00001.parquet")).metadata
+    assert metadata.row_group(0).column(0).compression == "SNAPPY"  # the codec of the generated files
+
+
+def test_compact_dataset_only_rewrites_undersized_tables(options, root_dir):
+    customer, store_sales = spec(root_dir, "customer", 6), spec(root_dir, "store_sales", 4, 2)
+    _generate(options, customer)
+    _generate(options, store_sales)
+    report = {t.table: t for t in file_size_report(root_dir, target_bytes=10**9)}
+    assert report["customer"].files == 6 and report["customer"].target_files == 1
+    assert report["customer"].undersized and report["store_sales"].undersized
+
+    compact_dataset(root_dir, target_bytes=10**9, workers=2)
+    files = {t.table: t.files for t in file_size_report(root_dir, target_bytes=10**9)}
+    # store_sales shares its commit log with store_returns, so it is left alone.
+    assert files == {"customer": 1, "store_sales": 4, "store_returns": 2}
+
+
+def test_compaction_of_a_delta_table_is_an_optimize(options, root_dir):
+    customer = spec(root_dir, "customer", 4, file_format="delta")
+    _generate(options, customer)
+    before = read_rows(root_dir, "customer")
+
+    compact_table(root_dir, "customer", 1)
+    log = DeltaLog(f"{root_dir}/customer")
+    log.update()
+    (name,) = log.files
+    assert sorted(n for n in os.listdir(f"{root_dir}/customer") if not n.startswith("_")) == [name]
+    assert read_rows(root_dir, "customer").equals(before)
+    with open(os.path.join(log.directory, f"{log.version:020d}.json")) as f:
+        assert '"operation": "OPTIMIZE"' in f.readline()
+
+
+def test_compaction_of_a_delta_table_without_a_commit_log_keeps_removed_files(options, root_dir):
+    customer = spec(root_dir, "customer", 4, file_format="delta")
+    _generate(options, customer)
+    before = read_rows(root_dir, "customer")
+    shutil.rmtree(os.path.join(customer.location, "_commits"))
+    removed = os.path.join(customer.location, "part-00009.parquet")  # dropped from the log, not vacuumed yet
+    shutil.copy(os.path.join(customer.location, "part-00001.parquet"), removed)
+
+    assert compact_table(root_dir, "customer", 1) == (4, 1)
+    log = DeltaLog(customer.location)
+    log.update()
+    (name,) = log.files
+    assert sorted(n for n in os.listdir(customer.location) if not n.startswith("_")) == sorted([name, "part-00009.parquet"])
+    assert pq.read_table(os.path.join(customer.location, name)).equals(before)
@@ -0,0 +1,61 @@
+import json
+
+from tpcds_datagen.commitlog import OutputFile
+from tpcds_datagen.delta import DeltaLog
+
+SCHEMA = json.dumps({"type": "struct", "fields": [{"name": "id", "type": "long", "nullable": True, "metadata": {}}]})
+
+
+def _output(name: str, rows: int, size: int) -> OutputFile:
+    stats = {"numRecords": rows, "minValues": {}, "maxValues": {}, "nullCount": {}}
+    return OutputFile("t", f"t/{name}", rows, size, [1], None, stats)
+
+
+def _replayed(location: str) -> DeltaLog:
+    log = DeltaLog(location)
+    log.update()
+    return log
+
+
+def test_sync_adds_and_removes_files(tmp_path):
+    location = str(tmp_path / "t")
+    log = DeltaLog(location)
+    log.create(SCHEMA, [])
+    assert log.sync(str(tmp_path), "t", [_output("a.parquet", 10, 100), _output("b.parquet", 5, 50)]) == 1
+    assert log.sync(str(tmp_path), "t", [_output("a.parquet", 10, 100), _output("b.parquet", 5, 50)]) is None
+
+    # b is replaced by c with other rows: a data change.
+    assert log.sync(str(tmp_path), "t", [_output("a.parquet", 10, 100), _output("c.parquet", 7, 70)]) == 2
+    replayed = _replayed(location)
+    assert sorted(replayed.files) == ["a.parquet", "c.parquet"]
+    assert replayed.files["c.parquet"]["dataChange"] is True
+
+    # a and c are rewritten into d with the same rows: an OPTIMIZE.
+    log.sync(str(tmp_path), "t", [_output("d.parquet", 17, 150)])
+    replayed = _replayed(location)
+    assert sorted(replayed.files) == ["d.parquet"]
+    with open(replayed._path(replayed.version)) as f:
+        actions = [json.loads(line) for line in f]
+    assert actions[0]["commitInfo"]["operation"] == "OPTIMIZE"
+    assert all(not action[kind]["dataChange"] for action in actions[1:] for kind in action)
+
+
+def test_a_stale_writer_retries_at_the_next_version(tmp_path):
+    location = str(tmp_path / "t")
+    first, second = DeltaLog(location), DeltaLog(location)
+    first.create(SCHEMA, [])
+    second.update()
+    first.sync(str(tmp_path), "t", [_output("a.parquet", 10, 100)])
+    assert not second.commit([], "WRITE")  # version 1 is taken
+    assert second.sync(str(tmp_path), "t", [_output("a.parquet", 10, 100), _output("b.parquet", 1, 10)]) == 2
+    assert sorted(_replayed(location).files) == ["a.parquet", "b.parquet"]
+
+
+def test_partition_values_come_from_the_path(tmp_path):
+    location = str(tmp_path / "t")
+    log = DeltaLog(location)
+    log.create(SCHEMA, ["d"])
+    log.sync(str(tmp_path), "t", [_output("d=7/a.parquet", 1, 10), _output("d=__HIVE_DEFAULT_PARTITION__/b.parquet", 1, 10)])
+    files = _replayed(location).files
+    assert files["d=7/a.parquet"]["partitionValues"] == {"d": "7"}
+    assert files["d=__HIVE_DEFAULT_PARTITION__/b.parquet"]["partitionValues"] == {"d": None}
@@ -0,0 +1,40 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tpcds_datagen.fs import write_text
+
+
+def _no_hard_links(src, dst):
+    raise PermissionError(1, "Operation not permitted", dst)
+
+
+@pytest.mark.parametrize("hard_links", [True, False])
+def test_exclusive_write_has_one_winner(tmp_path, monkeypatch, hard_links):
+    if not hard_links:
+        monkeypatch.setattr(os, "link", _no_hard_links)
+    path = str(tmp_path / "_log" / "00001.json")
+    with ThreadPoolExecutor(8) as pool:
+        won = list(pool.map(lambda n: write_text(path, f"writer {n}", exclusive=True), range(32)))
+    assert won.count(True) == 1
+    with open(path) as f:
+        assert f.read() == f"writer {won.index(True)}"
+    assert os.listdir(tmp_path / "_log") == ["00001.json"]  # no temporary files left behind
+
+
+def test_exclusive_write_does_not_trust_existence_checks(tmp_path, monkeypatch):
+    path = str(tmp_path / "00001.json")
+    assert write_text(path, "first", exclusive=True)
+    monkeypatch.setattr(os, "link", _no_hard_links)
+    monkeypatch.setattr(os.path, "exists", lambda p: False)  # a FUSE mount with stale metadata
+    assert not write_text(path, "second", exclusive=True)
+    with open(path) as f:
+        assert f.read() == "first"
+
+
+def test_non_exclusive_write_replaces(tmp_path):
+    path = str(tmp_path / "plan.json")
+    assert write_text(path, "first") and write_text(path, "second")
+    with open(path) as f:
+        assert f.read() == "second"
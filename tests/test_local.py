@@ -0,0 +1,64 @@
+import os
+from dataclasses import replace
+
+from conftest import FAKE_ROWS, read_rows, spec
+
+from tpcds_datagen.delta import DeltaLog
+from tpcds_datagen.local import LocalGenerator, main
+from tpcds_datagen.manifest import MANIFEST_FILE, load_manifest, manifest_files
+
+
+def test_local_engine_writes_paired_tables_and_manifests(options, root_dir):
+    specs = [spec(root_dir, "customer", 3), spec(root_dir, "store_sales", 4, paired_returns_partitions=2)]
+    results = LocalGenerator(options, workers=2).run(specs)
+
+    assert [r.spec.table for r in results] == ["store_sales", "customer"]  # longest first
+    assert read_rows(root_dir, "customer").num_rows == FAKE_ROWS
+    assert read_rows(root_dir, "store_sales").num_rows == FAKE_ROWS
+    assert read_rows(root_dir, "store_returns").num_rows == FAKE_ROWS // 10
+    dataset = load_manifest(f"{root_dir}/{MANIFEST_FILE}")
+    assert dataset["complete"]
+    assert sorted(dataset["tables"]) == ["customer", "store_returns", "store_sales"]
+    assert dataset["tables"]["store_returns"]["rows"] == FAKE_ROWS // 10
+    assert manifest_files(root_dir, "customer") == [f"{root_dir}/customer/part-0000{n}.parquet" for n in (1, 2, 3)]
+
+
+def test_resume_reruns_only_missing_units(options, root_dir):
+    customer = spec(root_dir, "customer", 4)
+    LocalGenerator(options, workers=2).run([customer])
+    first = {name: os.path.getmtime(os.path.join(root_dir, "customer", name)) for name in os.listdir(f"{root_dir}/customer")}
+    os.remove(os.path.join(root_dir, "customer", "part-00003.parquet"))
+
+    LocalGenerator(replace(options, resume=True), workers=2).run([customer])
+    assert read_rows(root_dir, "customer").column("c_customer_sk").to_pylist() == list(range(FAKE_ROWS))
+    assert os.path.getmtime(os.path.join(root_dir, "customer", "part-00001.parquet")) == first["part-00001.parquet"]
+
+
+def test_partitioned_table_has_the_rows_of_the_flat_one(options, tmp_path):
+    flat = spec(str(tmp_path / "flat"), "store_sales", 4)
+    partitioned = spec(str(tmp_path / "partitioned"), "store_sales", 4)
+    LocalGenerator(options, workers=2).run([flat])
+    LocalGenerator(replace(options, partition_tables=True), workers=2).run([partitioned])
+
+    directories = [d for d in os.listdir(f"{partitioned.root_dir}/store_sales") if not d.startswith("_")]
+    assert directories and all(d.startswith("ss_sold_date_sk=") for d in directories)
+    flat_rows = read_rows(flat.root_dir, "store_sales").drop(["ss_sold_date_sk"])
+    partitioned_rows = read_rows(partitioned.root_dir, "store_sales")
+    key = [(name, "ascending") for name in flat_rows.column_names]
+    assert partitioned_rows.sort_by(key).equals(flat_rows.sort_by(key))
+
+def test_delta_log_lists_the_committed_files(options, root_dir):
+    customer = spec(root_dir, "customer", 3, file_format="delta")
+    LocalGenerator(options, workers=2).run([customer])
+
+    log = DeltaLog(f"{root_dir}/customer")
+    log.update()
+    assert sorted(log.files) == ["part-00001.parquet", "part-00002.parquet", "part-00003.parquet"]
+    assert sum(f["size"] for f in log.files.values()) == sum(
+        os.path.getsize(os.path.join(root_dir, "customer", name)) for name in log.files
+    )
+
+def test_command_line(dsdgen_dir, tmp_path):
+    main(["--scale-factor", "1", "--base", str(tmp_path), "--dsdgen-dir", dsdgen_dir, "--tables", "item", "--workers", "2"])
+    (root,) = [d for d in os.listdir(tmp_path) if d.startswith("source_files_")]
+    assert read_rows(os.path.join(tmp_path, root), "item").num_rows == FAKE_ROWS
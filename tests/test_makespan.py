@@ -0,0 +1,65 @@
+import pytest
+
+from tpcds_datagen.makespan import (
+    DEFAULT_CORE_BYTES_PER_SECOND,
+    estimate_core_seconds,
+    order_longest_first,
+    predict_makespan,
+)
+from tpcds_datagen.planner import estimate_table_bytes
+from tpcds_datagen.spec import TableSpec
+from tpcds_datagen.tables import row_count
+
+
+def _spec(table, n):
+    return TableSpec(table, n, "parquet", "/data")
+
+
+def test_core_seconds_from_calibration_or_output_size():
+    spec = _spec("store_sales", 250)
+    assert estimate_core_seconds(spec, 1000, {"store_sales": 1e-6}) == pytest.approx(row_count("store_sales", 1000) * 1e-6)
+    assert estimate_core_seconds(spec, 1000, {"item": 1.0}) == pytest.approx(
+        estimate_table_bytes("store_sales", 1000) / DEFAULT_CORE_BYTES_PER_SECOND
+    )
+
+
+def test_longest_first():
+    specs = [_spec("item", 1), _spec("store_sales", 4), _spec("inventory", 2)]
+    work = {"item": 1.0, "store_sales": 100.0, "inventory": 10.0}
+    assert [s.table for s in order_longest_first(specs, work)] == ["store_sales", "inventory", "item"]
+
+
+def test_one_table_runs_in_waves_of_tasks():
+    estimate = predict_makespan([_spec("store_sales", 8)], {"store_sales": 800.0}, cores=4, max_jobs=8)
+    assert estimate.makespan == pytest.approx(200.0)
+    assert estimate.lower_bound == pytest.approx(200.0)
+    assert [(j.table, j.start, j.finish) for j in estimate.jobs] == [("store_sales", 0.0, 200.0)]
+
+
+def test_a_table_waits_until_a_task_slot_frees_up():
+    specs = [_spec("store_sales", 4), _spec("item", 4)]
+    estimate = predict_makespan(specs, {"store_sales": 400.0, "item": 40.0}, cores=4, max_jobs=8)
+    item = {j.table: j for j in estimate.jobs}["item"]
+    assert item.start == pytest.approx(100.0)
+    assert estimate.makespan == pytest.approx(110.0)
+    assert estimate.lower_bound == pytest.approx(110.0)
+
+
+def test_small_tables_share_the_cores():
+    specs = [_spec("reason", 1), _spec("ship_mode", 1), _spec("income_band", 1)]
+    work = {"reason": 10.0, "ship_mode": 10.0, "income_band": 10.0}
+    assert predict_makespan(specs, work, cores=4, max_jobs=8).makespan == pytest.approx(10.0)
+    # Only two tables at a time.
+    assert predict_makespan(specs, work, cores=4, max_jobs=2).makespan == pytest.approx(20.0)
+
+
+def test_longest_first_shortens_the_tail():
+    specs = [_spec("item", 4), _spec("store_sales", 1)]
+    work = {"item": 40.0, "store_sales": 100.0}
+    in_plan_order = predict_makespan(specs, work, cores=4, max_jobs=8)
+    longest_first = predict_makespan(order_longest_first(specs, work), work, cores=4, max_jobs=8)
+    assert in_plan_order.makespan == pytest.approx(110.0)  # store_sales waits for the first item task
+    assert longest_first.makespan == pytest.approx(100.0)
+    lines = in_plan_order.describe().splitlines()
+    assert [line.split()[0] for line in lines[1:3]] == ["item", "store_sales"]
+    assert lines[-1] == "predicted makespan: 0.03 h (lower bound 0.03 h, 1.10x)"
@@ -0,0 +1,50 @@
+from dataclasses import replace
+
+from conftest import spec
+
+from tpcds_datagen.chunks import prepare_units, run_unit
+from tpcds_datagen.manifest import MANIFEST_FILE, ManifestWriter, load_manifest, manifest_files, start_dataset_manifest
+
+
+def test_manifests_follow_the_commits(options, root_dir):
+    store_sales = spec(root_dir, "store_sales", 4, 2)
+    units = prepare_units(store_sales, options, 2)
+    writer = ManifestWriter(store_sales, interval=0)
+    assert load_manifest(f"{root_dir}/store_sales/{MANIFEST_FILE}")["files"] == []
+
+    writer.add(run_unit(store_sales, options, "snappy", units[1]))
+    sales = load_manifest(f"{root_dir}/store_sales/{MANIFEST_FILE}")
+    assert [f["path"] for f in sales["files"]] == ["store_sales/part-00003.parquet", "store_sales/part-00004.parquet"]
+    assert not sales["complete"]
+    assert manifest_files(root_dir, "store_sales") is None
+    assert len(manifest_files(root_dir, "store_returns", complete=False)) == 1
+    assert not load_manifest(f"{root_dir}/{MANIFEST_FILE}")["complete"]
+
+    run_unit(store_sales, options, "snappy", units[0])
+    writer.finish()
+    assert manifest_files(root_dir, "store_sales") == [f"{root_dir}/store_sales/part-0000{n}.parquet" for n in range(1, 5)]
+    dataset = load_manifest(f"{root_dir}/{MANIFEST_FILE}")
+    assert dataset["complete"] and sorted(dataset["tables"]) == ["store_returns", "store_sales"]
+    assert dataset["tables"]["store_sales"]["rows"] == sum(f["rows"] for f in sales["files"]) * 2
+
+
+def test_the_dataset_is_complete_once_every_planned_table_is(options, root_dir):
+    customer, item = spec(root_dir, "customer", 1), spec(root_dir, "item", 1)
+    start_dataset_manifest([customer, item], options)
+    dataset = load_manifest(f"{root_dir}/{MANIFEST_FILE}")
+    assert sorted(dataset["tables"]) == ["customer", "item"] and not dataset["complete"]
+
+    for table_spec in (customer, item):
+        writer = ManifestWriter(table_spec)
+        run_unit(table_spec, options, "snappy", prepare_units(table_spec, options, 1)[0])
+        writer.finish()
+        complete = load_manifest(f"{root_dir}/{MANIFEST_FILE}")["complete"]
+        assert complete == (table_spec is item)
+
+    # A rerun marks the tables it overwrites incomplete again; a resume keeps their files.
+    start_dataset_manifest([item], replace(options, resume=True))
+    dataset = load_manifest(f"{root_dir}/{MANIFEST_FILE}")
+    assert not dataset["complete"] and dataset["tables"]["customer"]["complete"]
+    assert len(dataset["tables"]["item"]["files"]) == 1
+    start_dataset_manifest([item], options)
+    assert load_manifest(f"{root_dir}/{MANIFEST_FILE}")["tables"]["item"]["files"] == []
@@ -0,0 +1,77 @@
+import os
+
+import pyarrow.parquet as pq
+import pytest
+from conftest import FAKE_ROWS
+
+from tpcds_datagen.pairs import child_groups, write_pair_group
+from tpcds_datagen.spec import GenerationOptions, TableSpec, pair_sales_returns, validate_plan
+
+
+def test_returns_specs_fold_into_their_sales_specs():
+    plan = [
+        TableSpec("store_sales", 8, "parquet", "/data"),
+        TableSpec("item", 1, "parquet", "/data"),
+        TableSpec("store_returns", 2, "parquet", "/data"),
+        TableSpec("web_sales", 4, "parquet", "/data"),
+        TableSpec("catalog_sales", 4, "csv", "/data"),
+        TableSpec("catalog_returns", 2, "csv", "/data"),
+    ]
+    paired = pair_sales_returns(plan)
+    assert [(s.table, s.paired_returns_partitions) for s in paired] == [
+        ("store_sales", 2),
+        ("item", None),
+        ("web_sales", None),  # no web_returns in the plan
+        ("catalog_sales", None),  # paired generation writes Parquet only
+        ("catalog_returns", None),
+    ]
+    assert paired[0].tables == ("store_sales", "store_returns")
+
+
+def test_sales_and_returns_of_other_roots_stay_apart():
+    plan = [TableSpec("store_sales", 8, "parquet", "/a"), TableSpec("store_returns", 2, "parquet", "/b")]
+    assert pair_sales_returns(plan) == plan
+
+
+def test_only_parquet_or_delta_tables_of_one_format_are_paired():
+    for sales_format, returns_format in (("csv", "csv"), ("parquet", "delta"), ("json", "parquet")):
+        plan = [TableSpec("web_sales", 8, sales_format, "/a"), TableSpec("web_returns", 2, returns_format, "/a")]
+        assert pair_sales_returns(plan) == plan
+    plan = [TableSpec("web_sales", 8, "delta", "/a"), TableSpec("web_returns", 2, "delta", "/a")]
+    assert [s.tables for s in pair_sales_returns(plan)] == [("web_sales", "web_returns")]
+
+
+def test_a_paired_table_cannot_be_planned_again():
+    with pytest.raises(ValueError, match="store_returns appears more than once"):
+        validate_plan([TableSpec("store_sales", 8, "parquet", "/data", 2), TableSpec("store_returns", 2, "parquet", "/data")])
+    with pytest.raises(ValueError):
+        TableSpec("item", 1, "parquet", "/data", 2)
+
+
+def test_child_groups_are_consecutive_runs():
+    assert child_groups(10, 3) == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]]
+    assert child_groups(2, 8) == [[1], [2]]
+    assert child_groups(5, 0) == [[1, 2, 3, 4, 5]]
+
+
+def test_a_group_writes_one_sales_file_per_child_and_one_returns_file(dsdgen_dir, tmp_path):
+    spec = TableSpec("store_sales", 4, "parquet", str(tmp_path / "data"), 2)
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+    files, metrics = write_pair_group(spec, GenerationOptions(1, dsdgen_dir=dsdgen_dir), "snappy", 2, [3, 4], str(work_dir))
+
+    assert [(f.table, f.path, f.rows) for f in files] == [
+        ("store_sales", "store_sales/part-00003.parquet", FAKE_ROWS // 4),
+        ("store_sales", "store_sales/part-00004.parquet", FAKE_ROWS // 4),
+        ("store_returns", "store_returns/part-00002.parquet", FAKE_ROWS // 20),
+    ]
+    assert all(f.bytes == os.path.getsize(tmp_path / "data" / f.path) for f in files)
+    assert [(m.table, m.child, m.rows) for m in metrics] == [
+        ("store_sales", 3, FAKE_ROWS // 4),
+        ("store_returns", 3, FAKE_ROWS // 40),
+        ("store_sales", 4, FAKE_ROWS // 4),
+        ("store_returns", 4, FAKE_ROWS // 40),
+    ]
+    assert not [name for name in os.listdir(work_dir) if name.endswith(".dat")]
+    sales = pq.read_table(tmp_path / "data" / "store_sales" / "part-00003.parquet")
+    assert sales.column("ss_item_sk").to_pylist()[0] == FAKE_ROWS // 2 * 13 % 100000 + 2
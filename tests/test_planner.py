@@ -0,0 +1,64 @@
+import pytest
+
+from tpcds_datagen.planner import describe_partition_plan, estimate_table_bytes, plan_num_partitions
+from tpcds_datagen.spec import NUM_PARTITIONS_SF1000
+from tpcds_datagen.tables import FIXED_ROW_COUNTS, SPEC_ROW_COUNTS, SPEC_SCALE_FACTORS, TABLES, row_count
+
+
+def test_row_counts_at_the_published_scale_factors():
+    assert row_count("store_sales", 1) == 2880404
+    assert row_count("store_sales", 1000) == 2879987999
+    assert row_count("catalog_sales", 100000) == 143999334399
+    assert row_count("customer", 10000) == 65000000
+    assert row_count("web_site", 100) == 24
+    assert row_count("inventory", 300) == 585684000
+    for table, counts in SPEC_ROW_COUNTS.items():
+        assert len(counts) == len(SPEC_SCALE_FACTORS), table
+        assert [row_count(table, sf) for sf in SPEC_SCALE_FACTORS] == list(counts)
+        if table not in ("call_center", "web_site"):  # the only counts that do not grow with every scale factor
+            assert all(a < b for a, b in zip(counts, counts[1:])), table
+
+
+def test_fixed_tables_have_one_size():
+    for table, rows in FIXED_ROW_COUNTS.items():
+        assert {row_count(table, sf) for sf in (1, 7, 1000, 250000)} == {rows}
+    assert set(FIXED_ROW_COUNTS) | set(SPEC_ROW_COUNTS) == set(TABLES)
+
+
+def test_row_counts_between_and_beyond_the_published_scale_factors():
+    assert row_count("customer", 5) == round(100000 + 4 / 9 * (500000 - 100000))
+    assert row_count("store_sales", 2000) == round(2879987999 + (8639936081 - 2879987999) / 2)
+    assert row_count("store_sales", 200000) == 2 * 287997818084
+    assert row_count("item", 200000) == 502000
+
+
+def test_row_count_rejects_unknown_tables_and_scale_factors():
+    with pytest.raises(ValueError):
+        row_count("store_salez", 1)
+    with pytest.raises(ValueError):
+        row_count("store_sales", 0)
+
+
+def test_plan_reproduces_the_hand_tuned_fact_tables_at_sf1000():
+    plan = plan_num_partitions(1000)
+    for table in ("store_sales", "catalog_sales", "web_sales", "inventory", "catalog_returns"):
+        assert plan[table] == NUM_PARTITIONS_SF1000[table], table
+    for table in ("store_returns", "web_returns"):
+        assert abs(plan[table] - NUM_PARTITIONS_SF1000[table]) <= 1, table
+    assert plan["date_dim"] == plan["customer_address"] == 1
+
+
+def test_plan_follows_the_target_and_the_bytes_per_row():
+    assert plan_num_partitions(1000, 250 * 2**20, tables=["store_sales"]) == {"store_sales": 500}
+    plan = plan_num_partitions(1, 1000, bytes_per_row={"store": 1000.0}, tables=["store", "reason"])
+    assert plan == {"store": 12, "reason": 2}  # never more files than rows
+    assert estimate_table_bytes("store", 1, {"store": 1000.0}) == 12000
+    with pytest.raises(ValueError):
+        plan_num_partitions(1, 0)
+
+
+def test_describe_partition_plan_lists_every_table():
+    plan = plan_num_partitions(100, tables=["store_sales", "item"])
+    lines = describe_partition_plan(plan, 100).splitlines()
+    assert len(lines) == 3
+    assert lines[1].split()[:2] == ["store_sales", "287,997,024"]
@@ -0,0 +1,150 @@
+import io
+import threading
+import time
+
+import pytest
+
+from tpcds_datagen import profiling
+from tpcds_datagen.commitlog import ChunkMetrics
+from tpcds_datagen.convert import TimedReader, read_blocks
+from tpcds_datagen.profiling import StackSampler, StageClock, profile_path, sample_stacks, summarize_stages
+from tpcds_datagen.spec import GenerationOptions
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(profiling.time, "perf_counter", clock)
+    monkeypatch.setattr(profiling.time, "thread_time", clock)
+    return clock
+
+
+def test_nested_stages_are_taken_off_the_enclosing_one(clock):
+    stages = StageClock(cpu=True)
+    with stages.stage("parse"):
+        clock.now = 1.0
+        with stages.stage("dsdgen"):
+            assert stages.current() == "dsdgen"
+            clock.now = 3.0
+        assert stages.current() == "parse"
+        clock.now = 4.0
+    clock.now = 10.0  # outside any stage
+    with stages.stage("write"):
+        clock.now = 10.5
+    assert stages.current() is None
+    assert stages.wall == {"dsdgen": 2.0, "parse": 2.0, "encode": 0.0, "write": 0.5}
+    assert stages.cpu == stages.wall
+
+
+def test_a_stage_on_another_thread_does_not_nest(clock):
+    stages = StageClock()
+    entered, leave = threading.Event(), threading.Event()
+
+    def other():
+        with stages.stage("dsdgen"):
+            entered.set()
+            leave.wait()
+
+    thread = threading.Thread(target=other)
+    with stages.stage("parse"):
+        thread.start()
+        entered.wait()
+        assert stages.current() == "parse" and stages.current(thread.ident) == "dsdgen"
+        clock.now = 2.0
+    leave.set()
+    thread.join()
+    assert stages.wall["parse"] == 2.0
+
+
+def test_cpu_is_charged_to_the_stage_of_the_thread_that_used_it():
+    stages = StageClock(cpu=True)
+    started = threading.Event()
+
+    def busy():
+        with stages.stage("encode"):
+            started.set()
+            end = time.thread_time() + 0.2
+            while time.thread_time() < end:
+                pass
+
+    thread = threading.Thread(target=busy)
+    with stages.stage("write"):
+        thread.start()
+        started.wait()
+        thread.join()  # waiting uses no CPU of this thread
+    assert stages.cpu["encode"] >= 0.2
+    assert stages.cpu["write"] < 0.05
+
+
+def test_read_ahead_cpu_is_added_to_dsdgen():
+    data = b"".join(b"%d|row|\n" % n for n in range(10000))
+    stages = StageClock(cpu=True)
+    with TimedReader(io.BufferedReader(io.BytesIO(data)), stages, buffer_bytes=4096, read_size=1024) as reader:
+        assert b"".join(read_blocks(reader, block_size=3000)) == data
+    assert stages.cpu["dsdgen"] > 0  # read on the read-ahead thread, outside any stage
+
+
+def test_read_ahead_returns_the_stream_and_charges_waits_to_dsdgen():
+    data = b"".join(b"%d|row|\n" % n for n in range(10000))
+    stages = StageClock()
+    with TimedReader(io.BufferedReader(io.BytesIO(data)), stages, buffer_bytes=4096, read_size=1024) as reader:
+        blocks = list(read_blocks(reader, block_size=3000))
+    assert b"".join(blocks) == data
+    assert all(block.endswith(b"\n") for block in blocks) and len(blocks) > 10
+    assert stages.wall["dsdgen"] > 0 and stages.current() is None
+
+
+def test_dsdgen_cpu_is_added_when_profiling(clock):
+    timed, profiled = StageClock(), StageClock(cpu=True)
+    for stages in (timed, profiled):
+        with stages.stage("encode"):
+            clock.now += 1.0
+        stages.add("dsdgen", 7.5)
+    assert timed.cpu is None
+    assert timed.metrics("item", 3, 100, 2000, 1, "worker-1") == ChunkMetrics(
+        "item", 3, 100, 2000, 0.0, 0.0, 1.0, 0.0, attempt=1, host="worker-1"
+    )
+    metrics = profiled.metrics("item", 3, 100, 2000, 1, "worker-1")
+    assert (metrics.dsdgen_cpu_seconds, metrics.encode_cpu_seconds, metrics.parse_cpu_seconds) == (7.5, 1.0, 0.0)
+    assert metrics.cpu_seconds == 8.5 and timed.metrics("item", 3, 100, 2000, 1, "worker-1").cpu_seconds is None
+
+
+def test_stack_samples_start_with_the_stage():
+    stages = StageClock()
+    sampler = StackSampler(stages)
+    sampler._sample()
+    with stages.stage("encode"):
+        sampler._sample()
+    stacks = sorted(sampler.counts)
+    assert [stack.split(";")[0] for stack in stacks] == ["encode", "other"]
+    assert "test_stack_samples_start_with_the_stage (test_profiling.py:" in stacks[0]
+    assert sampler.folded().endswith(" 1\n")
+
+
+def test_only_the_listed_chunks_are_profiled(tmp_path):
+    options = GenerationOptions(1, profile_chunks=(("item", 2),), profile_dir=str(tmp_path / "profiles"))
+    for child in (1, 2):
+        with sample_stacks(options, "item", child, StageClock()):
+            pass
+    assert list((tmp_path / "profiles").iterdir()) == [tmp_path / "profiles" / "item-00002.folded"]
+    assert profile_path(options, "item", 2) == f"{tmp_path}/profiles/item-00002.folded"
+
+
+def test_summary_names_the_stage_that_bounds_each_table():
+    metrics = [
+        ChunkMetrics("store_sales", 1, 1000, 1, 1.0, 6.0, 2.0, 1.0, parse_cpu_seconds=5.7),
+        ChunkMetrics("store_sales", 2, 1000, 1, 1.0, 6.0, 2.0, 1.0, parse_cpu_seconds=5.7),
+        ChunkMetrics("item", 1, 10, 1, 0.1, 0.1, 0.1, 0.7),
+    ]
+    lines = summarize_stages(metrics).splitlines()
+    assert lines[0].split() == ["table", "rows", "wall", "s", "dsdgen", "parse", "encode", "write", "bound", "by"]
+    assert lines[1].split() == ["store_sales", "2,000", "20", "10%", "60%", "20%", "10%", "parse", "(CPU", "95%", "of", "wall)"]
+    assert lines[2].split() == ["item", "10", "1", "10%", "10%", "10%", "70%", "write"]
@@ -0,0 +1,113 @@
+import csv
+import json
+
+import pytest
+from conftest import spec
+
+from tpcds_datagen import progress
+from tpcds_datagen.commitlog import ChunkCommit, ChunkMetrics, CommitLog, OutputFile
+from tpcds_datagen.progress import ProgressMonitor, save_metrics
+from tpcds_datagen.tables import row_count
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(progress.time, "monotonic", clock)
+    return clock
+
+
+def _metrics(table, child, seconds, rows=100):
+    return ChunkMetrics(table, child, rows, 1000, seconds * 0.8, seconds * 0.1, seconds * 0.05, seconds * 0.05, host="worker-1")
+
+
+def _commit(table_spec, number, rows, seconds):
+    path = f"{table_spec.table}/part-{number:05d}.parquet"
+    files = [OutputFile(table_spec.table, path, rows, 1000)]
+    metrics = [_metrics(table_spec.table, number, seconds, rows)]
+    commit = ChunkCommit(table_spec.table, table_spec.num_partitions, number, [number], files, metrics)
+    CommitLog(table_spec.location).record(commit)
+
+
+def test_rows_per_second_and_eta(root_dir, clock):
+    item = spec(root_dir, "item", 4)
+    messages = []
+    monitor = ProgressMonitor([item], 1, output=messages.append)
+    (before,) = monitor.snapshot()
+    assert (before.units, before.committed, before.eta_seconds) == (None, 0, None)
+
+    CommitLog(item.location).save_plan(4, [[1], [2], [3], [4]])
+    monitor.snapshot()  # the table starts
+    clock.now = 10.0
+    _commit(item, 1, 4500, 1.0)
+    _commit(item, 2, 4500, 1.0)
+    (p,) = monitor.snapshot()
+    assert (p.units, p.committed, p.rows, p.expected_rows) == (4, 2, 9000, row_count("item", 1))
+    assert p.rows_per_second == 900.0
+    assert p.eta_seconds == pytest.approx(10.0)
+    assert not p.done
+
+    clock.now = 20.0
+    _commit(item, 3, 4500, 1.0)
+    _commit(item, 4, 4500, 1.0)
+    (p,) = monitor.snapshot()
+    assert p.done and p.eta_seconds == 0.0
+    assert monitor.describe([p]).splitlines()[1].split() == ["item", "4/4", "18,000", "900", "0h00m", "0"]
+
+
+def test_a_resumed_run_counts_only_its_own_rows(root_dir, clock):
+    item = spec(root_dir, "item", 4)
+    CommitLog(item.location).save_plan(4, [[1], [2], [3], [4]])
+    _commit(item, 1, 4500, 1.0)
+    _commit(item, 2, 4500, 1.0)
+    monitor = ProgressMonitor([item], 1, output=lambda message: None)
+    monitor.snapshot()
+    clock.now = 30.0
+    _commit(item, 3, 4500, 1.0)
+    (p,) = monitor.snapshot()
+    assert p.rows == 13500 and p.rows_per_second == 150.0
+    assert p.eta_seconds == pytest.approx(30.0)
+
+
+def test_slow_chunks_are_reported_once(root_dir, clock):
+    item = spec(root_dir, "item", 6)
+    CommitLog(item.location).save_plan(6, [[n] for n in range(1, 7)])
+    for number in range(1, 6):
+        _commit(item, number, 100, 1.0)
+    _commit(item, 6, 100, 5.0)
+    messages = []
+    monitor = ProgressMonitor([item], 1, output=messages.append)
+    (p,) = monitor.snapshot()
+    monitor.snapshot()
+    assert p.slow_chunks == 1
+    assert messages == ["WARNING item child 6 on worker-1: 5.0x the median time per row (dsdgen 80% of 5s, attempt 0)"]
+
+
+def test_metrics_are_saved_as_json_and_csv(tmp_path):
+    metrics = [_metrics("item", 1, 2.0), _metrics("reason", 1, 1.0)]
+    save_metrics(metrics, str(tmp_path / "metrics.json"))
+    save_metrics(metrics, str(tmp_path / "metrics.csv"))
+    with open(tmp_path / "metrics.json") as f:
+        assert [ChunkMetrics(**m) for m in json.load(f)] == metrics
+    with open(tmp_path / "metrics.csv") as f:
+        rows = list(csv.DictReader(f))
+    assert [(r["table"], float(r["dsdgen_seconds"])) for r in rows] == [("item", 1.6), ("reason", 0.8)]
+
+
+def test_monitor_reports_and_saves_when_the_run_ends(root_dir, tmp_path):
+    item = spec(root_dir, "item", 1)
+    CommitLog(item.location).save_plan(1, [[1]])
+    messages = []
+    with ProgressMonitor([item], 1, interval=3600, metrics_path=str(tmp_path / "metrics"), output=messages.append):
+        _commit(item, 1, 100, 1.0)
+    assert messages[0].splitlines()[1].split()[:2] == ["item", "1/1"]
+    assert messages[-1] == f"Saved chunk metrics to {tmp_path}/metrics.json and .csv"
+    assert (tmp_path / "metrics.csv").exists()
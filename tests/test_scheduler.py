@@ -0,0 +1,166 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from tpcds_datagen.driver import TableResult
+from tpcds_datagen.scheduler import ConcurrentGenerator
+from tpcds_datagen.spec import GenerationOptions, TableSpec
+
+
+class FakeTracker:
+    def __init__(self):
+        self.groups = {}  # job group -> [(status, [(numTasks, numCompletedTasks)])]
+
+    def getJobIdsForGroup(self, group):
+        return [(group, i) for i in range(len(self.groups.get(group, [])))]
+
+    def getJobInfo(self, job_id):
+        group, i = job_id
+        status, stages = self.groups[group][i]
+        return SimpleNamespace(status=status, stageIds=[(group, i, s) for s in range(len(stages))])
+
+    def getStageInfo(self, stage_id):
+        group, i, s = stage_id
+        tasks, completed = self.groups[group][i][1][s]
+        return SimpleNamespace(numTasks=tasks, numCompletedTasks=completed)
+
+
+class FakeSparkContext:
+    defaultParallelism = 16
+
+    def __init__(self):
+        self.tracker = FakeTracker()
+        self._local = threading.local()
+
+    def statusTracker(self):
+        return self.tracker
+
+    def setLocalProperty(self, key, value):
+        self._local.__dict__[key] = value
+
+    def getLocalProperty(self, key):
+        return self._local.__dict__.get(key)
+
+    def setJobGroup(self, group, description, interruptOnCancel=False):
+        self.setLocalProperty("spark.jobGroup.id", group)
+        self.setLocalProperty("spark.job.description", description)
+        self.setLocalProperty("spark.job.interruptOnCancel", str(interruptOnCancel).lower())
+
+
+class BlockingDriver:
+    """Generates nothing: each table runs until the test releases it."""
+
+    def __init__(self):
+        self.sc = FakeSparkContext()
+        self.spark = SimpleNamespace(sparkContext=self.sc, conf={"spark.scheduler.mode": "FAIR"})
+        self.options = GenerationOptions(1000)
+        self.release = {}
+        self.started = []
+        self.pools = {}
+        self.groups = {}
+        self.planned = None
+
+    def start_manifests(self, plan):
+        self.planned = [spec.table for spec in plan]
+
+    def generate(self, spec):
+        self.pools[spec.table] = self.sc.getLocalProperty("spark.scheduler.pool")
+        self.groups[spec.table] = self.sc.getLocalProperty("spark.jobGroup.id")
+        self.started.append(spec.table)
+        self.release[spec.table].wait(10)
+        return TableResult(spec, 0.0)
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 10
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_outstanding_tasks_come_from_the_running_stages():
+    driver = BlockingDriver()
+    generator = ConcurrentGenerator(driver, max_concurrent_tasks=10)
+    spec = TableSpec("store_sales", 250, "parquet", "/data")
+    assert generator.outstanding_tasks(spec) == 10  # not started yet: numPartitions, capped at the slots
+
+    driver.sc.tracker.groups["tpcds_store_sales"] = [("SUCCEEDED", [(5, 5)]), ("RUNNING", [(250, 246), (3, 1)])]
+    assert generator.outstanding_tasks(spec) == 6
+
+
+def test_tables_start_only_while_tasks_are_below_the_slots():
+    driver = BlockingDriver()
+    specs = [
+        TableSpec("store_sales", 8, "parquet", "/data"),
+        TableSpec("catalog_sales", 4, "parquet", "/data"),
+        TableSpec("item", 2, "parquet", "/data"),
+    ]
+    driver.release = {spec.table: threading.Event() for spec in specs}
+    generator = ConcurrentGenerator(driver, max_concurrent_tasks=10, poll_seconds=0.01)
+    results = []
+    runner = threading.Thread(target=lambda: results.extend(generator.run(specs)))
+    runner.start()
+
+    _wait_for(lambda: len(driver.started) == 2)
+    time.sleep(0.1)
+    assert driver.planned == ["store_sales", "catalog_sales", "item"]  # before any table starts
+    assert driver.started == ["store_sales", "catalog_sales"]  # 8 + 4 tasks outstanding: item waits
+    driver.release["store_sales"].set()
+    _wait_for(lambda: len(driver.started) == 3)
+    driver.release["catalog_sales"].set()
+    driver.release["item"].set()
+    runner.join(10)
+
+    assert sorted(r.spec.table for r in results) == ["catalog_sales", "item", "store_sales"]
+    assert driver.pools == {t: f"tpcds_{t}" for t in ("store_sales", "catalog_sales", "item")}
+
+
+def test_pool_and_job_group_are_cleared_after_each_table():
+    driver = BlockingDriver()
+    generator = ConcurrentGenerator(driver)
+    spec = TableSpec("item", 2, "parquet", "/data")
+    driver.release = {"item": threading.Event()}
+    driver.release["item"].set()
+    generator._generate(spec)
+    driver.release = {}  # generate now fails
+    with pytest.raises(KeyError):
+        generator._generate(spec)
+
+    assert driver.pools == driver.groups == {"item": "tpcds_item"}
+    assert driver.sc._local.__dict__ == dict.fromkeys(
+        ["spark.scheduler.pool", "spark.jobGroup.id", "spark.job.description", "spark.job.interruptOnCancel"]
+    )
+
+def test_max_jobs_bounds_the_running_tables():
+    driver = BlockingDriver()
+    specs = [TableSpec(table, 1, "parquet", "/data") for table in ("reason", "ship_mode", "income_band")]
+    driver.release = {spec.table: threading.Event() for spec in specs}
+    generator = ConcurrentGenerator(driver, max_concurrent_tasks=10, max_jobs=2, poll_seconds=0.01)
+    runner = threading.Thread(target=generator.run, args=(specs,))
+    runner.start()
+
+    _wait_for(lambda: len(driver.started) == 2)
+    time.sleep(0.1)
+    assert len(driver.started) == 2
+    for event in driver.release.values():
+        event.set()
+    runner.join(10)
+    assert sorted(driver.started) == ["income_band", "reason", "ship_mode"]
+
+
+def test_a_table_planned_twice_is_rejected():
+    generator = ConcurrentGenerator(BlockingDriver())
+    with pytest.raises(ValueError):
+        generator.run([TableSpec("item", 1, "parquet", "/data"), TableSpec("item", 2, "parquet", "/data")])
+
+
+def test_order_starts_the_longest_tables_first():
+    specs = [TableSpec(table, 1, "parquet", "/data") for table in ("item", "store_sales", "inventory")]
+    costs = {"item": 1.0, "store_sales": 1e-3, "inventory": 1e-9}
+    plan, work = ConcurrentGenerator(BlockingDriver(), core_seconds_per_row=costs).order(specs)
+    assert [s.table for s in plan] == ["store_sales", "item", "inventory"]
+    assert work["item"] == 300000.0
+    plan, _ = ConcurrentGenerator(BlockingDriver(), core_seconds_per_row=costs, longest_first=False).order(specs)
+    assert [s.table for s in plan] == ["item", "store_sales", "inventory"]
@@ -0,0 +1,87 @@
+import os
+import shutil
+
+import pytest
+from conftest import FAKE_ROWS, spec
+
+from tpcds_datagen import validation
+from tpcds_datagen.chunks import finish_units, prepare_units, run_unit
+from tpcds_datagen.validation import describe_validation, is_exact_row_count, validate_dataset
+
+
+@pytest.fixture(autouse=True)
+def fake_row_counts(monkeypatch):
+    """The fake dsdgen's row counts: FAKE_ROWS per table, and every tenth sale returned."""
+    counts = {"store_returns": FAKE_ROWS // 10}
+    monkeypatch.setattr(validation, "row_count", lambda table, sf: counts.get(table, FAKE_ROWS) * sf)
+
+
+def _generate(options, table_spec):
+    for unit in prepare_units(table_spec, options, 2):
+        run_unit(table_spec, options, "snappy", unit)
+    finish_units(table_spec)
+
+
+def test_exact_row_counts():
+    assert is_exact_row_count("date_dim", 7)
+    assert is_exact_row_count("customer", 1000)
+    assert is_exact_row_count("inventory", 300)
+    assert not is_exact_row_count("customer", 7)
+    assert not is_exact_row_count("store_sales", 1000)
+    assert not is_exact_row_count("store_returns", 1000)
+
+
+def test_a_complete_dataset_validates(options, root_dir):
+    _generate(options, spec(root_dir, "customer", 4))
+    _generate(options, spec(root_dir, "store_sales", 4, 2))
+    results = validate_dataset(root_dir, 1, ["customer", "store_sales", "store_returns"], workers=2)
+    assert [(r.table, r.files, r.rows, r.ok) for r in results] == [
+        ("customer", 4, FAKE_ROWS, True),
+        ("store_sales", 4, FAKE_ROWS, True),
+        ("store_returns", 2, FAKE_ROWS // 10, True),
+    ]
+
+
+def test_missing_and_uncommitted_chunk_files_are_reported(options, root_dir):
+    _generate(options, spec(root_dir, "customer", 4))
+    _generate(options, spec(root_dir, "store_sales", 4, 2))
+    customer = os.path.join(root_dir, "customer")
+    os.remove(os.path.join(customer, "part-00002.parquet"))
+    shutil.copy(os.path.join(customer, "part-00003.parquet"), os.path.join(customer, "part-00009.parquet"))
+    os.remove(os.path.join(root_dir, "store_returns", "part-00001.parquet"))
+
+    customer_result, sales_result, returns_result = validate_dataset(
+        root_dir, 1, ["customer", "store_sales", "store_returns"], workers=2
+    )
+    assert customer_result.missing == ["customer/part-00002.parquet (committed by customer unit 2)"]
+    assert customer_result.duplicates == ["customer/part-00009.parquet"]
+    assert customer_result.rows == FAKE_ROWS and customer_result.rows_ok and not customer_result.ok
+    assert sales_result.ok
+    assert returns_result.missing == ["store_returns/part-00001.parquet (committed by store_sales unit 1)"]
+    assert not returns_result.rows_ok
+
+    report = describe_validation([customer_result, returns_result])
+    assert "FAILED (row count)" in report.splitlines()[2]
+    assert "customer: duplicate or uncommitted customer/part-00009.parquet" in report
+
+
+def test_gendata_tables_are_checked_by_task_number(options, root_dir):
+    _generate(options, spec(root_dir, "customer", 4))
+    customer = os.path.join(root_dir, "customer")
+    shutil.rmtree(os.path.join(customer, "_commits"))
+    names = {1: "part-00000-a.parquet", 2: "part-00001-a.parquet", 3: "part-00003-a.parquet", 4: "part-00003-b.parquet"}
+    for child, name in names.items():
+        os.rename(os.path.join(customer, f"part-0000{child}.parquet"), os.path.join(customer, name))
+
+    (result,) = validate_dataset(root_dir, 1, ["customer"])
+    assert result.missing == ["task 2"]
+    assert result.duplicates == ["customer/part-00003-b.parquet"]
+    assert result.rows_ok
+
+
+def test_only_parquet_is_validated(root_dir):
+    os.makedirs(os.path.join(root_dir, "reason"))
+    with open(os.path.join(root_dir, "reason", "part-00000.csv"), "w") as f:
+        f.write("1|r|\n")
+    with pytest.raises(ValueError, match="only Parquet"):
+        validate_dataset(root_dir, 1, ["reason"])
@@ -0,0 +1,76 @@
+import io
+from dataclasses import replace
+
+import pyarrow.parquet as pq
+import pytest
+from conftest import FAKE_ROWS, spec
+
+from tpcds_datagen.chunks import prepare_units, run_unit
+from tpcds_datagen.convert import ParquetSink, read_batches
+from tpcds_datagen.spec import GenerationOptions
+from tpcds_datagen.writer_profiles import WriterProfile, spark_conf, tuned_writer_profiles
+
+
+def test_tuned_profiles():
+    profiles = tuned_writer_profiles()
+    assert profiles["store_sales"] == WriterProfile(codec="zstd", row_group_bytes=256 * 2**20)
+    assert profiles["web_returns"].codec == "zstd"
+    assert profiles["date_dim"].dictionary[0] == "d_day_name"
+    assert "reason" not in profiles
+    GenerationOptions(1, writer_profiles=profiles)  # every listed column exists
+
+
+def test_profiles_are_checked():
+    with pytest.raises(ValueError, match="unknown table 'sales'"):
+        GenerationOptions(1, writer_profiles={"sales": WriterProfile()})
+    with pytest.raises(ValueError, match=r"item has no columns \['d_day_name'\]"):
+        GenerationOptions(1, writer_profiles={"item": WriterProfile(dictionary=("i_brand", "d_day_name"))})
+    with pytest.raises(ValueError, match="row_group_bytes"):
+        WriterProfile(row_group_bytes=0)
+
+
+def test_spark_conf():
+    conf = spark_conf(WriterProfile(codec="zstd", compression_level=9, row_group_bytes=2**28, dictionary=("i_brand",)))
+    assert conf == {
+        "spark.sql.parquet.compression.codec": "zstd",
+        "parquet.page.size": "1048576",
+        "parquet.dictionary.page.size": "1048576",
+        "parquet.enable.dictionary": "false",
+        "parquet.block.size": "268435456",
+        "parquet.compression.codec.zstd.level": "9",
+        "parquet.enable.dictionary#i_brand": "true",
+    }
+    assert "parquet.compression.codec.zstd.level" not in spark_conf(WriterProfile(codec="gzip", compression_level=9))
+    assert "spark.sql.parquet.compression.codec" not in spark_conf(WriterProfile())  # the session's codec stays
+
+
+def test_chunks_are_written_with_the_table_profile(options, root_dir):
+    profile = WriterProfile(codec="zstd", dictionary=("c_salutation",))
+    options = replace(options, writer_profiles={"customer": profile, "item": WriterProfile(dictionary=("i_brand",))})
+    customer, item, reason = spec(root_dir, "customer", 1), spec(root_dir, "item", 1), spec(root_dir, "reason", 1)
+    for s in (customer, item, reason):
+        run_unit(s, options, "gzip", prepare_units(s, options, 1)[0])
+
+    metadata = pq.ParquetFile(f"{root_dir}/customer/part-00001.parquet").metadata
+    columns = {metadata.schema.column(i).name: metadata.row_group(0).column(i) for i in range(metadata.num_columns)}
+    assert {c.compression for c in columns.values()} == {"ZSTD"}
+    assert columns["c_salutation"].has_dictionary_page
+    assert not columns["c_first_name"].has_dictionary_page
+    item_metadata = pq.ParquetFile(f"{root_dir}/item/part-00001.parquet").metadata
+    assert item_metadata.row_group(0).column(0).compression == "GZIP"  # the profile sets no codec: the run's
+    reason_metadata = pq.ParquetFile(f"{root_dir}/reason/part-00001.parquet").metadata
+    assert reason_metadata.row_group(0).column(0).compression == "GZIP"  # no profile: the run's codec
+
+
+def test_row_groups_collect_batches_up_to_row_group_bytes(options, tmp_path):
+    lines = b"".join(b"%d|R%d|reason %d|\n" % (n, n, n) for n in range(FAKE_ROWS))
+    batches = list(read_batches("reason", io.BufferedReader(io.BytesIO(lines)), options, block_size=2**12))
+    assert len(batches) > 4
+    per_group = 2 * batches[0].nbytes
+    options = replace(options, writer_profiles={"reason": WriterProfile(row_group_bytes=per_group)})
+    with ParquetSink(str(tmp_path / "reason.parquet"), "reason", options) as sink:
+        sink.write(batches)
+
+    metadata = pq.ParquetFile(tmp_path / "reason.parquet").metadata
+    assert metadata.num_rows == FAKE_ROWS
+    assert metadata.num_row_groups == pytest.approx(len(batches) / 2, abs=1)
@@ -0,0 +1,58 @@
+"""Helpers for generating TPC-DS datasets on Databricks."""
+
+from .benchmark import (
+    BenchmarkConfig,
+    BenchmarkResult,
+    config_matrix,
+    load_results,
+    render_layout_comparison,
+    render_results,
+    render_table_metrics,
+    run_benchmark,
+)
+from .calibration import CalibrationProfile, TableCalibration, calibrate, calibrate_table
+from .catalog import (
+    ColumnStatistics,
+    TableStatistics,
+    create_table_statement,
+    dataset_statistics,
+    describe_statistics,
+    register_dataset,
+)
+from .chunks import Reconciliation, generate_chunks, reconcile
+from .commitlog import ChunkCommit, ChunkMetrics, CommitLog, OutputFile
+from .compaction import TableFileSizes, compact_dataset, compact_table, describe_file_sizes, file_size_report
+from .delta import DeltaLog, file_stats, is_delta_table
+from .driver import GenerationDriver, TableResult
+from .local import LocalGenerator
+from .makespan import MakespanEstimate, estimate_core_seconds, order_longest_first, predict_makespan
+from .manifest import ManifestWriter, load_manifest, manifest_files
+from .planner import (
+    DEFAULT_BYTES_PER_ROW,
+    DEFAULT_TARGET_FILE_BYTES,
+    describe_partition_plan,
+    estimate_table_bytes,
+    plan_num_partitions,
+)
+from .profiling import StackSampler, StageClock, summarize_stages
+from .progress import ProgressMonitor, TableProgress, collect_metrics, save_metrics
+from .scheduler import ConcurrentGenerator
+from .spec import (
+    DATALAKE_ROOT,
+    DSDGEN_DIR,
+    NUM_PARTITIONS_SF1000,
+    NUM_PARTITIONS_SF100000,
+    GenerationOptions,
+    TableSpec,
+    database_name,
+    dataset_root,
+    describe_plan,
+    pair_sales_returns,
+    scale_name,
+    table_specs,
+    validate_plan,
+)
+from .stragglers import StragglerTracker, split_factor
+from .tables import COLUMNS, FACT_TABLES, PARTITION_COLUMNS, SALES_RETURNS, TABLES, row_count
+from .validation import TableValidation, describe_validation, table_files, validate_dataset
+from .writer_profiles import LOW_CARDINALITY_COLUMNS, WriterProfile, spark_conf, tuned_writer_profiles
@@ -0,0 +1,5 @@
+"""``python -m tpcds_datagen``: generate a dataset locally, see :mod:`tpcds_datagen.local`."""
+
+from .local import main
+
+main()
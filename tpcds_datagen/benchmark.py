@@ -0,0 +1,308 @@
+"""Benchmark generation configurations and render the "Sample Results" table.
+
+Every configuration of a matrix of (scale factor, format, numPartitions,
+partitionTables, codec, column statistics) is generated from scratch, on
+the local engine or on a Spark cluster, and one JSON line per
+configuration is appended to a results file: wall and CPU time, and rows,
+bytes, files and rows/s per table. :func:`render_results` turns such a
+file into the markdown table of the 03 sf=1000 notebook, and
+:func:`render_layout_comparison` sets the flat and partitioned layouts of
+the fact tables side by side.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import platform
+import resource
+import time
+from dataclasses import asdict, dataclass, field, replace
+from typing import Iterable, Sequence
+
+from .catalog import dataset_statistics, register_dataset
+from .driver import GenerationDriver
+from .fs import list_data_files, local_path, remove_tree
+from .local import LocalGenerator
+from .planner import DEFAULT_TARGET_FILE_BYTES, plan_num_partitions
+from .progress import collect_metrics
+from .scheduler import ConcurrentGenerator
+from .spec import DSDGEN_DIR, GenerationOptions, database_name, dataset_root, table_specs
+from .tables import PARTITION_COLUMNS, TABLES
+
+ENGINES = ("local", "gendata", "chunks")
+
+
+@dataclass(frozen=True)
+class BenchmarkConfig:
+    scale_factor: int
+    file_format: str = "parquet"
+    num_partitions: int | None = None  # dsdgen tasks for every table; None plans them from target_file_mb
+    partition_tables: bool = False
+    codec: str = "snappy"
+    engine: str = "local"  # "local", or "gendata"/"chunks" on a Spark cluster
+    target_file_mb: int = DEFAULT_TARGET_FILE_BYTES // 2**20
+    chunks_per_task: int = 1  # local and chunks engines: dsdgen chunks each unit generates
+    column_stats: bool = False  # gather column statistics from the footers (and register the tables on Spark)
+
+    def __post_init__(self):
+        if self.engine not in ENGINES:
+            raise ValueError(f"engine must be one of {ENGINES}, got {self.engine!r}")
+        if self.engine != "gendata" and self.file_format not in ("parquet", "delta"):
+            raise ValueError(f"The {self.engine} engine writes Parquet or Delta only, not {self.file_format}")
+        if self.column_stats and self.file_format not in ("parquet", "delta"):
+            raise ValueError(f"Column statistics are read from Parquet footers, not {self.file_format} files")
+
+    def num_partitions_by_table(self, tables: Sequence[str] = TABLES) -> dict[str, int]:
+        if self.num_partitions is not None:
+            return {table: self.num_partitions for table in tables}
+        return plan_num_partitions(self.scale_factor, self.target_file_mb * 2**20, tables=tables)
+
+
+@dataclass
+class TableMetrics:
+    table: str
+    num_partitions: int
+    seconds: float
+    rows: int
+    bytes: int
+    files: int
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class BenchmarkResult:
+    config: BenchmarkConfig
+    environment: str  # e.g. "4 Standard_DS3_v2 workers, 16 total cores"
+    started_at: str
+    wall_seconds: float
+    # Worker and dsdgen CPU time: of the processes on the local engine, of the committed chunks on the
+    # chunks engine (without pyarrow's parser threads, see StageClock); not measured with genData.
+    cpu_seconds: float | None
+    tables: list[TableMetrics] = field(default_factory=list)
+
+    @property
+    def rows(self) -> int:
+        return sum(t.rows for t in self.tables)
+
+    @property
+    def bytes(self) -> int:
+        return sum(t.bytes for t in self.tables)
+
+    @property
+    def files(self) -> int:
+        return sum(t.files for t in self.tables)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, line: str) -> "BenchmarkResult":
+        data = json.loads(line)
+        data["config"] = BenchmarkConfig(**data["config"])
+        data["tables"] = [TableMetrics(**t) for t in data["tables"]]
+        return cls(**data)
+
+
+def config_matrix(
+    scale_factors: Iterable[int],
+    file_formats: Iterable[str] = ("parquet",),
+    num_partitions: Iterable[int | None] = (None,),
+    partition_tables: Iterable[bool] = (False,),
+    codecs: Iterable[str] = ("snappy",),
+    engine: str = "local",
+    chunks_per_task: int = 1,
+    column_stats: Iterable[bool] = (False,),
+) -> list[BenchmarkConfig]:
+    """Every combination of the given values."""
+    return [
+        BenchmarkConfig(sf, fmt, n, partitioned, codec, engine, chunks_per_task=chunks_per_task, column_stats=stats)
+        for sf, fmt, n, partitioned, codec, stats in itertools.product(
+            scale_factors, file_formats, num_partitions, partition_tables, codecs, column_stats
+        )
+    ]
+
+
+def table_output(root_dir: str, table: str, file_format: str) -> tuple[int, int, int]:
+    """Rows, bytes and data files under ``root_dir/table``.
+
+    Rows come from the Parquet footers (of Delta tables too), or from counting lines for csv/json.
+    """
+    files = list_data_files(f"{root_dir}/{table}")
+    rows = sum(_count_rows(path, file_format) for path, _ in files)
+    return rows, sum(size for _, size in files), len(files)
+
+
+def _count_rows(path: str, file_format: str) -> int:
+    if file_format in ("parquet", "delta"):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).metadata.num_rows
+    opener = open
+    if path.endswith(".gz"):
+        import gzip
+
+        opener = gzip.open
+    with opener(path, "rb") as f:
+        return sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b""))
+
+
+def _children_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def benchmark_database(config: BenchmarkConfig) -> str:
+    """The database ``column_stats`` registers the tables in, apart from the dataset's own ``tpcds...`` one."""
+    return f"benchmark_{database_name(config.scale_factor)}"
+
+
+def run_config(
+    config: BenchmarkConfig,
+    base: str,
+    dsdgen_dir: str = DSDGEN_DIR,
+    tables: Sequence[str] = TABLES,
+    spark=None,
+    workers: int | None = None,
+    environment: str | None = None,
+) -> BenchmarkResult:
+    """Generate ``tables`` for one configuration under ``base`` and measure the run."""
+    options = GenerationOptions(
+        config.scale_factor,
+        dsdgen_dir=dsdgen_dir,
+        partition_tables=config.partition_tables,
+        engine="gendata" if config.engine == "gendata" else "chunks",
+        chunks_per_task=config.chunks_per_task,
+        profile=config.engine == "chunks",  # the executors' CPU time is only known from the chunk metrics
+    )
+    specs = table_specs(config.num_partitions_by_table(tables), config.scale_factor, config.file_format, base)
+    root_dir = dataset_root(config.scale_factor, config.file_format, base)
+    remove_tree(root_dir)
+    started_at = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    start, cpu_start = time.monotonic(), _children_cpu_seconds()
+    if config.engine == "local":
+        generator = LocalGenerator(options, workers, config.codec)
+        environment = environment or f"local, {generator.workers} processes on {os.cpu_count()} cores ({platform.node()})"
+        results = generator.run(specs)
+    else:
+        if spark is None:
+            raise ValueError(f"The {config.engine} engine needs a SparkSession")
+        if config.file_format in ("parquet", "delta"):
+            spark.conf.set("spark.sql.parquet.compression.codec", config.codec)
+        environment = environment or f"{spark.sparkContext.defaultParallelism} total cores"
+        results = ConcurrentGenerator(GenerationDriver(spark, options)).run(specs)
+    if config.column_stats and spark is not None:
+        register_dataset(spark, root_dir, benchmark_database(config), config.file_format, tables)
+    elif config.column_stats:
+        dataset_statistics(root_dir, tables)
+    wall_seconds = time.monotonic() - start
+    cpu_seconds = None
+    if config.engine == "local":
+        cpu_seconds = _children_cpu_seconds() - cpu_start
+    elif config.engine == "chunks":
+        cpu_seconds = sum(m.cpu_seconds or 0.0 for m in collect_metrics(specs))
+    seconds = {r.spec.table: r.seconds for r in results}
+    metrics = []
+    for spec in specs:
+        table_seconds = seconds.get(spec.table, 0.0)
+        rows, size, files = table_output(root_dir, spec.table, config.file_format)
+        metrics.append(TableMetrics(spec.table, spec.num_partitions, table_seconds, rows, size, files))
+    return BenchmarkResult(config, environment, started_at, wall_seconds, cpu_seconds, metrics)
+
+
+def run_benchmark(
+    configs: Iterable[BenchmarkConfig],
+    results_path: str,
+    base: str,
+    dsdgen_dir: str = DSDGEN_DIR,
+    tables: Sequence[str] = TABLES,
+    spark=None,
+    workers: int | None = None,
+    environment: str | None = None,
+    keep_output: bool = False,
+) -> list[BenchmarkResult]:
+    """Run every configuration and append its result to the JSON lines file ``results_path``."""
+    results = []
+    for i, config in enumerate(configs, 1):
+        print(f"benchmark {i}: {config}")
+        result = run_config(config, base, dsdgen_dir, tables, spark, workers, environment)
+        with open(local_path(results_path), "a") as f:
+            f.write(result.to_json() + "\n")
+        if not keep_output:
+            remove_tree(dataset_root(config.scale_factor, config.file_format, base))
+            if config.column_stats and spark is not None:
+                spark.sql(f"DROP DATABASE IF EXISTS {benchmark_database(config)} CASCADE")
+        print(f"benchmark {i}: {result.wall_seconds / 60:.2f} min, {_format_bytes(result.bytes)}")
+        results.append(result)
+    return results
+
+
+def load_results(results_path: str) -> list[BenchmarkResult]:
+    with open(local_path(results_path)) as f:
+        return [BenchmarkResult.from_json(line) for line in f if line.strip()]
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 2 * 3600:
+        return f"{seconds / 60:.2f} min"
+    return f"{seconds / 3600:.2f} hours"
+
+
+def _format_bytes(size: int) -> str:
+    for unit, scale in (("TB", 1e12), ("GB", 1e9), ("MB", 1e6)):
+        if size >= scale:
+            return f"{size / scale:.3g} {unit}"
+    return f"{size / 1e3:.3g} KB"
+
+
+def render_results(results: Iterable[BenchmarkResult]) -> str:
+    """The "Sample Results" markdown table, one row per result."""
+    lines = [
+        "| File Format | Generate Column Stats | Number of dsdgen Tasks | Partition Tables | TPC-DS Scale "
+        "| Databricks Cluster Config | Duration | Storage Size |",
+        "| ----------- | --------------------- | ---------------------- | ---------------- | ------------ "
+        "| --------------------------------------- | -------- | ------------ |",
+    ]
+    for result in results:
+        config = result.config
+        tasks = config.num_partitions or f"{sum(t.num_partitions for t in result.tables)} (planned)"
+        fmt = config.file_format if config.file_format != "parquet" else f"parquet ({config.codec})"
+        lines.append(
+            f"| {fmt} | {'yes' if config.column_stats else 'no'} | {tasks} | {'yes' if config.partition_tables else 'no'} | {config.scale_factor} "
+            f"| {result.environment} | {_format_duration(result.wall_seconds)} | {_format_bytes(result.bytes)} |"
+        )
+    return "\n".join(lines)
+
+
+def render_table_metrics(result: BenchmarkResult) -> str:
+    """Per-table rows, size, files and throughput of one result."""
+    lines = [f"{'table':<24}{'numPartitions':>14}{'rows':>16}{'MB':>10}{'files':>7}{'rows/s':>12}"]
+    for t in sorted(result.tables, key=lambda t: t.bytes, reverse=True):
+        lines.append(
+            f"{t.table:<24}{t.num_partitions:>14}{t.rows:>16,}{t.bytes / 2**20:>10.1f}{t.files:>7}{t.rows_per_second:>12,.0f}"
+        )
+    cpu = f", CPU {result.cpu_seconds / 60:.2f} min" if result.cpu_seconds is not None else ""
+    lines.append(f"wall {result.wall_seconds / 60:.2f} min{cpu}, {result.rows / result.wall_seconds:,.0f} rows/s")
+    return "\n".join(lines)
+
+
+def render_layout_comparison(results: Iterable[BenchmarkResult]) -> str:
+    """Files and seconds of each partitioned table, flat against partitioned, for results that differ only in layout."""
+    by_config = {r.config: r for r in results}
+    lines = [f"{'table':<24}{'scale':>6}{'flat files':>12}{'part. files':>13}{'flat s':>9}{'part. s':>9}"]
+    for config, partitioned in by_config.items():
+        flat = by_config.get(replace(config, partition_tables=False)) if config.partition_tables else None
+        if flat is None:
+            continue
+        flat_tables = {t.table: t for t in flat.tables}
+        for t in partitioned.tables:
+            if t.table in PARTITION_COLUMNS and t.table in flat_tables:
+                f = flat_tables[t.table]
+                lines.append(
+                    f"{t.table:<24}{config.scale_factor:>6}{f.files:>12,}{t.files:>13,}{f.seconds:>9.1f}{t.seconds:>9.1f}"
+                )
+    return "\n".join(lines)
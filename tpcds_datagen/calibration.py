@@ -0,0 +1,178 @@
+"""Pilot runs that measure bytes per row for the numPartitions planner.
+
+A pilot generates a few dsdgen child chunks of each table at the target
+scale factor, writes them with the real format and codec and measures the
+rows, bytes and time it took. The result is a :class:`CalibrationProfile`
+whose ``bytes_per_row`` can be passed to :func:`plan_num_partitions`.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Iterable
+
+from .cluster import data_file_sizes, ship_package
+from .dsdgen import dsdgen_release, iter_lines, split_fields
+from .planner import DEFAULT_TARGET_FILE_BYTES, plan_num_partitions
+from .schema import row_converter, spark_schema
+from .spec import GenerationOptions
+from .tables import TABLES
+
+
+@dataclass
+class TableCalibration:
+    table: str
+    parallel: int
+    children: list[int]
+    rows: int
+    bytes: int
+    seconds: float
+
+    @property
+    def bytes_per_row(self) -> float:
+        return self.bytes / self.rows if self.rows else 0.0
+
+    @property
+    def seconds_per_row(self) -> float:
+        return self.seconds / self.rows if self.rows else 0.0
+
+    @property
+    def core_seconds_per_row(self) -> float:
+        # The pilot runs one task per chunk, all at the same time.
+        return self.seconds_per_row * len(self.children)
+
+
+@dataclass
+class CalibrationProfile:
+    """Measured bytes per row of each table for one combination of writer settings."""
+
+    scale_factor: int
+    file_format: str
+    codec: str | None
+    use_double_for_decimal: bool
+    use_string_for_date: bool
+    dsdgen_release: str | None = None
+    tables: dict[str, TableCalibration] = field(default_factory=dict)
+
+    @property
+    def bytes_per_row(self) -> dict[str, float]:
+        return {t: c.bytes_per_row for t, c in self.tables.items() if c.rows}
+
+    @property
+    def seconds_per_row(self) -> dict[str, float]:
+        return {t: c.seconds_per_row for t, c in self.tables.items() if c.rows}
+
+    @property
+    def core_seconds_per_row(self) -> dict[str, float]:
+        return {t: c.core_seconds_per_row for t, c in self.tables.items() if c.rows}
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(asdict(self), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "CalibrationProfile":
+        with open(path) as f:
+            data = json.load(f)
+        data["tables"] = {t: TableCalibration(**c) for t, c in data["tables"].items()}
+        return cls(**data)
+
+    def describe(self) -> str:
+        lines = [f"{'table':<24}{'chunks':>8}{'rows':>14}{'MB':>10}{'bytes/row':>11}{'us/row':>9}"]
+        for table, c in self.tables.items():
+            lines.append(
+                f"{table:<24}{len(c.children):>8}{c.rows:>14,}{c.bytes / 2**20:>10.1f}"
+                f"{c.bytes_per_row:>11.1f}{c.seconds_per_row * 1e6:>9.2f}"
+            )
+        return "\n".join(lines)
+
+
+def pilot_children(parallel: int, chunks: int) -> list[int]:
+    """Spread ``chunks`` child numbers evenly over ``1..parallel``, first and last included."""
+    if chunks >= parallel:
+        return list(range(1, parallel + 1))
+    if chunks == 1:
+        return [1]
+    step = (parallel - 1) / (chunks - 1)
+    return sorted({1 + round(i * step) for i in range(chunks)})
+
+
+def _generate_rows(table, scale_factor, parallel, dsdgen_dir, use_double_for_decimal, use_string_for_date):
+    convert = row_converter(table, use_double_for_decimal, use_string_for_date)
+
+    def rows(child):
+        for line in iter_lines(table, scale_factor, parallel, child, dsdgen_dir):
+            yield convert(split_fields(line))
+
+    return rows
+
+
+def calibrate_table(
+    spark,
+    table: str,
+    options: GenerationOptions,
+    scratch_dir: str,
+    file_format: str = "parquet",
+    codec: str | None = None,
+    chunks: int = 3,
+    chunk_target_bytes: int = DEFAULT_TARGET_FILE_BYTES,
+) -> TableCalibration:
+    """Generate and write ``chunks`` child chunks of ``table`` and measure them.
+
+    The chunk size is the one the default planner would use for
+    ``chunk_target_bytes`` files, so the pilot files are close to the size of
+    the real ones (compression ratios depend on file and row group size).
+    """
+    parallel = plan_num_partitions(options.scale_factor, chunk_target_bytes, tables=[table])[table]
+    children = pilot_children(parallel, chunks)
+    rows = spark.sparkContext.parallelize(children, len(children)).flatMap(
+        _generate_rows(
+            table,
+            options.scale_factor,
+            parallel,
+            options.dsdgen_dir,
+            options.use_double_for_decimal,
+            options.use_string_for_date,
+        )
+    )
+    schema = spark_schema(table, options.use_double_for_decimal, options.use_string_for_date)
+    df = spark.createDataFrame(rows, schema)
+    writer = df.write.format(file_format).mode("overwrite")
+    if codec:
+        writer = writer.option("compression", codec)
+    path = f"{scratch_dir}/{table}"
+    start = time.monotonic()
+    writer.save(path)
+    seconds = time.monotonic() - start
+    row_count = spark.read.format(file_format).schema(schema).load(path).count()
+    total_bytes = sum(data_file_sizes(spark, path).values())
+    return TableCalibration(table, parallel, children, row_count, total_bytes, seconds)
+
+
+def calibrate(
+    spark,
+    options: GenerationOptions,
+    scratch_dir: str,
+    file_format: str = "parquet",
+    codec: str | None = None,
+    tables: Iterable[str] = TABLES,
+    chunks: int = 3,
+    chunk_target_bytes: int = DEFAULT_TARGET_FILE_BYTES,
+) -> CalibrationProfile:
+    """Run a pilot for every table and collect the measurements into a profile."""
+    ship_package(spark)
+    profile = CalibrationProfile(
+        scale_factor=options.scale_factor,
+        file_format=file_format,
+        codec=codec,
+        use_double_for_decimal=options.use_double_for_decimal,
+        use_string_for_date=options.use_string_for_date,
+        dsdgen_release=dsdgen_release(options.dsdgen_dir),
+    )
+    for table in tables:
+        result = calibrate_table(spark, table, options, scratch_dir, file_format, codec, chunks, chunk_target_bytes)
+        print(f"{table}: {result.rows:,} rows, {result.bytes_per_row:.1f} bytes/row")
+        profile.tables[table] = result
+    return profile
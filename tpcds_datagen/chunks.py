@@ -0,0 +1,417 @@
+"""Generate a table chunk by chunk, with a commit log and resume.
+
+Unlike genData, where a failed job means regenerating the whole table,
+every unit of work here (one dsdgen child chunk, or a group of chunks for
+a sales/returns pair) writes its own Parquet file(s) and then records a
+:class:`ChunkCommit`. With ``resume`` the committed units are kept, files
+without a commit (left by a task that died halfway) are deleted and only
+the missing units run again.
+
+Units are idempotent: file names depend only on the chunk, and files and
+commits are renamed into place, so a unit can be killed at any point and
+rerun. :func:`reconcile` cleans up whatever a killed attempt left behind.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import shutil
+import socket
+import time
+from contextlib import closing
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Iterable, Iterator
+
+from .cluster import ship_package, task_attempt
+from .clustering import plan_clustering, write_clustered, write_partitioned
+from .commitlog import ChunkCommit, ChunkMetrics, CommitLog, OutputFile
+from .convert import ParquetSink, TimedReader, read_batches
+from .delta import create_delta_tables, sink_stats
+from .dsdgen import chunk_streams
+from .fs import file_sha256, is_temp_file, local_path, publish, remove_tree, scratch_dir
+from .manifest import ManifestWriter
+from .pairs import child_groups, part_file_name, write_pair_group
+from .profiling import StageClock, sample_stacks
+from .spec import GenerationOptions, TableSpec
+from .tables import PARTITION_COLUMNS
+from .stragglers import StragglerTracker, split_factor, split_parts
+
+
+def plan_units(spec: TableSpec, default_parallelism: int, chunks_per_task: int = 1) -> list[list[int]]:
+    """Child chunks handled by each task, as runs of consecutive children.
+
+    A task takes ``chunks_per_task`` chunks, which saves the per-task cost of
+    scheduling, worker start-up and a commit when numPartitions is in the
+    thousands. A pair gets at least one group per core so the pass keeps
+    every core busy.
+    """
+    if spec.paired_table:
+        return child_groups(spec.num_partitions, max(spec.paired_returns_partitions, default_parallelism))
+    return child_groups(spec.num_partitions, -(-spec.num_partitions // chunks_per_task))
+
+
+class Superseded(Exception):
+    """The unit was committed by another attempt, or by a split, while this one ran."""
+
+
+def split_file_name(child: int, index: int) -> str:
+    """File of the ``index``-th finer chunk of ``child``; sorts between the files of ``child - 1`` and ``child + 1``."""
+    return f"part-{child:05d}-{index:03d}.parquet"
+
+
+def _until_committed(batches: Iterable, log: CommitLog, number: int) -> Iterator:
+    for batch in batches:
+        if log.exists(number):
+            raise Superseded(number)
+        yield batch
+
+
+def write_chunks(
+    spec: TableSpec,
+    options: GenerationOptions,
+    codec: str,
+    children: list[int],
+    work_dir: str,
+    number: int | None = None,
+    split: int = 1,
+) -> tuple[list[OutputFile], list[ChunkMetrics]]:
+    """Stream each dsdgen child chunk into its own Parquet file; empty chunks write nothing.
+
+    With ``split``, ``children`` are children of ``numPartitions * split``
+    and are named (and measured) after the child of numPartitions they are
+    part of. With ``number``, raises :class:`Superseded` as soon as that
+    unit is committed by someone else.
+    """
+    local_file = os.path.join(work_dir, "chunk.parquet")
+    outputs, metrics = [], []
+    attempt, host = task_attempt(), socket.gethostname()
+    log = CommitLog(spec.location)
+    parallel = spec.num_partitions * split
+    streams = chunk_streams(spec.table, options.scale_factor, parallel, children, options.dsdgen_dir)
+    with closing(streams):
+        for process in streams:
+            child, index = divmod(process.child - 1, split)
+            child += 1
+            name = part_file_name(child) if split == 1 else split_file_name(child, index + 1)
+            clock = StageClock(cpu=options.profile)
+            try:
+                with sample_stacks(options, spec.table, child, clock):
+                    with TimedReader(process.stdout, clock) as reader:
+                        batches = read_batches(spec.table, reader, options)
+                        if number is not None:
+                            batches = _until_committed(batches, log, number)
+                        with ParquetSink(local_file, spec.table, options, codec, clock) as sink:
+                            sink.write(batches)
+                    size = 0
+                    if sink.rows:
+                        path = f"{spec.table}/{name}"
+                        with clock.stage("write"):
+                            digest = file_sha256(local_file)
+                            size = publish(local_file, f"{spec.root_dir}/{path}")
+                        outputs.append(OutputFile(spec.table, path, sink.rows, size, [child], digest, sink_stats(spec, sink)))
+            except Superseded:
+                process.kill()
+                raise
+            clock.add("dsdgen", process.finish())
+            metrics.append(clock.metrics(spec.table, child, sink.rows, size, attempt, host))
+    return outputs, metrics
+
+
+def _commit(spec: TableSpec, commit: ChunkCommit) -> bool:
+    """Record ``commit`` unless its unit is committed already; then delete the files only this attempt wrote."""
+    log = CommitLog(spec.location)
+    if log.record(commit, exclusive=True):
+        return True
+    kept = {f.path for f in log.load(commit.number).files}
+    for output in commit.files:
+        if output.path not in kept:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(local_path(f"{spec.root_dir}/{output.path}"))
+    return False
+
+
+def run_unit(
+    spec: TableSpec, options: GenerationOptions, codec: str, unit: tuple[int, list[int]]
+) -> ChunkCommit | None:
+    """Write the files of one unit, then commit it. Safe to run more than once.
+
+    Returns None if another attempt or a split of the unit committed first.
+    """
+    number, children = unit
+    if CommitLog(spec.location).exists(number):
+        return None
+    work_dir = scratch_dir()
+    try:
+        if spec.paired_table:
+            files, metrics = write_pair_group(spec, options, codec, number, children, work_dir)
+        elif options.clustering_column(spec.table):
+            clustering = CommitLog(spec.location).load_plan()["clustering"]
+            write = write_partitioned if clustering["partitioned"] else write_clustered
+            files, metrics = write(spec, options, codec, number, children, work_dir, clustering)
+        else:
+            files, metrics = write_chunks(spec, options, codec, children, work_dir, number)
+    except Superseded:
+        return None
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    commit = ChunkCommit(spec.table, spec.num_partitions, number, children, files, metrics)
+    return commit if _commit(spec, commit) else None
+
+
+def run_split_part(
+    spec: TableSpec, options: GenerationOptions, codec: str, factor: int, part: tuple[int, int, int]
+) -> tuple[list[OutputFile], list[ChunkMetrics]] | None:
+    """Write one finer chunk of a split unit (see :func:`.stragglers.split_parts`), without committing.
+
+    Returns None if the unit was committed while it ran.
+    """
+    number, child, index = part
+    work_dir = scratch_dir()
+    try:
+        return write_chunks(spec, options, codec, [(child - 1) * factor + index], work_dir, number, factor)
+    except Superseded:
+        return None
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def commit_split(
+    spec: TableSpec,
+    unit: tuple[int, list[int]],
+    factor: int,
+    parts: list[tuple[list[OutputFile], list[ChunkMetrics]] | None],
+) -> ChunkCommit | None:
+    """Commit a unit from the results of all its parts, in order, unless the unit was committed first."""
+    number, children = unit
+    if any(part is None for part in parts):
+        return None
+    files = [f for part_files, _ in parts for f in part_files]
+    metrics = [m for _, part_metrics in parts for m in part_metrics]
+    commit = ChunkCommit(spec.table, spec.num_partitions, number, children, files, metrics, factor)
+    return commit if _commit(spec, commit) else None
+
+
+@dataclass
+class Reconciliation:
+    """State of a table directory after :func:`reconcile`."""
+
+    units: int
+    committed: int
+    removed: list[str] = field(default_factory=list)  # uncommitted and temporary files deleted
+    missing_units: list[int] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing_units
+
+    def describe(self, table: str) -> str:
+        return (
+            f"{table}: {self.committed} of {self.units} units committed, "
+            f"{len(self.removed)} stray files removed"
+        )
+
+
+def reconcile(spec: TableSpec) -> Reconciliation:
+    """Make the directories of ``spec`` agree with its commit log.
+
+    Deletes data files no commit refers to and temporary files left by
+    killed attempts. A commit whose files are missing or have the wrong
+    size is dropped, so its unit counts as missing and runs again.
+    """
+    log = CommitLog(spec.location)
+    plan = log.load_plan()
+    units = len(plan["units"]) if plan else 0
+    commits = []
+    for commit in log.commits():
+        if all(_is_intact(spec, f) for f in commit.files):
+            commits.append(commit)
+        else:
+            log.remove(commit.number)
+    committed = {f.path for c in commits for f in c.files}
+    removed = []
+    for table in spec.tables:
+        directory = local_path(f"{spec.root_dir}/{table}")
+        if not os.path.isdir(directory):
+            continue
+        for subdirectory, dirs, names in os.walk(directory):  # partitioned tables have a directory per value
+            dirs[:] = [d for d in dirs if not d.startswith(("_", "."))]
+            for name in names:
+                path = os.path.relpath(os.path.join(subdirectory, name), local_path(spec.root_dir))
+                if is_temp_file(name) or (not name.startswith(("_", ".")) and path not in committed):
+                    os.remove(os.path.join(subdirectory, name))
+                    removed.append(path)
+    if os.path.isdir(log.directory):
+        for name in os.listdir(log.directory):
+            if is_temp_file(name):
+                os.remove(os.path.join(log.directory, name))
+                removed.append(f"{spec.table}/_commits/{name}")
+    done = {c.number for c in commits}
+    missing = [number for number in range(1, units + 1) if number not in done]
+    return Reconciliation(units, len(done), removed, missing)
+
+
+def _is_intact(spec: TableSpec, output: OutputFile) -> bool:
+    path = local_path(f"{spec.root_dir}/{output.path}")
+    return os.path.exists(path) and os.path.getsize(path) == output.bytes
+
+
+def prepare_units(
+    spec: TableSpec, options: GenerationOptions, default_parallelism: int, resume: bool = False
+) -> list[tuple[int, list[int]]]:
+    """Set up the table directories and return the units that still have to run.
+
+    A fresh run clears the directories and saves the unit plan; with
+    ``resume`` the saved plan is reconciled and only its missing units are
+    returned. Delta tables get their log, empty, if they have none yet.
+    """
+    if spec.file_format not in ("parquet", "delta"):
+        raise ValueError(f"Chunked generation writes Parquet or Delta only, not {spec.file_format}")
+    log = CommitLog(spec.location)
+    plan = log.load_plan() if resume else None
+    if plan is not None and plan["parallel"] != spec.num_partitions:
+        raise ValueError(
+            f"{spec.table} was generated with numPartitions={plan['parallel']}; "
+            f"resume with the same value or start over"
+        )
+    column = options.clustering_column(spec.table)
+    partitioned = options.partition_tables and spec.table in PARTITION_COLUMNS
+    if spec.paired_table and set(spec.tables) & set(options.clustered_tables):
+        raise ValueError(f"{' and '.join(spec.tables)} are clustered or partitioned; generate them without pair_sales_returns")
+    if plan is not None and (plan.get("clustering") or {}).get("column") != column:
+        raise ValueError(f"{spec.table} was generated with another cluster_by; resume with the same value or start over")
+    if plan is not None and column and plan["clustering"]["partitioned"] != partitioned:
+        raise ValueError(f"{spec.table} was generated with another partition_tables; resume with the same value or start over")
+    if plan is None:
+        for table in spec.tables:
+            if not (options.overwrite or resume) and os.path.exists(local_path(f"{spec.root_dir}/{table}")):
+                # genData's SaveMode.ErrorIfExists
+                raise FileExistsError(f"{spec.root_dir}/{table} already exists; set overwrite or resume")
+            remove_tree(f"{spec.root_dir}/{table}")
+        units = plan_units(spec, default_parallelism, options.chunks_per_task)
+        clustering = plan_clustering(spec, options, column, len(units[0]), partitioned) if column else None
+        log.save_plan(spec.num_partitions, units, clustering)
+        todo = list(enumerate(units, 1))
+    else:
+        state = reconcile(spec)
+        print(state.describe(spec.table))
+        todo = [(number, plan["units"][number - 1]) for number in state.missing_units]
+    if spec.file_format == "delta":
+        create_delta_tables(spec, options)
+    return todo
+
+
+def finish_units(spec: TableSpec, manifest: ManifestWriter | None = None) -> Reconciliation:
+    """Reconcile after the units ran, fail if any of them did not commit, and write the final manifests."""
+    state = reconcile(spec)
+    if not state.complete:
+        raise RuntimeError(
+            f"{spec.table}: units {state.missing_units[:10]} did not commit; rerun with resume=True"
+        )
+    (manifest or ManifestWriter(spec)).finish()
+    return state
+
+
+def generate_chunks(
+    spark, spec: TableSpec, options: GenerationOptions, codec: str = "snappy", resume: bool = False
+) -> Reconciliation:
+    """Generate ``spec`` one unit per Spark task.
+
+    Retried and speculative task attempts write the same file names and
+    publish them atomically, so lost executors never leave duplicate or
+    partial files behind once the run is reconciled. With
+    ``options.split_stragglers`` late units are split while the job runs
+    (see :func:`_collect_watching_commits`).
+    """
+    ship_package(spark)
+    sc = spark.sparkContext
+    todo = prepare_units(spec, options, sc.defaultParallelism, resume)
+    manifest = ManifestWriter(spec)
+    if todo:
+        job = sc.parallelize(todo, len(todo)).map(partial(run_unit, spec, options, codec))
+        _collect_watching_commits(sc, spec, options, codec, todo, job, manifest)
+    return finish_units(spec, manifest)
+
+
+def _collect_watching_commits(
+    sc,
+    spec: TableSpec,
+    options: GenerationOptions,
+    codec: str,
+    todo: list[tuple[int, list[int]]],
+    job,
+    manifest: ManifestWriter,
+    poll: float = 10.0,
+) -> None:
+    """Run ``job``, adding units to the manifest as they commit, and split units that straggle.
+
+    Stragglers are split only with ``options.split_stragglers``, and never
+    for a sales/returns pair or a clustered or partitioned table. Spark does not tell Python when each task
+    started, so the clock of the remaining units starts when fewer of them
+    are left than there are cores: every one of them is running by then.
+    A unit still running ``straggler_factor`` times the median unit time
+    after that is split into finer chunks, which run as a second job on
+    the idle cores. The split and the straggler race to commit the unit;
+    the loser stops at its next block.
+
+    Jobs are collected on ``pyspark.InheritableThread``, so in PySpark's
+    pinned-thread mode they keep the scheduler pool and job group the
+    calling thread set (see :mod:`.scheduler`).
+    """
+    from pyspark import InheritableThread
+
+    errors = []
+
+    def run(rdd, then=None):
+        try:
+            results = rdd.collect()
+            if then is not None:
+                then(results)
+        except Exception as e:
+            errors.append(e)
+
+    main = InheritableThread(run, args=(job,), name=f"tpcds-{spec.table}", daemon=True)
+    main.start()
+    log = CommitLog(spec.location)
+    tracker = StragglerTracker(options.straggler_factor)
+    cores = sc.defaultParallelism
+    open_units = dict(todo)
+    splits, tail_start = [], None
+    while main.is_alive():
+        main.join(poll)
+        for number in [n for n in open_units if log.exists(n)]:
+            commit = log.load(number)
+            tracker.record(spec.table, sum(m.seconds for m in commit.metrics), len(commit.children))
+            manifest.add(commit)
+            del open_units[number]
+        if not options.split_stragglers or spec.paired_table or options.clustering_column(spec.table):
+            continue
+        now = time.monotonic()
+        if tail_start is None and len(open_units) < cores:
+            tail_start = now
+        if tail_start is None:
+            continue
+        idle = cores - len(open_units)
+        for number, children in list(open_units.items()):
+            if idle < 2 or not tracker.is_straggler(spec.table, now - tail_start, len(children)):
+                continue
+            del open_units[number]  # committed by whichever finishes first; not split again
+            factor = split_factor(spec, options, children, idle)
+            if factor is None:
+                print(f"{spec.table}: unit {number} is straggling, but no finer split lines up with its chunks")
+                continue
+            unit = (number, children)
+            parts = split_parts(unit, factor)
+            print(f"{spec.table}: unit {number} is straggling after {now - tail_start:.0f}s; splitting it {factor} ways")
+            rdd = sc.parallelize(parts, len(parts)).map(partial(run_split_part, spec, options, codec, factor))
+            thread = InheritableThread(
+                run, args=(rdd, partial(commit_split, spec, unit, factor)), name=f"tpcds-{spec.table}-{number}", daemon=True
+            )
+            thread.start()
+            splits.append(thread)
+            idle -= len(parts)
+    for thread in splits:
+        thread.join()
+    if errors:
+        raise errors[0]
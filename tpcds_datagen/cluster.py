@@ -0,0 +1,50 @@
+"""Small helpers for running tpcds_datagen code on a Spark cluster."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+
+_shipped_to = set()
+
+
+def ship_package(spark) -> None:
+    """Make ``tpcds_datagen`` importable in the executors' Python workers."""
+    sc = spark.sparkContext
+    if sc.applicationId in _shipped_to:
+        return
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    archive = shutil.make_archive(
+        os.path.join(tempfile.mkdtemp(), "tpcds_datagen"),
+        "zip",
+        root_dir=os.path.dirname(package_dir),
+        base_dir=os.path.basename(package_dir),
+    )
+    sc.addPyFile(archive)
+    _shipped_to.add(sc.applicationId)
+
+
+def task_attempt() -> int:
+    """Attempt number of the running Spark task; 0 outside Spark."""
+    try:
+        from pyspark import TaskContext
+    except ImportError:
+        return 0
+    context = TaskContext.get()
+    return context.attemptNumber() if context else 0
+
+
+def data_file_sizes(spark, path: str) -> dict[str, int]:
+    """Sizes of the data files under ``path``, skipping ``_SUCCESS``/``_committed`` style files."""
+    jvm = spark._jvm
+    hadoop_path = jvm.org.apache.hadoop.fs.Path(path)
+    fs = hadoop_path.getFileSystem(spark._jsc.hadoopConfiguration())
+    sizes = {}
+    files = fs.listFiles(hadoop_path, True)
+    while files.hasNext():
+        status = files.next()
+        name = status.getPath().getName()
+        if not name.startswith(("_", ".")):
+            sizes[status.getPath().toString()] = status.getLen()
+    return sizes
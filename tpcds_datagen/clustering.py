@@ -0,0 +1,307 @@
+"""Range-cluster a table's files by one column, without a global shuffle.
+
+dsdgen writes rows in its own order, so every file of ``store_sales``
+spans nearly the whole range of keys such as ``ss_item_sk`` and its
+min/max statistics skip nothing. With ``GenerationOptions.cluster_by``
+each unit of the chunks engine instead range-partitions its own rows:
+
+* when the plan is made, the key is sampled from the start of chunks
+  spread over the whole table and cut into ``files * RUNS_PER_FILE``
+  ranges of about equal row count (:func:`plan_clustering`); the
+  boundaries are saved with the plan, so every unit, retry and resume
+  uses the same ones;
+* every unit writes as many files as a full unit has chunks, the
+  ``i``-th holding the ``i``-th block of key ranges of all its chunks.
+  Rows are spilled to local Arrow files per range while dsdgen runs, and
+  each range is sorted on its own, so memory is bounded by an eighth of a
+  file rather than the unit.
+
+Every file is sorted by the key and the files of one unit cover disjoint
+ranges, so a filter on the key reads about its share of each unit's
+files, and of the row groups within them. The more chunks per unit
+(``chunks_per_task``), the finer the ranges across files. Only the rows
+within a unit move, so the cost stays that of a sort per file.
+
+With ``partition_tables`` the chunks engine writes the fact tables
+partitioned by their date column the same way (:func:`write_partitioned`):
+the ranges are cut by date, and each unit writes the partitions its rows
+fall into one after the other with a single open file, instead of one
+open writer per partition in every task as with Spark's ``partitionBy``.
+dsdgen does not write rows in date order, so the rows of a unit fall into
+nearly every date and the table gets a file for nearly every partition
+and unit: fewer files than Spark's one per partition and dsdgen task only
+with ``chunks_per_task`` above 1, and small ones unless each unit holds
+many files' worth of rows.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import socket
+from contextlib import closing
+
+from .cluster import task_attempt
+from .commitlog import ChunkMetrics, OutputFile
+from .convert import ParquetSink, TimedReader, read_batches
+from .delta import sink_stats
+from .dsdgen import DsdgenProcess, chunk_streams
+from .fs import file_sha256, publish
+from .planner import DEFAULT_BYTES_PER_ROW
+from .profiling import StageClock, sample_stacks
+from .spec import GenerationOptions, TableSpec
+from .tables import HIVE_DEFAULT_PARTITION
+
+RUNS_PER_FILE = 8  # key ranges per file, each sorted in memory on its own
+ROWS_PER_BATCH = 1024 * 1024  # sorted rows handed to a partition file at a time
+SAMPLE_CHUNKS = 32
+SAMPLE_ROWS = 20_000  # rows read from the start of each sampled chunk
+
+
+def cluster_file_name(number: int, index: int) -> str:
+    """File of the ``index``-th key range of unit ``number``."""
+    return f"part-{number:05d}-c{index:03d}.parquet"
+
+
+def _sample(spec: TableSpec, options: GenerationOptions, column: str):
+    """Key values from the start of :data:`SAMPLE_CHUNKS` chunks spread over the table."""
+    import pyarrow as pa
+
+    parallel = max(SAMPLE_CHUNKS, spec.num_partitions * 16)
+    step = parallel // SAMPLE_CHUNKS
+    values = []
+    for child in range(1, parallel + 1, step):
+        process = DsdgenProcess(spec.table, options.scale_factor, parallel, child, options.dsdgen_dir)
+        rows = 0
+        for batch in read_batches(spec.table, process.stdout, options, block_size=1024 * 1024):
+            values.append(batch.column(column))
+            rows += batch.num_rows
+            if rows >= SAMPLE_ROWS:
+                break
+        process.kill()
+    return pa.chunked_array(values)
+
+
+def plan_clustering(
+    spec: TableSpec, options: GenerationOptions, column: str, files_per_unit: int, partitioned: bool = False
+) -> dict:
+    """The ``column`` boundaries that cut the table into ``files_per_unit * RUNS_PER_FILE`` ranges.
+
+    Range ``i`` holds the keys ``boundaries[i-1] <= key < boundaries[i]``;
+    NULL keys go to the end of the first range.
+    """
+    import pyarrow.compute as pc
+
+    ranges = files_per_unit * RUNS_PER_FILE
+    keys = pc.drop_null(_sample(spec, options, column))
+    boundaries = []
+    if len(keys):
+        boundaries = pc.quantile(keys, q=[i / ranges for i in range(1, ranges)], interpolation="lower").to_pylist()
+    return {"column": column, "files_per_unit": files_per_unit, "boundaries": boundaries, "partitioned": partitioned}
+
+
+def _range_ids(keys, boundaries: list):
+    """Range of every key: the number of boundaries at or below it, 0 for NULL."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    ids = pa.array([0] * len(keys), pa.int32())
+    for boundary in boundaries:
+        ids = pc.add(ids, pc.cast(pc.fill_null(pc.greater_equal(keys, boundary), False), pa.int32()))
+    return ids
+
+
+class _Spill:
+    """Local Arrow files of the rows of each key range of one unit."""
+
+    def __init__(self, work_dir: str, schema, ranges: int):
+        self.work_dir = work_dir
+        self.schema = schema
+        self._writers = [None] * ranges
+
+    def path(self, index: int) -> str:
+        return os.path.join(self.work_dir, f"range-{index:04d}.arrow")
+
+    def add(self, batch, ids) -> None:
+        import pyarrow.compute as pc
+
+        order = pc.sort_indices(ids)
+        batch, ids = batch.take(order), ids.take(order)
+        counts = pc.value_counts(ids)
+        start = 0
+        for entry in counts.to_pylist():
+            index, count = entry["values"], entry["counts"]
+            self._writer(index).write_batch(batch.slice(start, count))
+            start += count
+
+    def _writer(self, index: int):
+        import pyarrow as pa
+
+        if self._writers[index] is None:
+            self._writers[index] = pa.ipc.new_file(self.path(index), self.schema)
+        return self._writers[index]
+
+    def close(self) -> None:
+        for writer in self._writers:
+            if writer is not None:
+                writer.close()
+
+    def sorted_range(self, index: int, column: str):
+        """The rows of range ``index`` sorted by ``column``, or None if it is empty; removes its spill."""
+        import pyarrow as pa
+
+        if self._writers[index] is None:
+            return None
+        with pa.memory_map(self.path(index)) as source:
+            rows = pa.ipc.open_file(source).read_all()
+        os.remove(self.path(index))
+        return rows.sort_by(column)
+
+
+def _spill_unit(
+    spec: TableSpec, options: GenerationOptions, children: list[int], work_dir: str, column: str, boundaries: list
+) -> tuple[_Spill | None, list[StageClock], dict[int, int]]:
+    """Run dsdgen for each child and spill its rows by key range; the spill is None if there were no rows."""
+    spill, clocks, rows = None, [], {}
+    streams = chunk_streams(spec.table, options.scale_factor, spec.num_partitions, children, options.dsdgen_dir)
+    try:
+        with closing(streams):
+            for process in streams:
+                clock = StageClock(cpu=options.profile)
+                rows[process.child] = 0
+                with sample_stacks(options, spec.table, process.child, clock):
+                    with TimedReader(process.stdout, clock) as reader:
+                        batches = iter(read_batches(spec.table, reader, options))
+                        while True:
+                            with clock.stage("parse"):
+                                batch = next(batches, None)
+                            if batch is None:
+                                break
+                            with clock.stage("encode"):
+                                if spill is None:
+                                    spill = _Spill(work_dir, batch.schema, len(boundaries) + 1)
+                                spill.add(batch, _range_ids(batch.column(column), boundaries))
+                            rows[process.child] += batch.num_rows
+                clock.add("dsdgen", process.finish())
+                clocks.append(clock)
+    finally:
+        if spill is not None:
+            spill.close()
+    return spill, clocks, rows
+
+
+def _publish(spec: TableSpec, sink: ParquetSink, path: str, children: list[int]) -> OutputFile:
+    with sink.clock.stage("write"):
+        digest = file_sha256(sink.path)
+        size = publish(sink.path, f"{spec.root_dir}/{path}")
+    return OutputFile(spec.table, path, sink.rows, size, list(children), digest, sink_stats(spec, sink))
+
+
+def _unit_metrics(
+    spec: TableSpec, children: list[int], clocks: list[StageClock], rows: dict[int, int], outputs: list[OutputFile]
+) -> list[ChunkMetrics]:
+    """Metrics of each child, with the unit's bytes shared out by rows."""
+    attempt, host = task_attempt(), socket.gethostname()
+    total_rows = sum(rows.values())
+    total_bytes = sum(f.bytes for f in outputs)
+    return [
+        clock.metrics(
+            spec.table, child, rows[child], round(total_bytes * rows[child] / total_rows) if total_rows else 0, attempt, host
+        )
+        for child, clock in zip(children, clocks)
+    ]
+
+
+def write_clustered(
+    spec: TableSpec,
+    options: GenerationOptions,
+    codec: str,
+    number: int,
+    children: list[int],
+    work_dir: str,
+    clustering: dict,
+) -> tuple[list[OutputFile], list[ChunkMetrics]]:
+    """Write the chunks of one unit as ``files_per_unit`` files of consecutive key ranges; empty files are skipped.
+
+    Sorting and writing the files is charged to the last child.
+    """
+    column, boundaries = clustering["column"], clustering["boundaries"]
+    files = clustering["files_per_unit"]
+    ranges = len(boundaries) + 1
+    spill, clocks, rows = _spill_unit(spec, options, children, work_dir, column, boundaries)
+    outputs = []
+    local_file = os.path.join(work_dir, "clustered.parquet")
+    per_file = -(-ranges // files)
+    for index in range(files if spill is not None else 0):
+        clock = clocks[-1]
+        with ParquetSink(local_file, spec.table, options, codec, clock) as sink:
+            for run in range(index * per_file, min(ranges, (index + 1) * per_file)):
+                with clock.stage("encode"):
+                    ordered = spill.sorted_range(run, column)
+                if ordered is not None:
+                    sink.write(ordered.to_batches())
+        if sink.rows:
+            path = f"{spec.table}/{cluster_file_name(number, index + 1)}"
+            outputs.append(_publish(spec, sink, path, children))
+        os.remove(local_file)
+    return outputs, _unit_metrics(spec, children, clocks, rows, outputs)
+
+
+def partition_directory(column: str, value) -> str:
+    """Hive-style directory of a partition value, as Spark's ``partitionBy`` names it."""
+    return f"{column}={HIVE_DEFAULT_PARTITION if value is None else value}"
+
+
+def write_partitioned(
+    spec: TableSpec,
+    options: GenerationOptions,
+    codec: str,
+    number: int,
+    children: list[int],
+    work_dir: str,
+    clustering: dict,
+) -> tuple[list[OutputFile], list[ChunkMetrics]]:
+    """Write the chunks of one unit into Hive-style partitions of the clustering column.
+
+    The key ranges are sorted one at a time and written partition after
+    partition, so a task has a single file open however many partitions
+    its rows fall into, and writes one file per partition it touches. A
+    partition with more than ``options.partition_file_bytes`` of rows is
+    split into files of about that size and equal row counts, estimated
+    from the bytes per row of the files the unit has written so far (the
+    planner's figure before the first). NULL keys go to the
+    ``__HIVE_DEFAULT_PARTITION__`` directory, or are dropped with
+    ``filter_out_null_partition_values``. Sorting and writing are charged
+    to the last child.
+    """
+    import pyarrow.compute as pc
+
+    column, boundaries = clustering["column"], clustering["boundaries"]
+    spill, clocks, rows = _spill_unit(spec, options, children, work_dir, column, boundaries)
+    clock = clocks[-1] if clocks else None
+    outputs = []
+    local_file = os.path.join(work_dir, "partition.parquet")
+    for run in range(len(boundaries) + 1 if spill is not None else 0):
+        with clock.stage("encode"):
+            ordered = spill.sorted_range(run, column)
+        if ordered is None:
+            continue
+        start = 0
+        for entry in pc.value_counts(ordered.column(column)).to_pylist():  # in key order, as the rows are sorted
+            value, count = entry["values"], entry["counts"]
+            part = ordered.slice(start, count)
+            start += count
+            if value is None and options.filter_out_null_partition_values:
+                continue
+            directory = f"{spec.table}/{partition_directory(column, value)}"
+            # The size of the file on disk misses the row group still being buffered, so split before writing.
+            written_rows = sum(f.rows for f in outputs)
+            per_row = sum(f.bytes for f in outputs) / written_rows if written_rows else DEFAULT_BYTES_PER_ROW[spec.table]
+            files = max(1, math.ceil(count * per_row / options.partition_file_bytes))
+            for i in range(files):
+                first, last = i * count // files, (i + 1) * count // files
+                with ParquetSink(local_file, spec.table, options, codec, clock, partition_column=column) as sink:
+                    sink.write(part.slice(first, last - first).to_batches(max_chunksize=ROWS_PER_BATCH))
+                path = f"{directory}/part-{number:05d}-{len(outputs) + 1:05d}.parquet"
+                outputs.append(_publish(spec, sink, path, children))
+    return outputs, _unit_metrics(spec, children, clocks, rows, outputs)
@@ -0,0 +1,138 @@
+"""Commit log of the chunks of a table that have been written completely.
+
+Every unit of work (one dsdgen child chunk, or a group of chunks for a
+sales/returns pair) records a small JSON file under ``<table>/_commits``
+once all of its output files are in place. Spark ignores ``_`` paths, so
+the log lives next to the data without being read as part of the table.
+A resumed run regenerates only the units that have no record.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass, field
+
+from .fs import local_path, write_text
+
+PLAN_FILE = "_plan.json"
+
+
+@dataclass
+class OutputFile:
+    table: str
+    path: str  # relative to the dataset root
+    rows: int
+    bytes: int
+    children: list[int] = field(default_factory=list)  # dsdgen child chunks (of numPartitions) whose rows the file holds
+    sha256: str | None = None
+    stats: dict | None = None  # Delta statistics from the footer (see .delta.file_stats), for Delta tables only
+
+
+@dataclass
+class ChunkMetrics:
+    """Where the time of one child chunk of one table went.
+
+    ``dsdgen_seconds`` is time spent waiting for dsdgen's output,
+    ``parse_seconds`` turning it into Arrow batches, ``encode_seconds``
+    encoding and compressing Parquet on local scratch and ``write_seconds``
+    copying the file to its destination. ``attempt`` is the Spark task
+    attempt that committed the chunk, so ``attempt > 0`` means a retry.
+    The ``*_cpu_seconds`` are only measured with ``GenerationOptions.profile``;
+    ``dsdgen_cpu_seconds`` is the CPU time of the dsdgen process.
+    """
+
+    table: str
+    child: int
+    rows: int
+    bytes: int
+    dsdgen_seconds: float
+    parse_seconds: float
+    encode_seconds: float
+    write_seconds: float
+    attempt: int = 0
+    host: str = ""
+    dsdgen_cpu_seconds: float | None = None
+    parse_cpu_seconds: float | None = None
+    encode_cpu_seconds: float | None = None
+    write_cpu_seconds: float | None = None
+
+    @property
+    def seconds(self) -> float:
+        return self.dsdgen_seconds + self.parse_seconds + self.encode_seconds + self.write_seconds
+
+    @property
+    def cpu_seconds(self) -> float | None:
+        """CPU time of the dsdgen process and of every stage; None unless measured."""
+        if self.parse_cpu_seconds is None:
+            return None
+        cpu = (self.dsdgen_cpu_seconds, self.parse_cpu_seconds, self.encode_cpu_seconds, self.write_cpu_seconds)
+        return sum(c or 0.0 for c in cpu)
+
+
+@dataclass
+class ChunkCommit:
+    table: str
+    parallel: int
+    number: int  # child number, or group number for a sales/returns pair
+    children: list[int]
+    files: list[OutputFile] = field(default_factory=list)
+    metrics: list[ChunkMetrics] = field(default_factory=list)
+    split: int = 1  # > 1 if the children were generated as that many finer dsdgen chunks each
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ChunkCommit":
+        data = dict(data)
+        data["files"] = [OutputFile(**f) for f in data["files"]]
+        data["metrics"] = [ChunkMetrics(**m) for m in data.get("metrics", [])]
+        return cls(**data)
+
+
+class CommitLog:
+    def __init__(self, location: str):
+        self.location = location
+        self.directory = local_path(f"{location}/_commits")
+
+    def _write_json(self, name: str, data: dict, exclusive: bool = False) -> bool:
+        """Write ``name`` atomically; with ``exclusive``, only if it does not exist yet."""
+        return write_text(os.path.join(self.directory, name), json.dumps(data), exclusive)
+
+    def _path(self, number: int) -> str:
+        return os.path.join(self.directory, f"{number:05d}.json")
+
+    def record(self, commit: ChunkCommit, exclusive: bool = False) -> bool:
+        """Save ``commit``; with ``exclusive``, return False if the unit is already committed."""
+        return self._write_json(f"{commit.number:05d}.json", asdict(commit), exclusive)
+
+    def exists(self, number: int) -> bool:
+        return os.path.exists(self._path(number))
+
+    def load(self, number: int) -> ChunkCommit:
+        with open(self._path(number)) as f:
+            return ChunkCommit.from_dict(json.load(f))
+
+    def remove(self, number: int) -> None:
+        os.remove(self._path(number))
+
+    def commits(self) -> list[ChunkCommit]:
+        if not os.path.isdir(self.directory):
+            return []
+        names = [n for n in os.listdir(self.directory) if n.endswith(".json") and not n.startswith(("_", "."))]
+        commits = []
+        for name in sorted(names, key=lambda n: int(n.split(".")[0])):  # 100000.json comes after 99999.json
+            with open(os.path.join(self.directory, name)) as f:
+                commits.append(ChunkCommit.from_dict(json.load(f)))
+        return commits
+
+    def save_plan(self, parallel: int, units: list[list[int]], clustering: dict | None = None) -> None:
+        plan = {"parallel": parallel, "units": units}
+        if clustering is not None:
+            plan["clustering"] = clustering
+        self._write_json(PLAN_FILE, plan)
+
+    def load_plan(self) -> dict | None:
+        path = os.path.join(self.directory, PLAN_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
@@ -0,0 +1,331 @@
+"""File-size report and compaction of undersized tables.
+
+numPartitions is tuned for ~500MB Parquet files, but a small table still
+gets one file per dsdgen task: ``reason`` is written as 10 tiny files at
+sf=100000, and every extra file slows down listing, loading and query
+planning. :func:`file_size_report` lists the data files of every table
+under a dataset root and compares them with the target size;
+:func:`compact_dataset` rewrites the undersized tables into target-size
+files, in parallel, keeping row order and row counts.
+
+Files are rewritten in name order, which is chunk order, and consecutive
+files are concatenated, so reading the compacted table gives the same
+rows in the same order. For tables written by the chunks engine the
+commit log and the manifest are rewritten to match, so a later
+``resume`` keeps the compacted files. A Delta table's log records the
+swap as an ``OPTIMIZE``, whichever engine wrote it, before the old files
+are deleted.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import shutil
+import statistics
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from typing import Iterable, Iterator, Sequence
+
+from .commitlog import ChunkCommit, ChunkMetrics, CommitLog, OutputFile
+from .delta import DeltaLog, is_delta_table
+from .fs import file_sha256, list_data_files, local_path, publish, scratch_dir
+from .manifest import ManifestWriter
+from .planner import DEFAULT_TARGET_FILE_BYTES
+from .spec import TableSpec
+from .tables import SALES_RETURNS, TABLES
+from .validation import footer_rows
+from .writer_profiles import WriterProfile
+
+COMPACTED_DIR = "_compacted"
+SWAP_FILE = "_swap.json"
+ROW_GROUP_BYTES = 128 * 2**20  # uncompressed Arrow bytes per compacted row group if the profile sets none
+
+
+@dataclass
+class TableFileSizes:
+    table: str
+    files: int
+    bytes: int
+    min_bytes: int
+    median_bytes: int
+    max_bytes: int
+    target_bytes: int
+    min_fraction: float = 0.5
+
+    @property
+    def target_files(self) -> int:
+        """Files the table would have at the target size."""
+        return max(1, round(self.bytes / self.target_bytes))
+
+    @property
+    def undersized(self) -> bool:
+        """More files than needed, and the median file under ``min_fraction`` of the target."""
+        return self.files > self.target_files and self.median_bytes < self.min_fraction * self.target_bytes
+
+
+def file_size_report(
+    root_dir: str,
+    tables: Sequence[str] = TABLES,
+    target_bytes: int = DEFAULT_TARGET_FILE_BYTES,
+    min_fraction: float = 0.5,
+) -> list[TableFileSizes]:
+    """File count and size distribution of every table under ``root_dir`` that has files."""
+    report = []
+    for table in tables:
+        sizes = [size for _, size in list_data_files(f"{root_dir}/{table}")]
+        if sizes:
+            report.append(
+                TableFileSizes(
+                    table,
+                    len(sizes),
+                    sum(sizes),
+                    min(sizes),
+                    round(statistics.median(sizes)),
+                    max(sizes),
+                    target_bytes,
+                    min_fraction,
+                )
+            )
+    return report
+
+
+def describe_file_sizes(report: Iterable[TableFileSizes]) -> str:
+    lines = [
+        f"{'table':<24}{'files':>8}{'at target':>10}{'total MB':>12}{'min MB':>10}{'median MB':>11}{'max MB':>10}  compact"
+    ]
+    for t in report:
+        lines.append(
+            f"{t.table:<24}{t.files:>8}{t.target_files:>10}{t.bytes / 2**20:>12.1f}{t.min_bytes / 2**20:>10.1f}"
+            f"{t.median_bytes / 2**20:>11.1f}{t.max_bytes / 2**20:>10.1f}  {'yes' if t.undersized else ''}"
+        )
+    return "\n".join(lines)
+
+
+def group_by_size(sizes: Sequence[int], groups: int) -> list[list[int]]:
+    """Split item indexes into at most ``groups`` consecutive runs of about equal total size."""
+    total = sum(sizes) or 1
+    runs: list[list[int]] = [[] for _ in range(groups)]
+    position = 0
+    for i, size in enumerate(sizes):
+        runs[min(groups - 1, int((position + size / 2) * groups / total))].append(i)
+        position += size
+    return [run for run in runs if run]
+
+
+def _row_groups(paths: list[str], schema, row_group_bytes: int) -> Iterator:
+    """The rows of the Parquet files ``paths`` in order, as tables of about ``row_group_bytes``."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pending, pending_bytes = [], 0
+    for path in paths:
+        for batch in pq.ParquetFile(path).iter_batches():
+            pending.append(batch)
+            pending_bytes += batch.nbytes
+            if pending_bytes >= row_group_bytes:
+                yield pa.Table.from_batches(pending, schema)
+                pending, pending_bytes = [], 0
+    if pending:
+        yield pa.Table.from_batches(pending, schema)
+
+
+def _rewrite(paths: list[str], dest: str, profile: WriterProfile) -> tuple[int, int, str]:
+    """Concatenate Parquet files into ``dest`` and return its rows, bytes and sha256.
+
+    Rows are buffered into row groups of the profile's ``row_group_bytes``
+    (:data:`ROW_GROUP_BYTES` if it sets none), whatever the row groups of
+    the sources. If the profile sets no codec, the codec of the sources is kept.
+    """
+    import pyarrow.parquet as pq
+
+    first = pq.ParquetFile(paths[0])
+    if profile.codec is None:
+        codec = first.metadata.row_group(0).column(0).compression if first.metadata.num_row_groups else "snappy"
+        profile = replace(profile, codec=codec)
+    work_dir = scratch_dir()
+    try:
+        local_file = os.path.join(work_dir, "compacted.parquet")
+        rows = 0
+        with pq.ParquetWriter(local_file, first.schema_arrow, **profile.parquet_options()) as writer:
+            for group in _row_groups(paths, first.schema_arrow, profile.row_group_bytes or ROW_GROUP_BYTES):
+                writer.write_table(group, row_group_size=group.num_rows)
+                rows += group.num_rows
+        digest = file_sha256(local_file)
+        return rows, publish(local_file, dest), digest
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _paired_table(root_dir: str, table: str) -> str | None:
+    """The other table of a sales/returns pair whose files share one commit log with ``table``."""
+    returns_to_sales = {r: s for s, r in SALES_RETURNS.items()}
+    sales = table if table in SALES_RETURNS else returns_to_sales.get(table)
+    if sales is None:
+        return None
+    returns = SALES_RETURNS[sales]
+    for commit in CommitLog(f"{root_dir}/{sales}").commits():
+        if any(f.table == returns for f in commit.files):
+            return returns if table == sales else sales
+    return None
+
+
+def _finish_swap(root_dir: str, table: str) -> tuple[int, int]:
+    """Replace the table's files (and commit log or Delta log) with the compacted ones. Safe to rerun.
+
+    Returns the number of files before and after.
+    """
+    table_dir = local_path(f"{root_dir}/{table}")
+    compacted_dir = os.path.join(table_dir, COMPACTED_DIR)
+    with open(os.path.join(compacted_dir, SWAP_FILE)) as f:
+        swap = json.load(f)
+    for name in swap["files"]:
+        if os.path.exists(os.path.join(compacted_dir, name)):
+            os.replace(os.path.join(compacted_dir, name), os.path.join(table_dir, name))
+    delta = is_delta_table(root_dir, table)
+    if swap["commits"] is not None:
+        log = CommitLog(f"{root_dir}/{table}")
+        shutil.rmtree(log.directory, ignore_errors=True)
+        log.save_plan(swap["parallel"], [c["children"] for c in swap["commits"]], swap.get("clustering"))
+        for commit in swap["commits"]:
+            log.record(ChunkCommit.from_dict(commit))
+        ManifestWriter(TableSpec(table, swap["parallel"], "delta" if delta else "parquet", root_dir)).finish()
+    elif delta:
+        outputs = [
+            OutputFile(table, f"{table}/{name}", rows, nbytes, [], digest)
+            for name, (rows, nbytes, digest) in zip(swap["files"], swap["written"])
+        ]
+        DeltaLog(f"{root_dir}/{table}").sync(root_dir, table, outputs)
+    # Only now that the logs list the new files are the old ones removed; compacted files may reuse their names.
+    replacements = set(swap["files"])
+    for name in swap["remove"]:
+        if name not in replacements:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(table_dir, name))
+    shutil.rmtree(compacted_dir)
+    return len(swap["remove"]), len(swap["files"])
+
+
+def compact_table(
+    root_dir: str,
+    table: str,
+    groups: int,
+    codec: str | None = None,
+    pool: ThreadPoolExecutor | None = None,
+    writer_profiles: dict[str, WriterProfile] | None = None,
+) -> tuple[int, int]:
+    """Rewrite ``table`` into at most ``groups`` files and return the file counts before and after.
+
+    The table's profile in ``writer_profiles`` (as in
+    ``GenerationOptions.writer_profiles``) sets up the writer; without
+    one, the writer defaults are used. A profile without a codec takes
+    ``codec``, which defaults to the codec of the existing files. The compacted
+    files are written to ``<table>/_compacted`` first and only swapped in
+    once their row count matches the footers of the originals; if the swap
+    is interrupted, calling this again completes it.
+    """
+    table_dir = local_path(f"{root_dir}/{table}")
+    compacted_dir = os.path.join(table_dir, COMPACTED_DIR)
+    if os.path.exists(os.path.join(compacted_dir, SWAP_FILE)):
+        return _finish_swap(root_dir, table)
+    shutil.rmtree(compacted_dir, ignore_errors=True)
+    originals = list_data_files(table_dir)
+    if any(os.path.dirname(path) != table_dir for path, _ in originals):
+        raise ValueError(f"{table} is partitioned; only flat tables are compacted")
+    if not all(path.endswith(".parquet") for path, _ in originals):
+        raise ValueError(f"{table}: only Parquet files are compacted")
+    delta = is_delta_table(root_dir, table)
+    log = CommitLog(f"{root_dir}/{table}")
+    plan = log.load_plan()
+    if plan is None and delta:
+        # Written by genData or Spark: only the files in the Delta log are the table (others await VACUUM).
+        delta_log = DeltaLog(f"{root_dir}/{table}")
+        delta_log.update()
+        live = {os.path.join(table_dir, path) for path in delta_log.files}
+        originals = [(path, size) for path, size in originals if path in live]
+    if plan is not None:
+        # Chunks engine: keep each commit's files together so every new file maps to whole units.
+        commits = log.commits()
+        items = [[local_path(f"{root_dir}/{f.path}") for f in c.files] for c in commits]
+        if sorted(p for item in items for p in item) != [path for path, _ in originals]:
+            raise ValueError(f"{table}: the files do not match the commit log; resume the run first")
+    else:
+        commits = None
+        items = [[path] for path, _ in originals]
+    size = dict(originals)
+    runs = group_by_size([sum(size[p] for p in item) for item in items], groups)
+    # A Delta version cannot both remove and add one path, so Delta tables get new names.
+    suffix = f"-{uuid.uuid4().hex[:8]}" if delta else ""
+    names = [f"part-{i:05d}{suffix}.parquet" for i in range(1, len(runs) + 1)]
+    jobs = [([p for i in run for p in items[i]], f"{root_dir}/{table}/{COMPACTED_DIR}/{name}") for run, name in zip(runs, names)]
+    own_pool = pool is None
+    pool = pool or ThreadPoolExecutor(os.cpu_count())
+    try:
+        profile = (writer_profiles or {}).get(table) or WriterProfile()
+        profile = replace(profile, codec=profile.codec or codec)
+        written = list(pool.map(lambda job: _rewrite(job[0], job[1], profile), jobs))
+    finally:
+        if own_pool:
+            pool.shutdown()
+    expected = sum(footer_rows(path) for path, _ in originals)
+    if sum(rows for rows, _, _ in written) != expected:
+        shutil.rmtree(compacted_dir, ignore_errors=True)
+        raise RuntimeError(f"{table}: compacted files do not have the {expected} rows of the originals")
+    new_commits = None
+    if commits is not None:
+        new_commits = []
+        for number, (run, name, (rows, nbytes, digest)) in enumerate(zip(runs, names, written), 1):
+            units = [commits[i] for i in run]
+            metrics: list[ChunkMetrics] = [m for c in units for m in c.metrics]
+            children = [child for c in units for child in c.children]
+            output = OutputFile(table, f"{table}/{name}", rows, nbytes, children, digest)
+            new_commits.append(asdict(ChunkCommit(table, plan["parallel"], number, children, [output], metrics)))
+    swap = {
+        "remove": [os.path.basename(path) for path, _ in originals],
+        "files": names,
+        "parallel": plan["parallel"] if plan else None,
+        "clustering": plan.get("clustering") if plan else None,
+        "commits": new_commits,
+        "written": written,
+    }
+    with open(os.path.join(compacted_dir, SWAP_FILE), "w") as f:
+        json.dump(swap, f)
+    return _finish_swap(root_dir, table)
+
+
+def compact_dataset(
+    root_dir: str,
+    tables: Sequence[str] = TABLES,
+    target_bytes: int = DEFAULT_TARGET_FILE_BYTES,
+    min_fraction: float = 0.5,
+    codec: str | None = None,
+    workers: int | None = None,
+    writer_profiles: dict[str, WriterProfile] | None = None,
+) -> list[TableFileSizes]:
+    """Compact every undersized table under ``root_dir`` and return the file-size report before compaction.
+
+    Tables are compacted one after another, the files of each in parallel
+    on ``workers`` threads (pyarrow releases the GIL while it decodes and
+    encodes), with the writer settings of :func:`compact_table`.
+    Sales/returns tables generated from one dsdgen pass share a
+    commit log and are left alone.
+    """
+    report = file_size_report(root_dir, tables, target_bytes, min_fraction)
+    with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+        for t in report:
+            pending_swap = os.path.exists(local_path(f"{root_dir}/{t.table}/{COMPACTED_DIR}/{SWAP_FILE}"))
+            if not (t.undersized or pending_swap):
+                continue
+            paired = _paired_table(root_dir, t.table)
+            if paired:
+                print(f"{t.table}: generated with {paired} from one dsdgen pass; not compacted")
+                continue
+            try:
+                before, after = compact_table(root_dir, t.table, t.target_files, codec, pool, writer_profiles)
+            except ValueError as e:  # partitioned or not Parquet
+                print(f"{e}; not compacted")
+                continue
+            print(f"{t.table}: {before} files ({t.bytes / 2**20:.1f} MB) -> {after}")
+    return report
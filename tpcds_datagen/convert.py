@@ -0,0 +1,217 @@
+"""Parse dsdgen output into Arrow record batches and write them as Parquet.
+
+dsdgen's output is read in large blocks of whole lines and each block is
+parsed by pyarrow's CSV reader, which converts whole columns at a time
+(integers, decimals and dates included) instead of splitting lines and
+building a Python object per field.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import replace
+from typing import BinaryIO, Iterable, Iterator
+
+from .profiling import StageClock
+from .schema import arrow_schema
+from .spec import GenerationOptions
+from .writer_profiles import WriterProfile
+
+BLOCK_BYTES = 16 * 1024 * 1024
+READ_AHEAD_BYTES = 2 * BLOCK_BYTES
+_TRAILING = "_trailing"  # every dsdgen line ends with "|", which reads as one more empty column
+
+
+def read_blocks(source: BinaryIO, block_size: int = BLOCK_BYTES) -> Iterator[bytes]:
+    """Blocks of whole lines from ``source``, each of about ``block_size`` bytes."""
+    rest = b""
+    while True:
+        data = source.read(block_size)
+        if not data:
+            break
+        end = data.rfind(b"\n") + 1
+        if not end:
+            rest += data
+            continue
+        yield rest + data[:end]
+        rest = data[end:]
+    if rest:
+        yield rest
+
+
+def read_batches(table: str, source: BinaryIO, options: GenerationOptions, block_size: int = BLOCK_BYTES) -> Iterator:
+    """Typed record batches of ``table`` from a binary stream of dsdgen lines.
+
+    Empty fields are NULL, in every column type, as in spark-sql-perf.
+    ``source`` is read on the calling thread (pyarrow's stream reader
+    would read it on one of its own), so a :class:`TimedReader` charges
+    the wait for dsdgen to the thread that is parsing.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as csv
+
+    schema = arrow_schema(table, options.use_double_for_decimal, options.use_string_for_date)
+    read_options = csv.ReadOptions(column_names=schema.names + [_TRAILING], block_size=block_size)
+    parse_options = csv.ParseOptions(delimiter="|", quote_char=False, double_quote=False)
+    convert_options = csv.ConvertOptions(
+        column_types=schema,
+        null_values=[""],
+        strings_can_be_null=True,
+        include_columns=schema.names,
+    )
+    for block in read_blocks(source, block_size):
+        parsed = csv.read_csv(pa.BufferReader(block), read_options, parse_options, convert_options)
+        yield from parsed.to_batches()
+
+
+class TimedReader:
+    """Reads a stream ahead on a thread and charges the wait for its data to the ``dsdgen`` stage.
+
+    Up to ``buffer_bytes`` are read ahead, so dsdgen keeps writing while a
+    block is parsed and encoded. :meth:`read` is called on the parsing
+    thread, where the wait nests in its ``parse`` stage; the CPU of the
+    read-ahead thread is added to ``dsdgen`` too. :meth:`close` stops
+    reading ahead; the thread ends once its last read returns.
+    """
+
+    def __init__(
+        self, raw: BinaryIO, clock: StageClock, buffer_bytes: int = READ_AHEAD_BYTES, read_size: int = 1024 * 1024
+    ):
+        self.raw = raw
+        self.clock = clock
+        self.read_size = read_size
+        self._queue: queue.Queue = queue.Queue(max(1, buffer_bytes // read_size))
+        self._rest = b""
+        self._eof = False
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._read_ahead, name="tpcds-read-ahead", daemon=True)
+        self._thread.start()
+
+    def _read_ahead(self) -> None:
+        mark = time.thread_time()
+        try:
+            while True:
+                data = self.raw.read1(self.read_size)
+                # Added before the data is handed over, so it is counted once the parser has seen the end.
+                now = time.thread_time()
+                self.clock.add("dsdgen", now - mark)
+                mark = now
+                if not self._put(data) or not data:
+                    return
+        except (OSError, ValueError) as e:  # e.g. the pipe closed under the read
+            self._put(e)
+
+    def _put(self, item) -> bool:
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def read(self, size: int = -1) -> bytes:
+        parts, length = [self._rest], len(self._rest)
+        with self.clock.stage("dsdgen"):
+            while not self._eof and (size < 0 or length < size):
+                data = self._queue.get()
+                if isinstance(data, Exception):
+                    raise data
+                self._eof = not data
+                parts.append(data)
+                length += len(data)
+        data = b"".join(parts)
+        size = len(data) if size < 0 else size
+        self._rest = data[size:]
+        return data[:size]
+
+    def close(self) -> None:
+        self._closed.set()
+
+    def __enter__(self) -> "TimedReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ParquetSink:
+    """Streams record batches of one table into a Parquet file.
+
+    The table's profile in ``options.writer_profiles`` sets up the writer;
+    tables without one are written with ``codec`` and the writer defaults.
+    A ``partition_column`` is left out of the file, as Spark's
+    ``partitionBy`` does.
+    Once closed, ``metadata`` holds the footer of the file.
+    Waiting for the next batch (reading and parsing) is charged to the
+    ``parse`` stage of ``clock``, the Parquet writer to ``encode``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str,
+        options: GenerationOptions,
+        codec: str = "snappy",
+        clock: StageClock | None = None,
+        partition_column: str | None = None,
+    ):
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self.rows = 0
+        self.clock = clock or StageClock()
+        self.schema = arrow_schema(table, options.use_double_for_decimal, options.use_string_for_date)
+        if partition_column is not None:
+            self.schema = self.schema.remove(self.schema.get_field_index(partition_column))
+        self.partition_column = partition_column
+        profile = options.writer_profiles.get(table) or WriterProfile()
+        self.profile = replace(profile, codec=profile.codec or codec)
+        self._writer = pq.ParquetWriter(path, self.schema, **self.profile.parquet_options())
+        self._pending = []  # batches of the next row group, with row_group_bytes
+        self._pending_bytes = 0
+        self.metadata = None
+
+    def write(self, batches: Iterable) -> None:
+        batches = iter(batches)
+        while True:
+            with self.clock.stage("parse"):
+                batch = next(batches, None)
+            if batch is None:
+                return
+            if self.partition_column is not None:
+                batch = batch.select(self.schema.names)
+            with self.clock.stage("encode"):
+                self._add(batch)
+            self.rows += batch.num_rows
+
+    def _add(self, batch) -> None:
+        if self.profile.row_group_bytes is None:
+            self._writer.write_batch(batch)
+            return
+        self._pending.append(batch)
+        self._pending_bytes += batch.nbytes
+        if self._pending_bytes >= self.profile.row_group_bytes:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._pending:
+            import pyarrow as pa
+
+            group = pa.Table.from_batches(self._pending, self.schema)
+            self._writer.write_table(group, row_group_size=group.num_rows)
+            self._pending, self._pending_bytes = [], 0
+
+    def close(self) -> None:
+        with self.clock.stage("encode"):
+            self._flush()
+            self._writer.close()
+        self.metadata = self._writer.writer.metadata
+
+    def __enter__(self) -> "ParquetSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
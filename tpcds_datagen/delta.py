@@ -0,0 +1,263 @@
+"""Delta Lake transaction logs for the tables the chunks engine writes.
+
+With ``file_format="delta"`` the chunks engine writes the same Parquet
+files as for ``"parquet"``, and the driver also keeps a ``_delta_log``
+in every table directory, so Spark (``spark.read.format("delta")``) and
+any other Delta reader see the table only through its log:
+
+* the table is created (protocol and schema, version 0) when its units
+  are planned, so it reads as empty until the first units commit;
+* as units commit, their files are added in one new version, at most
+  every ``interval`` seconds of the :class:`.manifest.ManifestWriter`.
+  Readers see whole units or nothing, never a file that is still being
+  written or one a retried task will replace, even while the dataset is
+  being generated;
+* each ``add`` carries the data-skipping statistics Delta would collect
+  (row count, per-column min/max and null counts of the first
+  :data:`STATS_COLUMNS` columns), taken from the footer of the file when
+  the task wrote it, so nothing is read back;
+* files that reconcile drops, and those :mod:`.compaction` replaces, are
+  removed from the log in the same way; a rewrite that keeps the row count
+  is recorded as an ``OPTIMIZE`` without data change.
+
+Versions are written put-if-absent (the same exclusive create as the
+commit log, see :func:`.fs.write_text`), so a second writer can never
+overwrite one; on a conflict
+the log is read again and the commit retried at the next version. Only
+JSON commits are written; Delta adds checkpoints on its own next write.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from urllib.parse import quote, unquote
+
+from .commitlog import OutputFile
+from .fs import local_path, write_text
+from .schema import column_types
+from .spec import GenerationOptions, TableSpec
+from .tables import HIVE_DEFAULT_PARTITION, PARTITION_COLUMNS
+
+DELTA_LOG_DIR = "_delta_log"
+STATS_COLUMNS = 32  # Delta's default delta.dataSkippingNumIndexedCols
+STRING_STATS_LENGTH = 32  # Delta's default dataSkippingStringPrefixLength
+ENGINE_INFO = "tpcds_datagen"
+_SPARK_TYPES = {"int": "integer", "bigint": "long"}  # the other type names are the same in Spark's JSON schema
+
+
+def _json_value(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if not isinstance(value, (int, float, str)):  # Decimal: Delta writes decimals as JSON numbers
+        return float(value)
+    return value
+
+
+def file_stats(metadata, indexed_columns: int = STATS_COLUMNS) -> dict:
+    """Delta statistics of a Parquet file from its footer (``pyarrow.parquet.FileMetaData``).
+
+    Columns whose bounds the footer does not have (a row group without
+    statistics, or a string longer than :data:`STRING_STATS_LENGTH`) get
+    no min or max, so readers do not skip on them.
+    """
+    min_values, max_values, null_count = {}, {}, {}
+    for i, name in enumerate(metadata.schema.names[:indexed_columns]):
+        nulls, low, high, bounded = 0, None, None, True
+        for g in range(metadata.num_row_groups):
+            group = metadata.row_group(g)
+            stats = group.column(i).statistics
+            if stats is None or not stats.has_null_count:
+                nulls = None
+                break
+            nulls += stats.null_count
+            if stats.has_min_max:
+                low = stats.min if low is None else min(low, stats.min)
+                high = stats.max if high is None else max(high, stats.max)
+            elif stats.null_count < group.num_rows:
+                bounded = False
+        if nulls is None:
+            continue
+        null_count[name] = nulls
+        if bounded and low is not None:
+            min_values[name] = _json_value(low[:STRING_STATS_LENGTH] if isinstance(low, str) else low)
+            if not (isinstance(high, str) and len(high) > STRING_STATS_LENGTH):
+                max_values[name] = _json_value(high)
+    return {"numRecords": metadata.num_rows, "minValues": min_values, "maxValues": max_values, "nullCount": null_count}
+
+
+def schema_string(table: str, options: GenerationOptions) -> str:
+    """Spark's JSON schema of ``table``, with the type options applied."""
+    fields = [
+        {"name": name, "type": _SPARK_TYPES.get(type_name, type_name), "nullable": True, "metadata": {}}
+        for name, type_name in column_types(table, options.use_double_for_decimal, options.use_string_for_date)
+    ]
+    return json.dumps({"type": "struct", "fields": fields})
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class DeltaLog:
+    """The ``_delta_log`` of one table: replays its JSON commits and appends new ones."""
+
+    def __init__(self, location: str):
+        self.location = location
+        self.directory = local_path(f"{location}/{DELTA_LOG_DIR}")
+        self.version = -1
+        self.files: dict[str, dict] = {}  # path relative to the table -> its add action
+        self.partition_columns: list[str] = []
+
+    def _path(self, version: int) -> str:
+        return os.path.join(self.directory, f"{version:020d}.json")
+
+    def exists(self) -> bool:
+        return os.path.exists(self._path(0))
+
+    def update(self) -> int:
+        """Read the versions written since the last update and return the latest."""
+        if self.version < 0 and not self.exists() and os.path.isdir(self.directory):
+            if any(name.endswith(".checkpoint.parquet") for name in os.listdir(self.directory)):
+                raise ValueError(f"{self.location}: the Delta log starts at a checkpoint, which is not read here")
+        while os.path.exists(self._path(self.version + 1)):
+            with open(self._path(self.version + 1)) as f:
+                for line in f:
+                    if line.strip():
+                        self._apply(json.loads(line))
+            self.version += 1
+        return self.version
+
+    def _apply(self, action: dict) -> None:
+        if "add" in action:
+            self.files[unquote(action["add"]["path"])] = action["add"]
+        elif "remove" in action:
+            self.files.pop(unquote(action["remove"]["path"]), None)
+        elif "metaData" in action:
+            self.partition_columns = action["metaData"]["partitionColumns"]
+
+    def commit(self, actions: list[dict], operation: str, parameters: dict | None = None) -> bool:
+        """Write ``actions`` as the next version; False if another writer took that version first."""
+        info = {
+            "commitInfo": {
+                "timestamp": _now_ms(),
+                "operation": operation,
+                "operationParameters": parameters or {},
+                "isBlindAppend": not any("remove" in a for a in actions),
+                "engineInfo": ENGINE_INFO,
+            }
+        }
+        text = "".join(json.dumps(action) + "\n" for action in [info] + actions)
+        if not write_text(self._path(self.version + 1), text, exclusive=True):
+            return False
+        self.update()
+        return True
+
+    def create(self, schema: str, partition_columns: list[str]) -> None:
+        """Write version 0 (protocol and table metadata) unless the table exists."""
+        if self.exists():
+            return
+        actions = [
+            {"protocol": {"minReaderVersion": 1, "minWriterVersion": 2}},
+            {
+                "metaData": {
+                    "id": str(uuid.uuid4()),
+                    "format": {"provider": "parquet", "options": {}},
+                    "schemaString": schema,
+                    "partitionColumns": partition_columns,
+                    "configuration": {},
+                    "createdTime": _now_ms(),
+                }
+            },
+        ]
+        self.commit(actions, "CREATE TABLE", {"partitionBy": json.dumps(partition_columns)})
+
+    def _partition_values(self, path: str) -> dict:
+        values = dict(part.split("=", 1) for part in path.split("/")[:-1] if "=" in part)
+        return {
+            column: None if values.get(column) == HIVE_DEFAULT_PARTITION else values.get(column)
+            for column in self.partition_columns
+        }
+
+    def _add(self, root_dir: str, path: str, output: OutputFile) -> dict:
+        stats = output.stats
+        if stats is None:  # e.g. written by compaction: read the footer
+            import pyarrow.parquet as pq
+
+            stats = file_stats(pq.ParquetFile(local_path(f"{root_dir}/{output.path}")).metadata)
+        add = {
+            "path": quote(path, safe="/="),
+            "partitionValues": self._partition_values(path),
+            "size": output.bytes,
+            "modificationTime": _now_ms(),
+            "dataChange": True,
+            "stats": json.dumps(stats),
+        }
+        if output.sha256:
+            add["tags"] = {"sha256": output.sha256}
+        return add
+
+    def sync(self, root_dir: str, table: str, outputs: list[OutputFile]) -> int | None:
+        """Make the table's files those of ``outputs``, in one new version; None if they already are.
+
+        A version that removes files and keeps the row count (a compaction,
+        or a unit regenerated in finer files) is an ``OPTIMIZE`` without
+        data change.
+        """
+        desired = {os.path.relpath(f.path, table): f for f in outputs}
+        while True:
+            self.update()
+            removed = [
+                path
+                for path, add in self.files.items()
+                if path not in desired
+                or add["size"] != desired[path].bytes
+                or add.get("tags", {}).get("sha256", desired[path].sha256) != desired[path].sha256
+            ]
+            added = [path for path in desired if path not in self.files or path in removed]
+            if not removed and not added:
+                return None
+            adds = [self._add(root_dir, path, desired[path]) for path in added]
+            removed_stats = [json.loads(self.files[path].get("stats") or "{}") for path in removed]
+            rows_removed = sum(stats.get("numRecords", -1) for stats in removed_stats)
+            data_change = (
+                not removed
+                or any("numRecords" not in stats for stats in removed_stats)
+                or rows_removed != sum(desired[path].rows for path in added)
+            )
+            removes = [
+                {
+                    "remove": {
+                        "path": self.files[path]["path"],
+                        "deletionTimestamp": _now_ms(),
+                        "dataChange": data_change,
+                        "extendedFileMetadata": True,
+                        "partitionValues": self.files[path]["partitionValues"],
+                        "size": self.files[path]["size"],
+                    }
+                }
+                for path in removed
+            ]
+            for add in adds:
+                add["dataChange"] = data_change
+            operation = "WRITE" if data_change else "OPTIMIZE"
+            if self.commit(removes + [{"add": add} for add in adds], operation):
+                return self.version
+
+
+def is_delta_table(root_dir: str, table: str) -> bool:
+    return DeltaLog(f"{root_dir}/{table}").exists()
+
+
+def create_delta_tables(spec: TableSpec, options: GenerationOptions) -> None:
+    """Create the Delta log of each of ``spec``'s tables that has none yet."""
+    for table in spec.tables:
+        partition_columns = [PARTITION_COLUMNS[table]] if options.partition_tables and table in PARTITION_COLUMNS else []
+        DeltaLog(f"{spec.root_dir}/{table}").create(schema_string(table, options), partition_columns)
+
+
+def sink_stats(spec: TableSpec, sink) -> dict | None:
+    """Statistics of the file a closed :class:`.convert.ParquetSink` wrote, if ``spec`` is a Delta table."""
+    return file_stats(sink.metadata) if spec.file_format == "delta" else None
@@ -0,0 +1,109 @@
+"""Table-driven driver for spark-sql-perf's ``TPCDSTables.genData``.
+
+Replaces one notebook cell per table: the ``TPCDSTables`` instance is built
+once and ``genData`` is called for every spec of the plan in turn. With the
+``chunks`` engine, and for paired sales/returns specs, tables are generated
+by :func:`generate_chunks` instead.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from .chunks import generate_chunks
+from .manifest import start_dataset_manifest
+from .spec import GenerationOptions, TableSpec, describe_plan, validate_plan
+from .writer_profiles import spark_conf
+
+
+@dataclass(frozen=True)
+class TableResult:
+    spec: TableSpec
+    seconds: float
+
+
+class GenerationDriver:
+    """Runs ``genData`` for each :class:`TableSpec` against a single ``TPCDSTables``."""
+
+    def __init__(self, spark, options: GenerationOptions):
+        self.spark = spark
+        self.options = options
+        self._tables = None
+
+    @property
+    def tables(self):
+        """The JVM ``TPCDSTables`` object, created on first use."""
+        if self._tables is None:
+            jvm = self.spark._jvm
+            self._tables = jvm.com.databricks.spark.sql.perf.tpcds.TPCDSTables(
+                self.spark._jsparkSession.sqlContext(),
+                self.options.dsdgen_dir,
+                str(self.options.scale_factor),
+                self.options.use_double_for_decimal,
+                self.options.use_string_for_date,
+            )
+        return self._tables
+
+    def generate(self, spec: TableSpec) -> TableResult:
+        options = self.options
+        start = time.monotonic()
+        if self.chunked(spec):
+            codec = self.spark.conf.get("spark.sql.parquet.compression.codec", "snappy")
+            generate_chunks(self.spark, spec, options, codec, resume=options.resume)
+            return TableResult(spec, time.monotonic() - start)
+        with self._writer_profile(spec):
+            self.tables.genData(
+                spec.root_dir,
+                spec.file_format,
+                options.overwrite,
+                options.partition_tables,
+                options.cluster_by_partition_columns,
+                options.filter_out_null_partition_values,
+                spec.table,
+                spec.num_partitions,
+            )
+        return TableResult(spec, time.monotonic() - start)
+
+    def chunked(self, spec: TableSpec) -> bool:
+        """Whether ``spec`` is generated by :func:`generate_chunks`, which keeps manifests, or by genData."""
+        return bool(spec.paired_table) or self.options.engine == "chunks"
+
+    def start_manifests(self, plan: Iterable[TableSpec]) -> None:
+        """Mark the chunk-generated tables of the plan incomplete in the dataset manifest."""
+        start_dataset_manifest([spec for spec in plan if self.chunked(spec)], self.options)
+
+    @contextmanager
+    def _writer_profile(self, spec: TableSpec) -> Iterator[None]:
+        """Set the Spark conf of the table's writer profile for the block, then restore it."""
+        profile = self.options.writer_profiles.get(spec.table)
+        if profile is None or spec.file_format not in ("parquet", "delta"):
+            yield
+            return
+        conf = self.spark.conf
+        saved = {key: conf.get(key, None) for key in spark_conf(profile)}
+        for key, value in spark_conf(profile).items():
+            conf.set(key, value)
+        try:
+            yield
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    conf.unset(key)
+                else:
+                    conf.set(key, value)
+
+    def run(self, specs: Iterable[TableSpec]) -> list[TableResult]:
+        """Generate every table of the plan and return the per-table durations."""
+        plan = validate_plan(specs)
+        print(describe_plan(plan))
+        self.start_manifests(plan)
+        results = []
+        for i, spec in enumerate(plan, 1):
+            print(f"[{i}/{len(plan)}] {spec.table}: numPartitions={spec.num_partitions}")
+            result = self.generate(spec)
+            print(f"[{i}/{len(plan)}] {spec.table}: done in {result.seconds / 60:.1f} min")
+            results.append(result)
+        return results
@@ -0,0 +1,172 @@
+"""Running dsdgen the way spark-sql-perf's ``DSDGEN`` data generator does."""
+
+from __future__ import annotations
+
+import io
+import os
+import resource
+import subprocess
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+
+RNG_SEED = 100  # spark-sql-perf always generates with -RNGSEED 100
+
+
+def dsdgen_command(table: str, scale_factor: int, parallel: int = 1, child: int = 1, rng_seed: int = RNG_SEED) -> list[str]:
+    """Command line that writes one child chunk of ``table`` to stdout."""
+    command = ["./dsdgen", "-table", table, "-filter", "Y", "-scale", str(scale_factor), "-RNGSEED", str(rng_seed)]
+    if parallel > 1:
+        command += ["-parallel", str(parallel), "-child", str(child)]
+    return command
+
+
+def dsdgen_dir_command(
+    table: str, scale_factor: int, parallel: int, child: int, output_dir: str, rng_seed: int = RNG_SEED
+) -> list[str]:
+    """Command line that writes one child chunk to ``.dat`` files in ``output_dir``.
+
+    Without ``-filter`` dsdgen also writes the tables generated alongside
+    ``table``, e.g. store_returns for store_sales.
+    """
+    command = ["./dsdgen", "-table", table, "-scale", str(scale_factor), "-RNGSEED", str(rng_seed)]
+    command += ["-dir", output_dir, "-force", "Y"]
+    if parallel > 1:
+        command += ["-parallel", str(parallel), "-child", str(child)]
+    return command
+
+
+def dat_file_name(table: str, parallel: int, child: int) -> str:
+    """Name of the file dsdgen writes for ``table`` with ``-dir``."""
+    return f"{table}_{child}_{parallel}.dat" if parallel > 1 else f"{table}.dat"
+
+
+def run_to_dir(table: str, scale_factor: int, parallel: int, child: int, dsdgen_dir: str, output_dir: str) -> float:
+    """Run dsdgen into ``output_dir`` and return the CPU seconds it used."""
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    result = subprocess.run(
+        dsdgen_dir_command(table, scale_factor, parallel, child, output_dir),
+        cwd=dsdgen_dir,
+        capture_output=True,
+        text=True,
+        errors="replace",
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"dsdgen failed for {table} child {child}/{parallel}: {result.stderr.strip()}")
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return after.ru_utime + after.ru_stime - before.ru_utime - before.ru_stime
+
+
+class DsdgenProcess:
+    """A running dsdgen for one child chunk, writing to a pipe."""
+
+    def __init__(self, table: str, scale_factor: int, parallel: int, child: int, dsdgen_dir: str):
+        self.table = table
+        self.parallel = parallel
+        self.child = child
+        self.cpu_seconds: float | None = None
+        # dsdgen looks up tpcds.idx in the working directory.
+        self.process = subprocess.Popen(
+            dsdgen_command(table, scale_factor, parallel, child),
+            cwd=dsdgen_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    @property
+    def stdout(self) -> BinaryIO:
+        return self.process.stdout
+
+    def finish(self) -> float:
+        """Wait for dsdgen to exit, raise if it failed and return its CPU seconds."""
+        if self.cpu_seconds is None:
+            process = self.process
+            process.stdout.close()
+            stderr = process.stderr.read().decode(errors="replace")
+            process.stderr.close()
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            self.cpu_seconds = usage.ru_utime + usage.ru_stime
+            if process.returncode != 0:
+                raise RuntimeError(
+                    f"dsdgen failed for {self.table} child {self.child}/{self.parallel}: {stderr.strip()}"
+                )
+        return self.cpu_seconds
+
+    def kill(self) -> None:
+        """Stop dsdgen, e.g. when its output is no longer wanted; :meth:`finish` then does nothing."""
+        self.process.kill()
+        self.process.communicate()
+        self.cpu_seconds = 0.0
+
+
+@contextmanager
+def open_stdout(table: str, scale_factor: int, parallel: int, child: int, dsdgen_dir: str) -> Iterator[BinaryIO]:
+    """dsdgen's stdout for one child chunk as a binary stream; raises if dsdgen fails."""
+    process = DsdgenProcess(table, scale_factor, parallel, child, dsdgen_dir)
+    try:
+        yield process.stdout
+    finally:
+        process.finish()
+
+
+def first_row(table: str, scale_factor: int, parallel: int, child: int, dsdgen_dir: str) -> bytes:
+    """The first line of one child chunk, or ``b""`` if the chunk is empty.
+
+    dsdgen skips ahead to a child's first row without generating the rows
+    before it, so this is quick for any child.
+    """
+    process = DsdgenProcess(table, scale_factor, parallel, child, dsdgen_dir)
+    try:
+        return process.stdout.readline()
+    finally:
+        process.kill()
+
+
+def iter_lines(table: str, scale_factor: int, parallel: int, child: int, dsdgen_dir: str) -> Iterator[str]:
+    """Yield the pipe-delimited lines dsdgen prints for one child chunk."""
+    with open_stdout(table, scale_factor, parallel, child, dsdgen_dir) as stdout:
+        yield from io.TextIOWrapper(stdout, errors="replace")
+
+
+def chunk_streams(
+    table: str, scale_factor: int, parallel: int, children: list[int], dsdgen_dir: str
+) -> Iterator[DsdgenProcess]:
+    """Yield the dsdgen process of each child chunk in turn.
+
+    The dsdgen of the next child is started before the current one is
+    handed out, so its start-up (reading tpcds.idx, seeding and skipping
+    ahead to the child's first row) overlaps with consuming the current
+    chunk; it then blocks on the full pipe until its turn. A consumer may
+    call :meth:`DsdgenProcess.finish` itself to get dsdgen's CPU time.
+    """
+    following = DsdgenProcess(table, scale_factor, parallel, children[0], dsdgen_dir) if children else None
+    try:
+        for i, child in enumerate(children):
+            process = following
+            following = None
+            if i + 1 < len(children):
+                following = DsdgenProcess(table, scale_factor, parallel, children[i + 1], dsdgen_dir)
+            try:
+                yield process
+            finally:
+                process.finish()
+    finally:
+        if following is not None:
+            following.kill()
+
+
+def split_fields(line: str) -> list[str | None]:
+    """Split a dsdgen line into fields; empty fields are NULL.
+
+    Every line ends with a trailing ``|``, which is dropped.
+    """
+    return [field or None for field in line.rstrip("\n").split("|")[:-1]]
+
+
+def dsdgen_release(dsdgen_dir: str) -> str | None:
+    """The version banner of the dsdgen build, or None if it cannot be read."""
+    try:
+        result = subprocess.run(["./dsdgen", "-RELEASE"], cwd=dsdgen_dir, capture_output=True, text=True, timeout=60)
+    except OSError:
+        return None
+    return (result.stdout or result.stderr).strip() or None
@@ -0,0 +1,129 @@
+"""Paths as seen by Python code on the driver and on the executors.
+
+Spark paths such as ``/mnt/datalake/...`` or ``dbfs:/...`` are visible to
+plain Python file APIs under the ``/dbfs`` FUSE mount on Databricks.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import shutil
+import tempfile
+import uuid
+
+DBFS_FUSE = "/dbfs"
+TEMP_SUFFIX = ".tmp"
+
+
+def local_path(path: str) -> str:
+    """Map a Spark/DBFS path to a path Python's file APIs can open."""
+    if path.startswith("dbfs:/"):
+        return DBFS_FUSE + "/" + path[len("dbfs:/"):].lstrip("/")
+    if path.startswith("/mnt/") and os.path.isdir(DBFS_FUSE):
+        return DBFS_FUSE + path
+    return path
+
+
+def scratch_dir() -> str:
+    """A fresh directory on fast local disk for intermediate files."""
+    base = "/local_disk0/tmp" if os.path.isdir("/local_disk0") else None
+    if base:
+        os.makedirs(base, exist_ok=True)
+    return tempfile.mkdtemp(prefix="tpcds-", dir=base)
+
+
+def remove_tree(path: str) -> None:
+    shutil.rmtree(local_path(path), ignore_errors=True)
+
+
+def temp_path(path: str) -> str:
+    """A unique hidden name next to ``path`` to write to before renaming it into place.
+
+    Every task attempt gets its own name, so a retried or speculative attempt
+    never writes into a file another attempt is still writing.
+    """
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.{uuid.uuid4().hex}{TEMP_SUFFIX}")
+
+
+def is_temp_file(name: str) -> bool:
+    return name.startswith(".") and name.endswith(TEMP_SUFFIX)
+
+
+def publish(src: str, dest: str) -> int:
+    """Atomically put a finished local file at its destination and return its size.
+
+    Readers see either no file or the complete one. Chunk outputs are
+    deterministic, so when two attempts publish the same file the last
+    rename replaces it with identical bytes.
+    """
+    dest = local_path(dest)
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    tmp = temp_path(dest)
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
+    return os.path.getsize(src)
+
+
+def write_text(path: str, text: str, exclusive: bool = False) -> bool:
+    """Write ``path`` atomically; with ``exclusive``, only if it does not exist yet (put-if-absent).
+
+    The exclusive write hard-links a complete temporary file into place.
+    File systems without hard links (DBFS FUSE) get an ``O_EXCL`` create
+    instead, which is just as exclusive but not atomic: a reader racing
+    the write can see the file before all of ``text`` is in it.
+    """
+    path = local_path(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = temp_path(path)
+    with open(tmp, "w") as f:
+        f.write(text)
+    if not exclusive:
+        os.replace(tmp, path)
+        return True
+    try:
+        os.link(tmp, path)  # unlike a rename, fails if the file exists
+    except FileExistsError:
+        return False
+    except OSError:
+        # No hard links on this file system: create the file itself, failing if it exists.
+        try:
+            f = open(path, "x")
+        except FileExistsError:
+            return False
+        try:
+            with f:
+                f.write(text)
+        except BaseException:
+            os.remove(path)
+            raise
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp)
+    return True
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def list_data_files(path: str) -> list[tuple[str, int]]:
+    """``(path, size)`` of every data file under ``path``, sorted by path.
+
+    Like Spark, skips names starting with ``_`` or ``.`` (commit logs,
+    ``_SUCCESS``, temporary files), in sub-directories too.
+    """
+    files = []
+    for directory, dirs, names in os.walk(local_path(path)):
+        dirs[:] = [d for d in dirs if not d.startswith(("_", "."))]
+        for name in names:
+            if not name.startswith(("_", ".")):
+                file_path = os.path.join(directory, name)
+                files.append((file_path, os.path.getsize(file_path)))
+    return sorted(files)
@@ -0,0 +1,216 @@
+"""Generate a dataset on one machine, without Spark.
+
+The chunk units of every table run in a local process pool and are written
+exactly as the chunks engine writes them on a cluster: the same
+``TableSpec`` plan, the same ``source_files_${scaleName}_${fileFormat}``
+layout, the same commit log and resume. For small scale factors this is
+much quicker than starting a cluster, and it needs nothing but dsdgen and
+pyarrow, so the pipeline can be tested and benchmarked in CI::
+
+    python -m tpcds_datagen --scale-factor 10 --base /data/tpc-ds \\
+        --dsdgen-dir /usr/local/bin/tpcds-kit/tools
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterable, Mapping
+
+from .chunks import commit_split, finish_units, prepare_units, run_split_part, run_unit
+from .driver import TableResult
+from .makespan import estimate_core_seconds, order_longest_first
+from .manifest import ManifestWriter, start_dataset_manifest
+from .planner import DEFAULT_TARGET_FILE_BYTES, describe_partition_plan, plan_num_partitions
+from .profiling import summarize_stages
+from .progress import collect_metrics
+from .spec import DSDGEN_DIR, GenerationOptions, TableSpec, describe_plan, pair_sales_returns, table_specs, validate_plan
+from .stragglers import StragglerTracker, split_factor, split_parts
+from .tables import TABLES
+from .writer_profiles import tuned_writer_profiles
+
+
+class LocalGenerator:
+    """Runs the chunk units of a plan on ``workers`` local processes, longest tables first."""
+
+    def __init__(
+        self,
+        options: GenerationOptions,
+        workers: int | None = None,
+        codec: str = "snappy",
+        bytes_per_row: Mapping[str, float] | None = None,
+    ):
+        self.options = options
+        self.workers = workers or os.cpu_count()
+        self.codec = codec
+        self.bytes_per_row = bytes_per_row
+
+    def run(self, specs: Iterable[TableSpec]) -> list[TableResult]:
+        """Generate every table of the plan and return the per-table durations."""
+        plan = validate_plan(specs)
+        work = {spec.table: estimate_core_seconds(spec, self.options.scale_factor, None, self.bytes_per_row) for spec in plan}
+        plan = order_longest_first(plan, work)
+        print(describe_plan(plan))
+        start_dataset_manifest(plan, self.options)
+        start = time.monotonic()
+        results = []
+        with ProcessPoolExecutor(self.workers) as pool:
+            self._pool = pool
+            self._futures = {}  # future -> (spec, unit, part); part is None for a whole unit
+            self._open = {}  # table -> numbers of the units not committed yet
+            self._in_flight = Counter()
+            self._splits = {}
+            self._manifests = {}
+            for spec in plan:
+                todo = prepare_units(spec, self.options, self.workers, self.options.resume)
+                self._manifests[spec.table] = ManifestWriter(spec)
+                self._open[spec.table] = dict(todo)
+                for unit in todo:
+                    self._submit(spec, unit, None, run_unit, spec, self.options, self.codec, unit)
+            for spec in plan:
+                if not self._open[spec.table]:
+                    results.append(self._finish(spec, start, len(results), len(plan)))
+            tracker = StragglerTracker(self.options.straggler_factor)
+            started = {}
+            timeout = 1.0 if self.options.split_stragglers else None
+            while self._futures:
+                done, _ = wait(self._futures, timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    spec, unit, part = self._futures.pop(future)
+                    started.pop(future, None)
+                    self._in_flight[spec.table] -= 1
+                    result = future.result()
+                    if part is None and result is not None:
+                        tracker.record(spec.table, sum(m.seconds for m in result.metrics), len(result.children))
+                        self._manifests[spec.table].add(result)
+                        self._open[spec.table].pop(result.number, None)
+                    elif part is not None:
+                        self._part_done(spec, unit, part, result)
+                    if not self._open[spec.table] and not self._in_flight[spec.table]:
+                        results.append(self._finish(spec, start, len(results), len(plan)))
+                if self.options.split_stragglers:
+                    self._split_stragglers(tracker, started)
+        return results
+
+    def _submit(self, spec: TableSpec, unit: tuple[int, list[int]], part: tuple[int, int, int] | None, fn, *args) -> None:
+        self._futures[self._pool.submit(fn, *args)] = (spec, unit, part)
+        self._in_flight[spec.table] += 1
+
+    def _split_stragglers(self, tracker: StragglerTracker, started: dict) -> None:
+        """Split units that run far longer than the median while cores are idle."""
+        now = time.monotonic()
+        idle = self.workers - len(self._futures)  # with fewer futures than workers, every one is running
+        for future, (spec, unit, part) in list(self._futures.items()):
+            if part is not None or not future.running():
+                continue
+            elapsed = now - started.setdefault(future, now)
+            number, children = unit
+            key = (spec.table, number)
+            if idle < 2 or spec.paired_table or self.options.clustering_column(spec.table):
+                continue
+            if key in self._splits or number not in self._open[spec.table]:
+                continue
+            if not tracker.is_straggler(spec.table, elapsed, len(children)):
+                continue
+            factor = split_factor(spec, self.options, children, idle)
+            self._splits[key] = (factor, {})
+            if factor is None:
+                print(f"{spec.table}: unit {number} is straggling, but no finer split lines up with its chunks")
+                continue
+            print(f"{spec.table}: unit {number} is straggling after {elapsed:.0f}s; splitting it {factor} ways")
+            for part in split_parts(unit, factor):
+                self._submit(spec, unit, part, run_split_part, spec, self.options, self.codec, factor, part)
+                idle -= 1
+
+    def _part_done(self, spec: TableSpec, unit: tuple[int, list[int]], part: tuple[int, int, int], result) -> None:
+        number, children = unit
+        factor, results = self._splits[(spec.table, number)]
+        results[part] = result
+        if len(results) == len(children) * factor:
+            parts = [results[p] for p in split_parts(unit, factor)]
+            commit = commit_split(spec, unit, factor, parts)
+            if commit is not None:
+                self._manifests[spec.table].add(commit)
+                self._open[spec.table].pop(number, None)
+                print(f"{spec.table}: unit {number} committed from its {len(parts)}-way split")
+
+    def _finish(self, spec: TableSpec, start: float, finished: int, total: int) -> TableResult:
+        finish_units(spec, self._manifests[spec.table])
+        result = TableResult(spec, time.monotonic() - start)
+        print(f"[{finished + 1}/{total}] {spec.table}: done after {result.seconds / 60:.1f} min")
+        return result
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate TPC-DS Parquet files on this machine.")
+    parser.add_argument("--scale-factor", type=int, required=True)
+    parser.add_argument("--base", required=True, help="the dataset is written to BASE/source_files_<scaleName>_parquet")
+    parser.add_argument("--dsdgen-dir", default=DSDGEN_DIR)
+    parser.add_argument("--tables", nargs="+", default=TABLES, choices=TABLES, metavar="TABLE")
+    parser.add_argument("--target-file-mb", type=int, default=DEFAULT_TARGET_FILE_BYTES // 2**20)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--codec", default="snappy")
+    parser.add_argument(
+        "--file-format", choices=("parquet", "delta"), default="parquet", help="delta: also keep a Delta log per table"
+    )
+    parser.add_argument(
+        "--tuned-writer-profiles", action="store_true", help="write with tuned_writer_profiles() instead of CODEC for every table"
+    )
+    parser.add_argument("--no-pairing", action="store_true", help="run dsdgen separately for sales and returns")
+    parser.add_argument("--use-double-for-decimal", action="store_true")
+    parser.add_argument("--use-string-for-date", action="store_true")
+    parser.add_argument("--resume", action="store_true", help="keep committed chunks of an earlier run")
+    parser.add_argument("--partition-tables", action="store_true", help="write the fact tables partitioned by date")
+    parser.add_argument("--filter-out-null-partition-values", action="store_true")
+    parser.add_argument("--chunks-per-task", type=int, default=1, help="dsdgen chunks each unit generates")
+    parser.add_argument(
+        "--cluster-by",
+        action="append",
+        default=[],
+        metavar="TABLE:COLUMN",
+        help="range-cluster TABLE's files by the integer COLUMN (repeatable); its sales/returns are not paired",
+    )
+    parser.add_argument("--split-stragglers", action="store_true", help="split units that run far longer than the rest")
+    parser.add_argument("--profile", action="store_true", help="measure CPU time per stage and print a stage summary")
+    parser.add_argument(
+        "--profile-chunk",
+        action="append",
+        default=[],
+        metavar="TABLE:CHILD",
+        help="save a folded stack profile of this chunk to PROFILE_DIR (repeatable)",
+    )
+    parser.add_argument("--profile-dir", default=None, help="default: BASE/_profiles")
+    args = parser.parse_args(argv)
+
+    options = GenerationOptions(
+        scale_factor=args.scale_factor,
+        dsdgen_dir=args.dsdgen_dir,
+        use_double_for_decimal=args.use_double_for_decimal,
+        use_string_for_date=args.use_string_for_date,
+        partition_tables=args.partition_tables,
+        filter_out_null_partition_values=args.filter_out_null_partition_values,
+        engine="chunks",
+        resume=args.resume,
+        chunks_per_task=args.chunks_per_task,
+        split_stragglers=args.split_stragglers,
+        profile=args.profile,
+        profile_chunks=tuple((table, int(child)) for table, child in (c.split(":") for c in args.profile_chunk)),
+        profile_dir=args.profile_dir or f"{args.base}/_profiles",
+        writer_profiles=tuned_writer_profiles() if args.tuned_writer_profiles else {},
+        cluster_by=dict(c.split(":") for c in args.cluster_by),
+    )
+    num_partitions = plan_num_partitions(args.scale_factor, args.target_file_mb * 2**20, tables=args.tables)
+    print(describe_partition_plan(num_partitions, args.scale_factor))
+    specs = table_specs(num_partitions, args.scale_factor, args.file_format, args.base)
+    if not args.no_pairing:
+        specs = pair_sales_returns(specs, exclude=options.clustered_tables)
+    LocalGenerator(options, args.workers, args.codec).run(specs)
+    if args.profile:
+        print(summarize_stages(collect_metrics(specs)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Estimate per-table work and predict the makespan of a concurrent run.
+
+Tables are ordered longest-processing-time first so the large fact tables
+start early and overlap, instead of one of them forming a serial tail at
+the end of the run. The prediction simulates the admission rule of
+:class:`ConcurrentGenerator` task by task, with FAIR sharing of cores
+between the running tables.
+"""
+
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import Mapping, Sequence
+
+from .planner import estimate_table_bytes
+from .spec import TableSpec
+from .tables import row_count
+
+# From the sample results: 333GB of Parquet in 4 hours on 16 cores.
+DEFAULT_CORE_BYTES_PER_SECOND = 1.5 * 1024 * 1024
+
+
+def estimate_core_seconds(
+    spec: TableSpec,
+    scale_factor: int,
+    core_seconds_per_row: Mapping[str, float] | None = None,
+    bytes_per_row: Mapping[str, float] | None = None,
+) -> float:
+    """Core-seconds needed to generate ``spec``.
+
+    Uses a calibrated cost per row when there is one, otherwise the
+    estimated output size at :data:`DEFAULT_CORE_BYTES_PER_SECOND`.
+    """
+    if core_seconds_per_row and spec.table in core_seconds_per_row:
+        return row_count(spec.table, scale_factor) * core_seconds_per_row[spec.table]
+    return estimate_table_bytes(spec.table, scale_factor, bytes_per_row) / DEFAULT_CORE_BYTES_PER_SECOND
+
+
+def order_longest_first(specs: Sequence[TableSpec], work: Mapping[str, float]) -> list[TableSpec]:
+    return sorted(specs, key=lambda spec: work[spec.table], reverse=True)
+
+
+@dataclass(frozen=True)
+class JobTimeline:
+    table: str
+    start: float
+    finish: float
+
+
+@dataclass(frozen=True)
+class MakespanEstimate:
+    makespan: float
+    # Total work spread perfectly over every core, or the longest table, whichever is larger.
+    lower_bound: float
+    jobs: list[JobTimeline]
+
+    def describe(self) -> str:
+        lines = [f"{'table':<24}{'start (min)':>12}{'finish (min)':>13}"]
+        for job in self.jobs:
+            lines.append(f"{job.table:<24}{job.start / 60:>12.1f}{job.finish / 60:>13.1f}")
+        lines.append(
+            f"predicted makespan: {self.makespan / 3600:.2f} h "
+            f"(lower bound {self.lower_bound / 3600:.2f} h, {self.makespan / self.lower_bound:.2f}x)"
+        )
+        return "\n".join(lines)
+
+
+def predict_makespan(
+    specs: Sequence[TableSpec],
+    work: Mapping[str, float],
+    cores: int,
+    max_jobs: int,
+) -> MakespanEstimate:
+    """Simulate running ``specs`` in order on ``cores`` task slots.
+
+    Each table is split into ``num_partitions`` equal tasks. A table is
+    admitted while fewer than ``max_jobs`` run and the outstanding tasks of
+    the running tables are below ``cores``; free cores go to the running
+    table with the fewest tasks in flight.
+    """
+    tasks = [spec.num_partitions for spec in specs]
+    duration = [work[spec.table] / spec.num_partitions for spec in specs]
+    started = [0] * len(specs)
+    finished = [0] * len(specs)
+    running = [0] * len(specs)
+    start_time = [0.0] * len(specs)
+    active = []
+    next_job = 0
+    free = cores
+    events = []
+    now = 0.0
+    timeline = {}
+    while True:
+        while (
+            next_job < len(specs)
+            and len(active) < max_jobs
+            and sum(min(tasks[j] - finished[j], cores) for j in active) < cores
+        ):
+            active.append(next_job)
+            start_time[next_job] = now
+            next_job += 1
+        while free:
+            ready = [j for j in active if started[j] < tasks[j]]
+            if not ready:
+                break
+            j = min(ready, key=lambda k: running[k])
+            started[j] += 1
+            running[j] += 1
+            free -= 1
+            heapq.heappush(events, (now + duration[j], j))
+        if not events:
+            break
+        now, j = heapq.heappop(events)
+        running[j] -= 1
+        finished[j] += 1
+        free += 1
+        if finished[j] == tasks[j]:
+            active.remove(j)
+            timeline[j] = JobTimeline(specs[j].table, start_time[j], now)
+    total = sum(work[spec.table] for spec in specs)
+    longest = max((work[spec.table] / min(spec.num_partitions, cores) for spec in specs), default=0.0)
+    return MakespanEstimate(
+        makespan=now,
+        lower_bound=max(total / cores, longest) or 1.0,
+        jobs=[timeline[j] for j in sorted(timeline, key=lambda k: timeline[k].start)],
+    )
@@ -0,0 +1,149 @@
+"""Manifests of the generated files, so loaders need not list the table directories.
+
+Listing ``source_files_100TB_parquet/store_sales`` means tens of thousands
+of files on object storage, which is slow and sometimes throttled. The
+chunks engine already records every file it writes in a commit (path,
+size, rows, dsdgen children and sha256); the driver gathers them into
+
+* ``<table>/_manifest.json``: the files of one table, in row order, and
+* ``<dataset root>/_manifest.json``: the totals and files of every table.
+
+Both are rewritten as units commit, at most every ``interval`` seconds,
+and once more when a table is done, with ``complete`` set. Before any
+table starts, :func:`start_dataset_manifest` marks every table of the
+plan incomplete, so the dataset is not ``complete`` until the last of
+them is done. Spark skips ``_`` files, so the manifests are never read
+as data. For Delta tables the writer also brings the ``_delta_log`` up
+to date on every save (see :mod:`.delta`).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict
+from typing import Iterable
+
+from .commitlog import ChunkCommit, CommitLog, OutputFile
+from .delta import DeltaLog
+from .fs import local_path, temp_path
+from .spec import GenerationOptions, TableSpec
+
+MANIFEST_FILE = "_manifest.json"
+
+_dataset_lock = threading.Lock()  # tables of one dataset can finish at the same time on the driver
+
+
+def _write_json(path: str, data: dict) -> None:
+    path = local_path(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = temp_path(path)
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def load_manifest(path: str) -> dict | None:
+    """A table or dataset manifest, or None if there is none."""
+    path = local_path(path)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def manifest_files(root_dir: str, table: str, complete: bool = True) -> list[str] | None:
+    """Paths of a table's files from its manifest, in row order, ready for ``spark.read.parquet(*paths)``.
+
+    None if the table has no manifest, or (with ``complete``) only one of an unfinished run.
+    """
+    manifest = load_manifest(f"{root_dir}/{table}/{MANIFEST_FILE}")
+    if manifest is None or (complete and not manifest["complete"]):
+        return None
+    return [f"{root_dir}/{f['path']}" for f in manifest["files"]]
+
+
+def _table_entry(table: str, files: list[OutputFile], complete: bool) -> dict:
+    files = sorted((f for f in files if f.table == table), key=lambda f: f.path)
+    return {
+        "table": table,
+        "complete": complete,
+        "rows": sum(f.rows for f in files),
+        "bytes": sum(f.bytes for f in files),
+        "files": [{k: v for k, v in asdict(f).items() if k != "stats"} for f in files],  # stats stay in the Delta log
+    }
+
+
+def start_dataset_manifest(specs: Iterable[TableSpec], options: GenerationOptions) -> None:
+    """Mark every table of the plan incomplete, in its own and the dataset manifest, before any starts.
+
+    A table only gets a dataset entry once its generation starts, so
+    without this the dataset would read ``complete`` as soon as the first
+    tables are done. A fresh run also drops the files an earlier run
+    recorded for the planned tables (they are about to be overwritten);
+    with ``resume`` they are kept. Tables outside the plan keep their
+    entries, and so do existing tables that the run will refuse to
+    overwrite.
+    """
+    by_root: dict[str, list[str]] = {}
+    for spec in specs:
+        by_root.setdefault(spec.root_dir, []).extend(spec.tables)
+    with _dataset_lock:
+        for root_dir, tables in by_root.items():
+            path = f"{root_dir}/{MANIFEST_FILE}"
+            dataset = load_manifest(path) or {"root_dir": root_dir, "tables": {}}
+            for table in tables:
+                exists = os.path.exists(local_path(f"{root_dir}/{table}"))
+                if exists and not (options.overwrite or options.resume):
+                    continue  # genData's SaveMode.ErrorIfExists (see prepare_units)
+                table_path = f"{root_dir}/{table}/{MANIFEST_FILE}"
+                earlier = load_manifest(table_path)
+                entry = earlier if options.resume and earlier is not None else _table_entry(table, [], False)
+                entry["complete"] = False
+                if earlier is not None:
+                    _write_json(table_path, entry)
+                dataset["tables"][table] = entry
+            dataset["complete"] = all(entry["complete"] for entry in dataset["tables"].values())
+            _write_json(path, dataset)
+
+
+class ManifestWriter:
+    """Keeps the manifests of one spec's tables up to date on the driver.
+
+    Feed it commits with :meth:`add` as units finish and call
+    :meth:`finish` once the table is reconciled.
+    """
+
+    def __init__(self, spec: TableSpec, interval: float = 60.0):
+        self.spec = spec
+        self.interval = interval
+        self._delta_logs = {t: DeltaLog(f"{spec.root_dir}/{t}") for t in spec.tables} if spec.file_format == "delta" else {}
+        self._files = {c.number: c.files for c in CommitLog(spec.location).commits()}  # committed before (resume)
+        self.save()  # replaces the manifests of an earlier run
+
+    def add(self, commit: ChunkCommit) -> None:
+        self._files[commit.number] = commit.files
+        if time.monotonic() - self._saved >= self.interval:
+            self.save()
+
+    def save(self, complete: bool = False) -> None:
+        files = [f for number in sorted(self._files) for f in self._files[number]]
+        for table, log in self._delta_logs.items():
+            log.sync(self.spec.root_dir, table, [f for f in files if f.table == table])
+        entries = {table: _table_entry(table, files, complete) for table in self.spec.tables}
+        for table, entry in entries.items():
+            _write_json(f"{self.spec.root_dir}/{table}/{MANIFEST_FILE}", entry)
+        with _dataset_lock:
+            path = f"{self.spec.root_dir}/{MANIFEST_FILE}"
+            dataset = load_manifest(path) or {"root_dir": self.spec.root_dir, "tables": {}}
+            dataset["tables"].update(entries)
+            dataset["complete"] = all(entry["complete"] for entry in dataset["tables"].values())
+            _write_json(path, dataset)
+        self._saved = time.monotonic()
+
+    def finish(self) -> None:
+        """Write the final manifests from the reconciled commit log."""
+        self._files = {c.number: c.files for c in CommitLog(self.spec.location).commits()}
+        self.save(complete=True)
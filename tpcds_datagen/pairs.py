@@ -0,0 +1,87 @@
+"""Write a sales table and its returns table from one dsdgen pass.
+
+spark-sql-perf runs dsdgen once for store_sales and again for
+store_returns, although dsdgen produces the returns while generating the
+sales. Here a task runs dsdgen without ``-filter`` for a group of child
+chunks and converts both ``.dat`` outputs to Parquet: one sales file per
+child chunk and one returns file per group.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import socket
+
+from .cluster import task_attempt
+from .commitlog import ChunkMetrics, OutputFile
+from .convert import ParquetSink, read_batches
+from .delta import sink_stats
+from .dsdgen import dat_file_name, run_to_dir
+from .fs import file_sha256, publish
+from .profiling import StageClock, sample_stacks
+from .spec import GenerationOptions, TableSpec
+
+
+def part_file_name(number: int) -> str:
+    return f"part-{number:05d}.parquet"
+
+
+def child_groups(parallel: int, groups: int) -> list[list[int]]:
+    """Split child chunks ``1..parallel`` into at most ``groups`` consecutive runs."""
+    size = math.ceil(parallel / max(1, min(groups, parallel)))
+    children = list(range(1, parallel + 1))
+    return [children[i : i + size] for i in range(0, parallel, size)]
+
+
+def write_pair_group(
+    spec: TableSpec, options: GenerationOptions, codec: str, group: int, children: list[int], work_dir: str
+) -> tuple[list[OutputFile], list[ChunkMetrics]]:
+    """Write the sales file of each child and one returns file for the group.
+
+    dsdgen time is charged to the sales table; the returns file's write time
+    is charged to the last child.
+    """
+    returns_table = spec.paired_table
+    outputs, metrics = [], []
+    attempt, host = task_attempt(), socket.gethostname()
+    returns_file = os.path.join(work_dir, "returns.parquet")
+    with ParquetSink(returns_file, returns_table, options, codec) as returns_sink:
+        for child in children:
+            clock = StageClock(cpu=options.profile)
+            with sample_stacks(options, spec.table, child, clock):
+                with clock.stage("dsdgen"):
+                    cpu = run_to_dir(
+                        spec.table, options.scale_factor, spec.num_partitions, child, options.dsdgen_dir, work_dir
+                    )
+                clock.add("dsdgen", cpu)
+                sales_dat = os.path.join(work_dir, dat_file_name(spec.table, spec.num_partitions, child))
+                returns_dat = os.path.join(work_dir, dat_file_name(returns_table, spec.num_partitions, child))
+                sales_file = os.path.join(work_dir, "sales.parquet")
+                with open(sales_dat, "rb") as source, ParquetSink(sales_file, spec.table, options, codec, clock) as sink:
+                    sink.write(read_batches(spec.table, source, options))
+                path = f"{spec.table}/{part_file_name(child)}"
+                with clock.stage("write"):
+                    digest = file_sha256(sales_file)
+                    size = publish(sales_file, f"{spec.root_dir}/{path}")
+                outputs.append(OutputFile(spec.table, path, sink.rows, size, [child], digest, sink_stats(spec, sink)))
+            metrics.append(clock.metrics(spec.table, child, sink.rows, size, attempt, host))
+            returns_clock = returns_sink.clock = StageClock(cpu=options.profile)
+            rows = returns_sink.rows
+            with sample_stacks(options, returns_table, child, returns_clock):
+                with open(returns_dat, "rb") as source:
+                    returns_sink.write(read_batches(returns_table, source, options))
+            metrics.append(returns_clock.metrics(returns_table, child, returns_sink.rows - rows, 0, attempt, host))
+            os.remove(sales_dat)
+            os.remove(returns_dat)
+    path = f"{returns_table}/{part_file_name(group)}"
+    with returns_sink.clock.stage("write"):
+        digest = file_sha256(returns_file)
+        size = publish(returns_file, f"{spec.root_dir}/{path}")
+    outputs.append(
+        OutputFile(returns_table, path, returns_sink.rows, size, list(children), digest, sink_stats(spec, returns_sink))
+    )
+    if metrics:
+        last = returns_sink.clock.metrics(returns_table, children[-1], metrics[-1].rows, size, attempt, host)
+        metrics[-1] = last
+    return outputs, metrics
@@ -0,0 +1,92 @@
+"""Compute per-table ``numPartitions`` from a target output file size.
+
+genData writes one file per dsdgen task for a non-partitioned table, so
+``numPartitions`` is simply the expected table size divided by the size we
+want each file to have.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Iterable, Mapping
+
+from .tables import TABLES, row_count
+
+DEFAULT_TARGET_FILE_BYTES = 500 * 1024 * 1024
+
+# Snappy-compressed Parquet bytes per row. The fact-table figures are derived
+# from the hand-tuned sf=1000 numPartitions (rows per ~500MB file); the
+# dimension figures are rough. Replace them with a calibration profile for
+# anything other than the default Parquet settings.
+DEFAULT_BYTES_PER_ROW = {
+    "call_center": 300.0,
+    "catalog_page": 60.0,
+    "catalog_returns": 72.8,
+    "catalog_sales": 72.8,
+    "customer": 40.0,
+    "customer_address": 30.0,
+    "customer_demographics": 5.0,
+    "date_dim": 30.0,
+    "household_demographics": 10.0,
+    "income_band": 20.0,
+    "inventory": 4.0,
+    "item": 150.0,
+    "promotion": 100.0,
+    "reason": 40.0,
+    "ship_mode": 60.0,
+    "store": 250.0,
+    "store_returns": 58.3,
+    "store_sales": 45.5,
+    "time_dim": 15.0,
+    "warehouse": 150.0,
+    "web_page": 80.0,
+    "web_returns": 87.4,
+    "web_sales": 65.5,
+    "web_site": 250.0,
+}
+
+
+def estimate_table_bytes(
+    table: str,
+    scale_factor: int,
+    bytes_per_row: Mapping[str, float] | None = None,
+) -> int:
+    """Expected on-disk size of ``table`` at ``scale_factor``."""
+    per_row = (bytes_per_row or DEFAULT_BYTES_PER_ROW).get(table, DEFAULT_BYTES_PER_ROW[table])
+    return round(row_count(table, scale_factor) * per_row)
+
+
+def plan_num_partitions(
+    scale_factor: int,
+    target_file_bytes: int = DEFAULT_TARGET_FILE_BYTES,
+    bytes_per_row: Mapping[str, float] | None = None,
+    tables: Iterable[str] = TABLES,
+) -> dict[str, int]:
+    """Return ``{table: numPartitions}`` so that each file lands near ``target_file_bytes``.
+
+    ``bytes_per_row`` overrides :data:`DEFAULT_BYTES_PER_ROW` per table, e.g.
+    with the figures of a calibration profile.
+    """
+    if target_file_bytes <= 0:
+        raise ValueError(f"target_file_bytes must be positive, got {target_file_bytes}")
+    plan = {}
+    for table in tables:
+        table_bytes = estimate_table_bytes(table, scale_factor, bytes_per_row)
+        partitions = max(1, math.ceil(table_bytes / target_file_bytes))
+        plan[table] = min(partitions, row_count(table, scale_factor))
+    return plan
+
+
+def describe_partition_plan(
+    plan: Mapping[str, int],
+    scale_factor: int,
+    bytes_per_row: Mapping[str, float] | None = None,
+) -> str:
+    lines = [f"{'table':<24}{'rows':>16}{'est. GB':>10}{'numPartitions':>15}{'MB/file':>10}"]
+    for table, partitions in plan.items():
+        table_bytes = estimate_table_bytes(table, scale_factor, bytes_per_row)
+        lines.append(
+            f"{table:<24}{row_count(table, scale_factor):>16,}{table_bytes / 1e9:>10.1f}"
+            f"{partitions:>15}{table_bytes / partitions / 2**20:>10.0f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,210 @@
+"""Stage timing and opt-in profiles of the chunk pipeline.
+
+Every chunk goes through four stages: ``dsdgen`` (waiting for dsdgen's
+output), ``parse`` (dsdgen text to Arrow batches), ``encode`` (Parquet
+encoding and compression on local scratch) and ``write`` (copying the file
+to its destination, e.g. ADLS through ``/mnt/datalake``). A
+:class:`StageClock` charges wall time, and with ``GenerationOptions.profile``
+CPU time as well, to whichever stage is running; the totals are saved in
+each chunk's :class:`ChunkMetrics`. For the chunks listed in
+``GenerationOptions.profile_chunks`` a :class:`StackSampler` also records
+the Python stacks of every stage in the folded format read by
+flamegraph.pl and speedscope. :func:`summarize_stages` shows which stage
+bounds each table.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from .commitlog import ChunkMetrics
+from .fs import local_path, temp_path
+from .spec import GenerationOptions
+
+STAGES = ("dsdgen", "parse", "encode", "write")
+
+
+class StageClock:
+    """Adds up wall and, if ``cpu`` is set, CPU seconds per stage of one chunk.
+
+    Stages nest: the parser waits for dsdgen's output from inside ``parse``
+    (see :class:`.convert.TimedReader`), so time in a nested ``dsdgen``
+    stage is taken off the enclosing ``parse``. Each thread keeps its own stack of
+    stages, so a stage entered on another thread never nests into, or
+    ends, one of this thread's. CPU is that of the thread in the stage
+    (``time.thread_time``), so concurrent stages do not count each other's
+    CPU. Work done on other threads is added with :meth:`add`: the CPU of
+    the dsdgen process and of the read-ahead thread of
+    :class:`.convert.TimedReader`. The threads of pyarrow's own pool, on
+    which the CSV reader parses each block, are not measured, so the
+    ``parse`` CPU is a lower bound.
+    """
+
+    def __init__(self, cpu: bool = False):
+        self.wall = dict.fromkeys(STAGES, 0.0)
+        self.cpu = dict.fromkeys(STAGES, 0.0) if cpu else None
+        self._stacks: dict[int, list[str]] = {}  # thread id -> its stages, innermost last
+        self._marks: dict[int, tuple[float, float]] = {}
+        self._lock = threading.Lock()  # threads add to the same totals
+
+    def _now(self) -> tuple[float, float]:
+        return time.perf_counter(), time.thread_time() if self.cpu is not None else 0.0
+
+    def _charge(self, thread: int) -> list[str]:
+        now = self._now()
+        with self._lock:
+            stack = self._stacks.setdefault(thread, [])
+            if stack:
+                mark = self._marks[thread]
+                self.wall[stack[-1]] += now[0] - mark[0]
+                if self.cpu is not None:
+                    self.cpu[stack[-1]] += now[1] - mark[1]
+            self._marks[thread] = now
+        return stack
+
+    def current(self, thread: int | None = None) -> str | None:
+        """The innermost stage of ``thread`` (by default the calling thread), if it is in one."""
+        stack = self._stacks.get(threading.get_ident() if thread is None else thread)
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        thread = threading.get_ident()
+        self._charge(thread).append(name)
+        try:
+            yield
+        finally:
+            self._charge(thread).pop()
+
+    def add(self, name: str, cpu: float) -> None:
+        """Charge ``cpu`` seconds spent outside this clock's stages, e.g. on another thread, to ``name``."""
+        if self.cpu is not None:
+            with self._lock:
+                self.cpu[name] += cpu
+
+    def metrics(self, table: str, child: int, rows: int, size: int, attempt: int, host: str) -> ChunkMetrics:
+        cpu = self.cpu or {}
+        return ChunkMetrics(
+            table,
+            child,
+            rows,
+            size,
+            dsdgen_seconds=self.wall["dsdgen"],
+            parse_seconds=self.wall["parse"],
+            encode_seconds=self.wall["encode"],
+            write_seconds=self.wall["write"],
+            attempt=attempt,
+            host=host,
+            dsdgen_cpu_seconds=cpu.get("dsdgen"),
+            parse_cpu_seconds=cpu.get("parse"),
+            encode_cpu_seconds=cpu.get("encode"),
+            write_cpu_seconds=cpu.get("write"),
+        )
+
+
+class StackSampler:
+    """Samples the Python stack of one thread every ``interval`` seconds.
+
+    Each sample is prefixed with the stage the :class:`StageClock` is in,
+    so a flame graph splits into one tower per stage. Native code (dsdgen,
+    pyarrow) shows up as the Python frame that called into it.
+    """
+
+    def __init__(self, clock: StageClock, interval: float = 0.005, thread_id: int | None = None):
+        self.clock = clock
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.counts: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        if frames:
+            stack = [self.clock.current(self.thread_id) or "other"] + frames[::-1]
+            self.counts[";".join(name.replace(";", ":") for name in stack)] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._run, name="tpcds-stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.counts.items()))
+
+    def save(self, path: str) -> None:
+        path = local_path(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = temp_path(path)
+        with open(tmp, "w") as f:
+            f.write(self.folded())
+        os.replace(tmp, path)
+
+
+def profile_path(options: GenerationOptions, table: str, child: int) -> str:
+    return f"{options.profile_dir}/{table}-{child:05d}.folded"
+
+
+@contextmanager
+def sample_stacks(options: GenerationOptions, table: str, child: int, clock: StageClock) -> Iterator[None]:
+    """Save a folded stack profile of the block if ``(table, child)`` is in ``options.profile_chunks``."""
+    if (table, child) not in {tuple(chunk) for chunk in options.profile_chunks}:
+        yield
+        return
+    sampler = StackSampler(clock).start()
+    try:
+        yield
+    finally:
+        sampler.stop()
+        sampler.save(profile_path(options, table, child))
+
+
+def summarize_stages(metrics: Iterable[ChunkMetrics]) -> str:
+    """Share of wall time per stage for each table, and the stage that bounds it.
+
+    With ``profile``, the bounding stage's CPU time as a share of its wall
+    time tells CPU-bound work (close to 100%) from waiting on I/O.
+    """
+    wall: dict[str, dict[str, float]] = {}
+    cpu: dict[str, dict[str, float]] = {}
+    rows: Counter[str] = Counter()
+    for m in metrics:
+        rows[m.table] += m.rows
+        table_wall = wall.setdefault(m.table, dict.fromkeys(STAGES, 0.0))
+        table_cpu = cpu.setdefault(m.table, {})
+        for stage in STAGES:
+            table_wall[stage] += getattr(m, f"{stage}_seconds")
+            stage_cpu = getattr(m, f"{stage}_cpu_seconds")
+            if stage_cpu is not None:
+                table_cpu[stage] = table_cpu.get(stage, 0.0) + stage_cpu
+    lines = [f"{'table':<24}{'rows':>16}{'wall s':>10}" + "".join(f"{s:>8}" for s in STAGES) + "  bound by"]
+    for table in sorted(wall, key=lambda t: sum(wall[t].values()), reverse=True):
+        stages = wall[table]
+        total = sum(stages.values())
+        bound = max(stages, key=stages.get)
+        shares = "".join(f"{stages[s] / total if total else 0:>8.0%}" for s in STAGES)
+        note = ""
+        if bound in cpu[table] and stages[bound]:
+            note = f" (CPU {cpu[table][bound] / stages[bound]:.0%} of wall)"
+        lines.append(f"{table:<24}{rows[table]:>16,}{total:>10.0f}{shares}  {bound}{note}")
+    return "\n".join(lines)
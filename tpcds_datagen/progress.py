@@ -0,0 +1,235 @@
+"""Live progress, ETA and metrics logs for chunked generation runs.
+
+Every committed unit carries the :class:`ChunkMetrics` of its chunks, so
+the driver can follow a run by reading the commit logs: units done, rows
+per second and ETA per table and for the whole run, and a warning for
+every chunk that took far longer per row than the others of its table.
+Works with the chunks engine and the local engine; genData runs have no
+commit log.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import statistics
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Callable, Iterable, Sequence
+
+from .commitlog import ChunkCommit, ChunkMetrics, CommitLog
+from .profiling import summarize_stages
+from .spec import TableSpec
+from .tables import row_count
+
+
+def collect_metrics(specs: Iterable[TableSpec]) -> list[ChunkMetrics]:
+    """The chunk metrics of every committed unit of ``specs``."""
+    return [m for spec in specs for commit in CommitLog(spec.location).commits() for m in commit.metrics]
+
+
+def save_metrics(metrics: Sequence[ChunkMetrics], path: str) -> None:
+    """Write ``metrics`` as a JSON list, or as CSV if ``path`` ends with ``.csv``."""
+    rows = [asdict(m) for m in metrics]
+    with open(path, "w", newline="") as f:
+        if path.endswith(".csv"):
+            writer = csv.DictWriter(f, fieldnames=[field.name for field in fields(ChunkMetrics)])
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            json.dump(rows, f)
+
+
+def _format_eta(seconds: float | None) -> str:
+    if seconds is None:
+        return "-"
+    minutes = round(seconds / 60)
+    return f"{minutes // 60}h{minutes % 60:02d}m"
+
+
+@dataclass
+class TableProgress:
+    table: str
+    units: int | None  # None until the run has planned the table
+    committed: int
+    rows: int
+    expected_rows: int
+    rows_per_second: float
+    eta_seconds: float | None
+    slow_chunks: int
+
+    @property
+    def done(self) -> bool:
+        return self.units is not None and self.committed == self.units
+
+
+class ProgressMonitor:
+    """Reports the progress of a run from a background thread on the driver.
+
+    Use it around the call that runs the plan::
+
+        with ProgressMonitor(specs, scale_factor, metrics_path="/dbfs/.../metrics"):
+            generator.run(specs)
+
+    Every ``interval`` seconds a table of units done, rows/s and ETA is
+    printed. A chunk whose seconds per row exceed ``slow_factor`` times the
+    median of its table is reported straight away, with the stage that
+    took the time. When the run ends, the share of each stage per table is
+    printed (see :func:`summarize_stages`) and, with ``metrics_path``, the
+    chunk metrics are saved to ``metrics_path.json`` and ``metrics_path.csv``.
+    """
+
+    def __init__(
+        self,
+        specs: Iterable[TableSpec],
+        scale_factor: int,
+        interval: float = 60.0,
+        metrics_path: str | None = None,
+        slow_factor: float = 2.0,
+        output: Callable[[str], None] = print,
+    ):
+        self.specs = list(specs)
+        self.scale_factor = scale_factor
+        self.interval = interval
+        self.metrics_path = metrics_path
+        self.slow_factor = slow_factor
+        self.output = output
+        self._commits: dict[str, dict[str, ChunkCommit]] = {spec.table: {} for spec in self.specs}
+        self._baseline_rows: dict[str, int] = {}  # rows committed before this run started (resume)
+        self._started: dict[str, float] = {}
+        self._finished: dict[str, float] = {}
+        self._reported: set[tuple[str, int]] = set()
+        self._start = time.monotonic()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _refresh(self, spec: TableSpec) -> CommitLog:
+        """Read the commit files that appeared since the last poll."""
+        log = CommitLog(spec.location)
+        names = set(os.listdir(log.directory)) if os.path.isdir(log.directory) else set()
+        seen = self._commits[spec.table]
+        for name in list(seen):
+            if name not in names:
+                del seen[name]
+        for name in sorted(names - seen.keys()):
+            if name.endswith(".json") and not name.startswith(("_", ".")):
+                try:
+                    with open(os.path.join(log.directory, name)) as f:
+                        seen[name] = ChunkCommit.from_dict(json.load(f))
+                except (OSError, ValueError):
+                    pass  # removed by reconcile, or still being renamed into place
+        return log
+
+    def _slow_chunks(self, metrics: list[ChunkMetrics]) -> list[tuple[ChunkMetrics, float]]:
+        per_row = [m.seconds / m.rows for m in metrics if m.rows]
+        if len(per_row) < 5:
+            return []
+        median = statistics.median(per_row)
+        return [(m, m.seconds / m.rows / median) for m in metrics if m.rows and m.seconds / m.rows > self.slow_factor * median]
+
+    def snapshot(self) -> list[TableProgress]:
+        now = time.monotonic()
+        progress = []
+        for spec in self.specs:
+            log = self._refresh(spec)
+            plan = log.load_plan()
+            commits = self._commits[spec.table].values()
+            metrics = [m for c in commits for m in c.metrics]
+            rows = sum(f.rows for c in commits for f in c.files)
+            self._baseline_rows.setdefault(spec.table, rows)
+            if rows < self._baseline_rows[spec.table]:
+                # The run cleared the output of an earlier run: the table starts now.
+                self._baseline_rows[spec.table] = rows
+                self._started[spec.table] = now
+            if plan is not None:
+                self._started.setdefault(spec.table, now)
+            units = len(plan["units"]) if plan else None
+            committed = len(commits)
+            if units is not None and committed == units:
+                self._finished.setdefault(spec.table, now)
+            else:
+                self._finished.pop(spec.table, None)
+            new_rows = rows - self._baseline_rows[spec.table]
+            elapsed = self._finished.get(spec.table, now) - self._started.get(spec.table, now)
+            rate = new_rows / elapsed if elapsed > 0 else 0.0
+            expected = sum(row_count(table, self.scale_factor) for table in spec.tables)
+            eta = None
+            if units is not None and committed == units:
+                eta = 0.0
+            elif rate > 0:
+                eta = max(0.0, expected - rows) / rate
+            slow = self._slow_chunks([m for m in metrics if m.table == spec.table])
+            for m, ratio in slow:
+                if (m.table, m.child) not in self._reported:
+                    self._reported.add((m.table, m.child))
+                    stages = {
+                        "dsdgen": m.dsdgen_seconds,
+                        "parse": m.parse_seconds,
+                        "encode": m.encode_seconds,
+                        "write": m.write_seconds,
+                    }
+                    stage = max(stages, key=stages.get)
+                    self.output(
+                        f"WARNING {m.table} child {m.child} on {m.host or '?'}: {ratio:.1f}x the median time per row "
+                        f"({stage} {stages[stage] / m.seconds:.0%} of {m.seconds:.0f}s, attempt {m.attempt})"
+                    )
+            progress.append(TableProgress(spec.table, units, committed, rows, expected, rate, eta, len(slow)))
+        return progress
+
+    def describe(self, progress: list[TableProgress]) -> str:
+        lines = [f"{'table':<24}{'units':>13}{'rows':>16}{'rows/s':>12}{'ETA':>8}{'slow':>6}"]
+        for p in progress:
+            units = f"{p.committed}/{p.units if p.units is not None else '?'}"
+            lines.append(
+                f"{p.table:<24}{units:>13}{p.rows:>16,}{p.rows_per_second:>12,.0f}"
+                f"{_format_eta(p.eta_seconds):>8}{p.slow_chunks:>6}"
+            )
+        elapsed = time.monotonic() - self._start
+        rows = sum(p.rows for p in progress)
+        expected = sum(p.expected_rows for p in progress)
+        new_rows = rows - sum(self._baseline_rows.values())
+        rate = new_rows / elapsed if elapsed > 0 else 0.0
+        eta = 0.0 if all(p.done for p in progress) else (max(0, expected - rows) / rate if rate > 0 else None)
+        lines.append(
+            f"run: {rows / expected if expected else 0:.1%} of rows after {_format_eta(elapsed)}, "
+            f"{rate:,.0f} rows/s, ETA {_format_eta(eta)}"
+        )
+        return "\n".join(lines)
+
+    def report(self) -> None:
+        self.output(self.describe(self.snapshot()))
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.report()
+            except Exception as e:  # a failed poll must not end the monitoring
+                self.output(f"progress: {e!r}")
+
+    def start(self) -> "ProgressMonitor":
+        self._start = time.monotonic()
+        self.snapshot()  # baseline of a resumed run
+        self._thread = threading.Thread(target=self._loop, name="tpcds-progress", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.report()
+        metrics = [m for spec in self.specs for c in self._commits[spec.table].values() for m in c.metrics]
+        if metrics:
+            self.output(summarize_stages(metrics))
+        if self.metrics_path:
+            save_metrics(metrics, self.metrics_path + ".json")
+            save_metrics(metrics, self.metrics_path + ".csv")
+            self.output(f"Saved chunk metrics to {self.metrics_path}.json and .csv")
+
+    def __enter__(self) -> "ProgressMonitor":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,136 @@
+"""Run several table generations at once on one cluster.
+
+Each table is generated from its own driver thread in its own FAIR
+scheduler pool, so a 10-task dimension table runs next to a large fact
+table instead of after it. New tables are only started while the tasks
+still outstanding across the running tables are below
+``max_concurrent_tasks``, which keeps the cluster saturated without
+queueing thousands of tasks that could not run anyway.
+
+Tables are started longest first and the predicted makespan is printed
+before anything runs (see :mod:`tpcds_datagen.makespan`).
+
+Requires ``spark.scheduler.mode FAIR`` (the Databricks default).
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Mapping
+
+from .driver import GenerationDriver, TableResult
+from .makespan import estimate_core_seconds, order_longest_first, predict_makespan
+from .spec import TableSpec, describe_plan, validate_plan
+
+# The thread-local properties SparkContext.setJobGroup sets; PySpark has no call that clears them.
+JOB_GROUP_PROPERTIES = ("spark.jobGroup.id", "spark.job.description", "spark.job.interruptOnCancel")
+
+
+class ConcurrentGenerator:
+    """Submit table generations concurrently from a thread pool, bounded by task slots."""
+
+    def __init__(
+        self,
+        driver: GenerationDriver,
+        max_concurrent_tasks: int | None = None,
+        max_jobs: int = 8,
+        poll_seconds: float = 5.0,
+        pool_prefix: str = "tpcds",
+        longest_first: bool = True,
+        core_seconds_per_row: Mapping[str, float] | None = None,
+        bytes_per_row: Mapping[str, float] | None = None,
+    ):
+        if driver.options.engine == "gendata" and driver.options.writer_profiles:
+            # genData takes its writer settings from the session conf, which concurrent tables would share.
+            raise ValueError("writer_profiles need the chunks engine when tables are generated concurrently")
+        self.driver = driver
+        self.sc = driver.spark.sparkContext
+        # Default to one task per core of the cluster.
+        self.max_concurrent_tasks = max_concurrent_tasks or self.sc.defaultParallelism
+        self.max_jobs = max_jobs
+        self.poll_seconds = poll_seconds
+        self.pool_prefix = pool_prefix
+        self.longest_first = longest_first
+        # Per-table cost figures, e.g. from a CalibrationProfile, used to order and predict the run.
+        self.core_seconds_per_row = core_seconds_per_row
+        self.bytes_per_row = bytes_per_row
+
+    def pool_name(self, spec: TableSpec) -> str:
+        return f"{self.pool_prefix}_{spec.table}"
+
+    def outstanding_tasks(self, spec: TableSpec) -> int:
+        """Tasks of ``spec`` not finished yet, or its numPartitions before its stages show up."""
+        tracker = self.sc.statusTracker()
+        remaining = None
+        for job_id in tracker.getJobIdsForGroup(self.pool_name(spec)):
+            job = tracker.getJobInfo(job_id)
+            if job is None or job.status != "RUNNING":
+                continue
+            for stage_id in job.stageIds:
+                stage = tracker.getStageInfo(stage_id)
+                if stage is not None:
+                    remaining = (remaining or 0) + stage.numTasks - stage.numCompletedTasks
+        if remaining is None:
+            remaining = spec.num_partitions
+        return min(remaining, self.max_concurrent_tasks)
+
+    def _generate(self, spec: TableSpec) -> TableResult:
+        name = self.pool_name(spec)
+        self.sc.setLocalProperty("spark.scheduler.pool", name)
+        self.sc.setJobGroup(name, f"generate {spec.table} ({spec.num_partitions} dsdgen tasks)")
+        try:
+            return self.driver.generate(spec)
+        finally:
+            # Pool threads are reused: the next table on this thread sets its own pool and group.
+            for key in ("spark.scheduler.pool",) + JOB_GROUP_PROPERTIES:
+                self.sc.setLocalProperty(key, None)
+
+    def _check_scheduler_mode(self) -> None:
+        mode = self.driver.spark.conf.get("spark.scheduler.mode", "FIFO")
+        if mode.upper() != "FAIR":
+            print(f"WARNING: spark.scheduler.mode is {mode}; concurrent tables will queue behind each other.")
+
+    def order(self, specs: Iterable[TableSpec]) -> tuple[list[TableSpec], dict[str, float]]:
+        """The plan in start order, and the estimated core-seconds of each table."""
+        plan = validate_plan(specs)
+        scale_factor = self.driver.options.scale_factor
+        work = {
+            spec.table: estimate_core_seconds(spec, scale_factor, self.core_seconds_per_row, self.bytes_per_row)
+            for spec in plan
+        }
+        if self.longest_first:
+            plan = order_longest_first(plan, work)
+        return plan, work
+
+    def run(self, specs: Iterable[TableSpec]) -> list[TableResult]:
+        """Generate every table of the plan, starting them in :meth:`order`."""
+        plan, work = self.order(specs)
+        print(describe_plan(plan))
+        print(predict_makespan(plan, work, self.max_concurrent_tasks, self.max_jobs).describe())
+        self._check_scheduler_mode()
+        self.driver.start_manifests(plan)
+        pending = list(plan)
+        running = {}
+        results = []
+        start = time.monotonic()
+        with ThreadPoolExecutor(self.max_jobs) as pool:
+            while pending or running:
+                while (
+                    pending
+                    and len(running) < self.max_jobs
+                    and sum(self.outstanding_tasks(s) for s in running.values()) < self.max_concurrent_tasks
+                ):
+                    spec = pending.pop(0)
+                    print(f"start {spec.table}: numPartitions={spec.num_partitions}")
+                    running[pool.submit(self._generate, spec)] = spec
+                done, _ = wait(running, timeout=self.poll_seconds, return_when=FIRST_COMPLETED)
+                for future in done:
+                    spec = running.pop(future)
+                    result = future.result()
+                    results.append(result)
+                    print(
+                        f"[{len(results)}/{len(plan)}] {spec.table}: done in {result.seconds / 60:.1f} min "
+                        f"(run time {(time.monotonic() - start) / 60:.1f} min)"
+                    )
+        return results
@@ -0,0 +1,88 @@
+"""Typed views of the dsdgen text columns.
+
+Mirrors spark-sql-perf: decimals may be replaced by doubles
+(``useDoubleForDecimal``) and dates by strings (``useStringForDate``).
+"""
+
+from __future__ import annotations
+
+import datetime
+import decimal
+import re
+from typing import Callable, Sequence
+
+from .tables import COLUMNS
+
+_DECIMAL = re.compile(r"decimal\((\d+),(\d+)\)")
+
+
+def column_types(table: str, use_double_for_decimal: bool = False, use_string_for_date: bool = False) -> list[tuple[str, str]]:
+    """``(name, Spark SQL type)`` pairs of ``table`` after applying the type options."""
+    columns = []
+    for name, type_name in COLUMNS[table]:
+        if use_double_for_decimal and type_name.startswith("decimal"):
+            type_name = "double"
+        elif use_string_for_date and type_name == "date":
+            type_name = "string"
+        columns.append((name, type_name))
+    return columns
+
+
+def spark_schema(table: str, use_double_for_decimal: bool = False, use_string_for_date: bool = False):
+    from pyspark.sql import types as T
+
+    simple = {
+        "int": T.IntegerType(),
+        "bigint": T.LongType(),
+        "double": T.DoubleType(),
+        "string": T.StringType(),
+        "date": T.DateType(),
+    }
+    fields = []
+    for name, type_name in column_types(table, use_double_for_decimal, use_string_for_date):
+        match = _DECIMAL.fullmatch(type_name)
+        data_type = T.DecimalType(int(match[1]), int(match[2])) if match else simple[type_name]
+        fields.append(T.StructField(name, data_type, True))
+    return T.StructType(fields)
+
+
+def arrow_schema(table: str, use_double_for_decimal: bool = False, use_string_for_date: bool = False):
+    import pyarrow as pa
+
+    simple = {
+        "int": pa.int32(),
+        "bigint": pa.int64(),
+        "double": pa.float64(),
+        "string": pa.string(),
+        "date": pa.date32(),
+    }
+    fields = []
+    for name, type_name in column_types(table, use_double_for_decimal, use_string_for_date):
+        match = _DECIMAL.fullmatch(type_name)
+        data_type = pa.decimal128(int(match[1]), int(match[2])) if match else simple[type_name]
+        fields.append(pa.field(name, data_type))
+    return pa.schema(fields)
+
+
+def _converter(type_name: str) -> Callable[[str], object]:
+    if type_name in ("int", "bigint"):
+        return int
+    if type_name == "double":
+        return float
+    if type_name == "date":
+        return datetime.date.fromisoformat
+    if _DECIMAL.fullmatch(type_name):
+        return decimal.Decimal
+    return str
+
+
+def row_converter(
+    table: str, use_double_for_decimal: bool = False, use_string_for_date: bool = False
+) -> Callable[[Sequence[str | None]], tuple]:
+    """Return a function turning split dsdgen fields into a typed row tuple."""
+    converters = [_converter(t) for _, t in column_types(table, use_double_for_decimal, use_string_for_date)]
+
+    def convert(fields: Sequence[str | None]) -> tuple:
+        return tuple(None if value is None else conv(value) for conv, value in zip(converters, fields))
+
+    return convert
@@ -0,0 +1,235 @@
+"""Per-table generation specs and the run-wide genData options.
+
+The values here mirror the Scala cells of the notebooks: the same
+``scaleName`` rule, the same ``source_files_${scaleName}_${fileFormat}``
+layout under ``/mnt/datalake/raw/tpc-ds`` and the same genData flags.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Iterable, Mapping
+
+from .planner import DEFAULT_TARGET_FILE_BYTES
+from .tables import COLUMNS, PARTITION_COLUMNS, SALES_RETURNS, TABLES
+from .writer_profiles import WriterProfile
+
+DATALAKE_ROOT = "/mnt/datalake/raw/tpc-ds"
+DSDGEN_DIR = "/usr/local/bin/tpcds-kit/tools"
+ENGINES = ("gendata", "chunks")
+
+
+def scale_name(scale_factor: int) -> str:
+    """Return ``001TB`` / ``100GB`` style names, as the notebooks compute them."""
+    if scale_factor < 1000:
+        return f"{scale_factor:03d}GB"
+    return f"{scale_factor // 1000:03d}TB"
+
+
+def dataset_root(scale_factor: int, file_format: str = "parquet", base: str = DATALAKE_ROOT) -> str:
+    """Directory holding one sub-directory per table for a generated dataset."""
+    return f"{base}/source_files_{scale_name(scale_factor)}_{file_format}"
+
+
+def database_name(scale_factor: int) -> str:
+    return "tpcds" + scale_name(scale_factor)
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """One table to generate: how many dsdgen tasks, in which format, where.
+
+    ``root_dir`` is the dataset root; genData writes the table to
+    ``root_dir/table``. A sales spec with ``paired_returns_partitions`` also
+    writes its returns table, in about that many files, from the same
+    dsdgen pass (see :func:`pair_sales_returns`).
+    """
+
+    table: str
+    num_partitions: int
+    file_format: str
+    root_dir: str
+    paired_returns_partitions: int | None = None
+
+    def __post_init__(self):
+        if self.table not in TABLES:
+            raise ValueError(f"Unknown TPC-DS table: {self.table!r}")
+        if self.num_partitions < 1:
+            raise ValueError(f"{self.table}: numPartitions must be >= 1, got {self.num_partitions}")
+        if self.paired_returns_partitions is not None:
+            if self.table not in SALES_RETURNS:
+                raise ValueError(f"{self.table} has no returns table to generate with it")
+            if self.paired_returns_partitions < 1:
+                raise ValueError(f"{self.table}: paired_returns_partitions must be >= 1")
+
+    @property
+    def location(self) -> str:
+        return f"{self.root_dir}/{self.table}"
+
+    @property
+    def paired_table(self) -> str | None:
+        return SALES_RETURNS[self.table] if self.paired_returns_partitions else None
+
+    @property
+    def tables(self) -> tuple[str, ...]:
+        """The tables this spec writes."""
+        return (self.table, self.paired_table) if self.paired_table else (self.table,)
+
+
+@dataclass(frozen=True)
+class GenerationOptions:
+    """Arguments shared by every table of a run (``TPCDSTables`` + ``genData`` flags).
+
+    Paired sales/returns specs always use the chunks engine.
+    """
+
+    scale_factor: int
+    dsdgen_dir: str = DSDGEN_DIR
+    use_double_for_decimal: bool = False  # true to replace DecimalType with DoubleType
+    use_string_for_date: bool = False  # true to replace DateType with StringType
+    overwrite: bool = True  # overwrite the data that is already there
+    partition_tables: bool = False  # create the partitioned fact tables
+    cluster_by_partition_columns: bool = False  # shuffle to get partitions coalesced into single files
+    filter_out_null_partition_values: bool = False  # true to filter out the partition with NULL key value
+    engine: str = "gendata"  # "gendata" (spark-sql-perf) or "chunks" (one Parquet file per dsdgen chunk, with a commit log)
+    resume: bool = False  # chunks engine: keep committed chunks of an earlier run and generate only the rest
+    chunks_per_task: int = 1  # chunks engine: dsdgen child chunks each task generates one after another
+    split_stragglers: bool = False  # chunks engine: split units still running long after the others into finer dsdgen chunks
+    straggler_factor: float = 2.0  # a unit is a straggler once it runs this many times longer than the median unit
+    profile: bool = False  # chunks engine: also measure CPU time per stage (dsdgen, parse, encode, write)
+    profile_chunks: tuple[tuple[str, int], ...] = ()  # chunks engine: (table, child) chunks to save folded stack profiles of
+    profile_dir: str = f"{DATALAKE_ROOT}/_profiles"  # where the folded stack profiles go
+    writer_profiles: Mapping[str, WriterProfile] = field(default_factory=dict)  # per-table Parquet writer settings
+    cluster_by: Mapping[str, str] = field(default_factory=dict)  # chunks engine: table -> integer column to range-cluster its files by
+    partition_file_bytes: int = DEFAULT_TARGET_FILE_BYTES  # chunks engine with partition_tables: split partition files to about this size
+
+    def __post_init__(self):
+        if self.engine not in ENGINES:
+            raise ValueError(f"engine must be one of {ENGINES}, got {self.engine!r}")
+        if self.chunks_per_task < 1:
+            raise ValueError(f"chunks_per_task must be >= 1, got {self.chunks_per_task}")
+        if self.straggler_factor <= 1:
+            raise ValueError(f"straggler_factor must be > 1, got {self.straggler_factor}")
+        for table, profile in self.writer_profiles.items():
+            if table not in TABLES:
+                raise ValueError(f"writer_profiles: unknown table {table!r}")
+            profile.check(table)
+        if self.cluster_by and self.engine != "chunks":
+            raise ValueError("cluster_by needs the chunks engine")
+        for table, column in self.cluster_by.items():
+            if dict(COLUMNS.get(table, ())).get(column) not in ("int", "bigint"):
+                raise ValueError(f"cluster_by: {table} has no integer column {column!r}")
+            if self.partition_tables and PARTITION_COLUMNS.get(table, column) != column:
+                raise ValueError(f"cluster_by: {table} is partitioned by {PARTITION_COLUMNS[table]}, not {column}")
+
+    def clustering_column(self, table: str) -> str | None:
+        """The column the chunks engine range-partitions ``table``'s rows by: its partition or ``cluster_by`` column."""
+        if self.engine == "chunks" and self.partition_tables and table in PARTITION_COLUMNS:
+            return PARTITION_COLUMNS[table]
+        return self.cluster_by.get(table)
+
+    @property
+    def clustered_tables(self) -> tuple[str, ...]:
+        """Tables with a :meth:`clustering_column`; they are not paired with their sales or returns table."""
+        return tuple(table for table in TABLES if self.clustering_column(table))
+
+
+def table_specs(
+    num_partitions: Mapping[str, int],
+    scale_factor: int,
+    file_format: str = "parquet",
+    base: str = DATALAKE_ROOT,
+) -> list[TableSpec]:
+    """Build specs for every table in ``num_partitions`` under the standard dataset root."""
+    root_dir = dataset_root(scale_factor, file_format, base)
+    return [TableSpec(table, n, file_format, root_dir) for table, n in num_partitions.items()]
+
+
+def validate_plan(specs: Iterable[TableSpec]) -> list[TableSpec]:
+    """Reject plans that would generate a table twice."""
+    plan = list(specs)
+    seen = set()
+    for spec in plan:
+        for table in spec.tables:
+            if table in seen:
+                raise ValueError(f"{table} appears more than once in the plan")
+            seen.add(table)
+    return plan
+
+
+def pair_sales_returns(specs: Iterable[TableSpec], exclude: Iterable[str] = ()) -> list[TableSpec]:
+    """Fold each returns spec into its sales spec so both come from one dsdgen pass.
+
+    Only Parquet (or only Delta) specs with the same dataset root are paired; the returns
+    spec's numPartitions becomes the number of returns files. Pairs with a
+    table in ``exclude`` (e.g. the ``cluster_by`` tables) are left apart.
+    """
+    exclude = set(exclude)
+    plan = list(specs)
+    by_table = {spec.table: spec for spec in plan}
+    paired = {}
+    for sales, returns in SALES_RETURNS.items():
+        sales_spec, returns_spec = by_table.get(sales), by_table.get(returns)
+        if (
+            not {sales, returns} & exclude
+            and sales_spec
+            and returns_spec
+            and sales_spec.file_format == returns_spec.file_format
+            and sales_spec.file_format in ("parquet", "delta")
+            and sales_spec.root_dir == returns_spec.root_dir
+        ):
+            paired[sales] = replace(sales_spec, paired_returns_partitions=returns_spec.num_partitions)
+            paired[returns] = None
+    return [paired.get(spec.table, spec) for spec in plan if paired.get(spec.table, spec) is not None]
+
+
+def describe_plan(specs: Iterable[TableSpec]) -> str:
+    lines = [f"{'table':<24}{'numPartitions':>14}  format   location"]
+    for spec in specs:
+        line = f"{spec.table:<24}{spec.num_partitions:>14}  {spec.file_format:<8} {spec.location}"
+        if spec.paired_table:
+            line += f" (+ {spec.paired_table}, ~{spec.paired_returns_partitions} files)"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+# Hand-tuned so that each Parquet file is roughly 500MB (see the README).
+NUM_PARTITIONS_SF1000 = {
+    **{table: 1000 for table in TABLES},
+    "store_sales": 250,
+    "catalog_returns": 20,
+    "catalog_sales": 200,
+    "customer_address": 1,
+    "customer_demographics": 1,
+    "inventory": 6,
+    "store_returns": 32,
+    "web_returns": 12,
+    "web_sales": 90,
+}
+
+NUM_PARTITIONS_SF100000 = {
+    "store_sales": 25000,
+    "call_center": 10,
+    "catalog_page": 10,
+    "customer_address": 10,
+    "customer_demographics": 10,
+    "date_dim": 10,
+    "household_demographics": 10,
+    "income_band": 10,
+    "item": 10,
+    "promotion": 10,
+    "reason": 10,
+    "ship_mode": 10,
+    "store": 10,
+    "time_dim": 10,
+    "warehouse": 10,
+    "web_page": 10,
+    "web_site": 10,
+    "customer": 5,
+    "inventory": 10,
+    "web_returns": 400,
+    "store_returns": 800,
+    "catalog_returns": 1000,
+    "web_sales": 5000,
+    "catalog_sales": 10000,
+}
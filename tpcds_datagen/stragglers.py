@@ -0,0 +1,88 @@
+"""Spot straggling chunk units and find finer dsdgen chunks that cover them exactly.
+
+dsdgen splits a table into ``-parallel`` children by row number (by order
+number for the sales tables), and every row depends only on its number.
+So child ``k`` of ``N`` holds exactly the rows of children
+``(k-1)*f+1 .. k*f`` of ``N*f`` whenever the boundaries line up, which
+happens when ``f`` divides dsdgen's per-child count. dsdgen does not
+report that count, so :func:`split_factor` compares the first rows of the
+chunks on either side of a boundary instead. A split that passes keeps the
+table row-identical to the original plan; one that does not is never used.
+
+Only the policy lives here; :mod:`.chunks` runs and commits the finer
+chunks, and the local engine and :func:`.chunks.generate_chunks` decide
+when to split.
+"""
+
+from __future__ import annotations
+
+import statistics
+from dataclasses import dataclass, field
+
+from .dsdgen import first_row
+from .spec import GenerationOptions, TableSpec
+
+
+@dataclass
+class StragglerTracker:
+    """Median time per chunk of the units committed so far, per table."""
+
+    factor: float = 2.0
+    min_samples: int = 3
+    seconds_per_chunk: dict[str, list[float]] = field(default_factory=dict)
+
+    def record(self, table: str, seconds: float, chunks: int) -> None:
+        self.seconds_per_chunk.setdefault(table, []).append(seconds / max(1, chunks))
+
+    def expected(self, table: str, chunks: int) -> float | None:
+        """Expected seconds of a unit of ``chunks`` chunks, once enough units committed."""
+        samples = self.seconds_per_chunk.get(table, [])
+        if len(samples) < self.min_samples:
+            return None
+        return statistics.median(samples) * chunks
+
+    def is_straggler(self, table: str, elapsed: float, chunks: int) -> bool:
+        expected = self.expected(table, chunks)
+        return expected is not None and elapsed > self.factor * expected
+
+
+def is_aligned(spec: TableSpec, options: GenerationOptions, children: list[int], factor: int) -> bool:
+    """Whether children ``factor`` times finer cover exactly the rows of ``children``.
+
+    With ``q`` rows per child at ``N`` and ``q'`` at ``N*f``, one boundary
+    other than the table's start or end lines up only if ``q == f*q'``,
+    and then every boundary does. A run of children covering the whole
+    table always lines up.
+    """
+    parallel = spec.num_partitions
+    first, last = children[0], children[-1]
+    if first > 1:
+        child = first
+    elif last < parallel:
+        child = last + 1
+    else:
+        return True
+    coarse = first_row(spec.table, options.scale_factor, parallel, child, options.dsdgen_dir)
+    fine = first_row(spec.table, options.scale_factor, parallel * factor, (child - 1) * factor + 1, options.dsdgen_dir)
+    return bool(coarse) and coarse == fine
+
+
+def split_factor(
+    spec: TableSpec, options: GenerationOptions, children: list[int], cores: int, attempts: int = 4
+) -> int | None:
+    """The largest factor up to ``cores`` finer chunks per unit that lines up, or None.
+
+    At most ``attempts`` factors are tried, from ``cores // len(children)``
+    (at least 2) down; each try costs two dsdgen start-ups.
+    """
+    most = max(2, cores // len(children))
+    for factor in range(most, max(1, most - attempts), -1):
+        if is_aligned(spec, options, children, factor):
+            return factor
+    return None
+
+
+def split_parts(unit: tuple[int, list[int]], factor: int) -> list[tuple[int, int, int]]:
+    """The ``(number, child, index)`` parts of a unit split ``factor`` ways."""
+    number, children = unit
+    return [(number, child, index) for child in children for index in range(1, factor + 1)]
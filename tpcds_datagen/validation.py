@@ -0,0 +1,203 @@
+"""Check generated row counts from Parquet footers, without scanning data.
+
+Every Parquet file records its row count in the footer, so a table's size
+can be summed from a few KB per file. :func:`validate_dataset` reads the
+footers of every table under a dataset root on a thread pool, compares the
+totals with the TPC-DS row counts for the scale factor, and looks for
+missing and duplicated chunks:
+
+* chunks engine tables are checked against their commit log: units
+  without a commit, committed files that are gone or have another size,
+  and data files no commit refers to;
+* genData tables are checked by task number (``part-NNNNN-...``): two
+  files from the same task, or gaps between task numbers.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, Sequence
+
+from .commitlog import ChunkCommit, CommitLog
+from .delta import DeltaLog, is_delta_table
+from .fs import list_data_files, local_path
+from .manifest import MANIFEST_FILE, load_manifest
+from .tables import FIXED_ROW_COUNTS, SALES_RETURNS, SPEC_SCALE_FACTORS, TABLES, row_count
+
+_TASK_NUMBER = re.compile(r"part-(\d+)")
+
+
+def footer_rows(path: str) -> int:
+    """Row count of a Parquet file, from its footer."""
+    import pyarrow.parquet as pq
+
+    return pq.ParquetFile(path).metadata.num_rows
+
+
+def is_exact_row_count(table: str, scale_factor: int) -> bool:
+    """Whether :func:`row_count` is exact for spark-sql-perf's dsdgen runs.
+
+    Fixed tables and the dimension tables and inventory at the published
+    scale factors are. The sales and returns tables depend on the random
+    number of lines per order, and the specification's counts were not
+    generated with spark-sql-perf's ``-RNGSEED 100``.
+    """
+    sales_returns = set(SALES_RETURNS) | set(SALES_RETURNS.values())
+    return table in FIXED_ROW_COUNTS or (scale_factor in SPEC_SCALE_FACTORS and table not in sales_returns)
+
+
+@dataclass
+class TableValidation:
+    table: str
+    files: int
+    rows: int
+    expected_rows: int
+    exact: bool
+    tolerance: float  # allowed relative deviation when the expected count is not exact
+    missing: list[str] = field(default_factory=list)  # units, committed files or task numbers without a file
+    duplicates: list[str] = field(default_factory=list)  # files no commit refers to, or a task's second file
+
+    @property
+    def deviation(self) -> float:
+        return (self.rows - self.expected_rows) / self.expected_rows if self.expected_rows else 0.0
+
+    @property
+    def rows_ok(self) -> bool:
+        return self.rows == self.expected_rows if self.exact else abs(self.deviation) <= self.tolerance
+
+    @property
+    def ok(self) -> bool:
+        return self.rows_ok and not self.missing and not self.duplicates
+
+
+def _commit_log_of(root_dir: str, table: str, cache: dict) -> tuple[str, dict, list[ChunkCommit]] | None:
+    """Location, plan and commits of the log that lists ``table``'s files.
+
+    That is the table's own log, or its sales table's for a returns table
+    generated from the same dsdgen pass.
+    """
+    for location in [table] + [sales for sales, returns in SALES_RETURNS.items() if returns == table]:
+        if location not in cache:
+            log = CommitLog(f"{root_dir}/{location}")
+            plan = log.load_plan()
+            cache[location] = (plan, log.commits() if plan is not None else [])
+        plan, commits = cache[location]
+        if plan is not None and (location == table or any(f.table == table for c in commits for f in c.files)):
+            return location, plan, commits
+    return None
+
+
+def _check_commits(
+    root_dir: str, table: str, location: str, plan: dict, commits: list[ChunkCommit], files: dict[str, int]
+) -> tuple[list[str], list[str]]:
+    committed = {c.number for c in commits}
+    missing = []
+    if location == table:  # a paired returns table reports only its own files
+        missing = [f"unit {n} (children {children})" for n, children in enumerate(plan["units"], 1) if n not in committed]
+    referenced = set()
+    for commit in commits:
+        for output in commit.files:
+            if output.table != table:
+                continue
+            path = local_path(f"{root_dir}/{output.path}")
+            referenced.add(path)
+            if files.get(path) != output.bytes:
+                missing.append(f"{output.path} (committed by {location} unit {commit.number})")
+    duplicates = [os.path.relpath(path, local_path(root_dir)) for path in files if path not in referenced]
+    return missing, duplicates
+
+
+def _check_task_numbers(root_dir: str, files: dict[str, int]) -> tuple[list[str], list[str]]:
+    by_task = defaultdict(list)
+    for path in files:
+        match = _TASK_NUMBER.match(os.path.basename(path))
+        if match:
+            by_task[(os.path.dirname(path), int(match.group(1)))].append(path)
+    duplicates = [
+        os.path.relpath(path, local_path(root_dir)) for paths in by_task.values() if len(paths) > 1 for path in paths[1:]
+    ]
+    missing = []
+    directories = {directory for directory, _ in by_task}
+    if len(directories) == 1:  # partitioned tables need not have a file of every task in every partition
+        numbers = {number for _, number in by_task}
+        missing = [f"task {n}" for n in range(min(numbers), max(numbers)) if n not in numbers]
+    return missing, duplicates
+
+
+def table_files(root_dir: str, table: str, from_manifest: bool = True) -> dict[str, int]:
+    """Local path and size of every data file of ``table``, from its manifest if complete, else by listing.
+
+    A Delta table without a complete manifest is read from its Delta log
+    instead of listed: files a rewrite removed stay on disk until VACUUM
+    but are no longer part of the table.
+    """
+    manifest = load_manifest(f"{root_dir}/{table}/{MANIFEST_FILE}") if from_manifest else None
+    if manifest is None or not manifest["complete"]:
+        if is_delta_table(root_dir, table):
+            delta_log = DeltaLog(f"{root_dir}/{table}")
+            delta_log.update()
+            return {local_path(f"{root_dir}/{table}/{path}"): add["size"] for path, add in sorted(delta_log.files.items())}
+        return dict(list_data_files(f"{root_dir}/{table}"))
+    return {local_path(f"{root_dir}/{f['path']}"): f["bytes"] for f in manifest["files"]}
+
+
+def validate_dataset(
+    root_dir: str,
+    scale_factor: int,
+    tables: Sequence[str] = TABLES,
+    tolerance: float = 0.01,
+    workers: int = 32,
+    from_manifest: bool = False,
+) -> list[TableValidation]:
+    """Footer row counts, expected row counts and missing/duplicated chunks of every table under ``root_dir``.
+
+    Only Parquet files are supported. A table without files is reported
+    with 0 rows. With ``from_manifest`` the files of tables with a complete
+    manifest are taken from it instead of listing their directories; files
+    no commit refers to are not found then.
+    """
+    listing = {table: table_files(root_dir, table, from_manifest) for table in tables}
+    paths = [path for files in listing.values() for path in files]
+    if not all(path.endswith(".parquet") for path in paths):
+        raise ValueError(f"{root_dir}: only Parquet datasets can be validated from footers")
+    with ThreadPoolExecutor(workers) as pool:
+        rows = dict(zip(paths, pool.map(footer_rows, paths)))
+    results = []
+    commit_logs = {}
+    for table, files in listing.items():
+        log = _commit_log_of(root_dir, table, commit_logs)
+        if log is not None:
+            missing, duplicates = _check_commits(root_dir, table, *log, files)
+        else:
+            missing, duplicates = _check_task_numbers(root_dir, files) if files else ([], [])
+        results.append(
+            TableValidation(
+                table,
+                len(files),
+                sum(rows[path] for path in files),
+                row_count(table, scale_factor),
+                is_exact_row_count(table, scale_factor),
+                tolerance,
+                missing,
+                duplicates,
+            )
+        )
+    return results
+
+
+def describe_validation(results: Iterable[TableValidation]) -> str:
+    lines = [f"{'table':<24}{'files':>8}{'rows':>18}{'expected':>18}{'diff':>10}  result"]
+    problems = []
+    for r in results:
+        expected = f"{r.expected_rows:,}" if r.exact else f"~{r.expected_rows:,}"
+        verdict = "ok" if r.ok else "FAILED"
+        if not r.rows_ok:
+            verdict += " (row count)"
+        lines.append(f"{r.table:<24}{r.files:>8}{r.rows:>18,}{expected:>18}{r.deviation:>10.2%}  {verdict}")
+        problems += [f"{r.table}: missing {m}" for m in r.missing[:20]]
+        problems += [f"{r.table}: duplicate or uncommitted {d}" for d in r.duplicates[:20]]
+    return "\n".join(lines + problems)
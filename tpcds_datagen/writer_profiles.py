@@ -0,0 +1,131 @@
+"""Per-table Parquet writer settings: codec, row group and page size, dictionary encoding.
+
+One codec and the writer defaults are a poor fit for all 24 tables: the
+wide fact tables hold nearly all the bytes at 100TB and compress much
+better with zstd, ``store_sales`` is scanned by most queries and gains
+from larger row groups, and the low-cardinality string columns of the
+dimension tables (``cd_gender``, ``i_category``, ``d_day_name``, ...)
+are best always dictionary encoded while their high-cardinality ids and
+names are not worth the attempt.
+
+A :class:`WriterProfile` holds those settings for one table;
+``GenerationOptions.writer_profiles`` maps tables to profiles, and
+:func:`tuned_writer_profiles` is a starting point. The chunks and local
+engines apply them in :class:`.convert.ParquetSink`; for genData they are
+turned into the Spark and parquet-mr settings of :func:`spark_conf`.
+``scripts/bench_writer_profiles.py`` compares profiles on size, write
+throughput and scan speed.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from .tables import COLUMNS, FACT_TABLES
+
+# Columns with at most a few thousand distinct values at every scale factor.
+LOW_CARDINALITY_COLUMNS = {
+    "customer": ("c_salutation", "c_preferred_cust_flag", "c_birth_country"),
+    "customer_address": ("ca_street_type", "ca_county", "ca_state", "ca_country", "ca_location_type"),
+    "customer_demographics": ("cd_gender", "cd_marital_status", "cd_education_status", "cd_credit_rating"),
+    "date_dim": (
+        "d_day_name",
+        "d_quarter_name",
+        "d_holiday",
+        "d_weekend",
+        "d_following_holiday",
+        "d_current_day",
+        "d_current_week",
+        "d_current_month",
+        "d_current_quarter",
+        "d_current_year",
+    ),
+    "household_demographics": ("hd_buy_potential",),
+    "item": ("i_brand", "i_class", "i_category", "i_manufact", "i_size", "i_color", "i_units", "i_container"),
+    "promotion": (
+        "p_channel_dmail",
+        "p_channel_email",
+        "p_channel_catalog",
+        "p_channel_tv",
+        "p_channel_radio",
+        "p_channel_press",
+        "p_channel_event",
+        "p_channel_demo",
+        "p_purpose",
+        "p_discount_active",
+    ),
+    "time_dim": ("t_am_pm", "t_shift", "t_sub_shift", "t_meal_time"),
+}
+
+
+@dataclass(frozen=True)
+class WriterProfile:
+    """Parquet writer settings of one table. The defaults are the run's codec and the writer's own settings."""
+
+    codec: str | None = None  # the run's codec if None
+    compression_level: int | None = None  # codec default if None
+    row_group_bytes: int | None = None  # uncompressed Arrow bytes buffered per row group; None: one per parsed block
+    page_bytes: int = 1024 * 1024  # target data page size
+    dictionary: bool | tuple[str, ...] = True  # dictionary-encode every column, none, or only the listed ones
+    dictionary_page_bytes: int = 1024 * 1024  # a column whose dictionary outgrows this falls back to plain encoding
+
+    def __post_init__(self):
+        if self.row_group_bytes is not None and self.row_group_bytes <= 0:
+            raise ValueError(f"row_group_bytes must be positive, got {self.row_group_bytes}")
+
+    def check(self, table: str) -> None:
+        """Fail on dictionary columns ``table`` does not have."""
+        if isinstance(self.dictionary, tuple):
+            unknown = set(self.dictionary) - {name for name, _ in COLUMNS[table]}
+            if unknown:
+                raise ValueError(f"{table} has no columns {sorted(unknown)}")
+
+    def parquet_options(self) -> dict:
+        """Keyword arguments of ``pyarrow.parquet.ParquetWriter``; ``codec`` must be set."""
+        return {
+            "compression": self.codec,
+            "compression_level": self.compression_level,
+            "data_page_size": self.page_bytes,
+            "use_dictionary": list(self.dictionary) if isinstance(self.dictionary, tuple) else self.dictionary,
+            "dictionary_pagesize_limit": self.dictionary_page_bytes,
+        }
+
+
+def tuned_writer_profiles(fact_codec: str = "zstd", store_sales_row_group_bytes: int = 256 * 2**20) -> dict[str, WriterProfile]:
+    """Profiles to start tuning from; tables without one keep the defaults.
+
+    zstd for the fact tables, with larger row groups for ``store_sales``,
+    and dictionary encoding of only the low-cardinality columns of the
+    dimension tables, with room for their dictionaries.
+    """
+    profiles = {table: WriterProfile(codec=fact_codec) for table in FACT_TABLES}
+    profiles["store_sales"] = WriterProfile(codec=fact_codec, row_group_bytes=store_sales_row_group_bytes)
+    for table, columns in LOW_CARDINALITY_COLUMNS.items():
+        profiles[table] = WriterProfile(dictionary=columns, dictionary_page_bytes=4 * 1024 * 1024)
+    return profiles
+
+
+def spark_conf(profile: WriterProfile) -> dict[str, str]:
+    """Spark SQL and parquet-mr settings that make a Spark write follow ``profile``.
+
+    Spark copies its SQL settings into the Hadoop configuration of a write,
+    so they can be set with ``spark.conf.set``. parquet-mr measures row
+    groups by their buffered (encoded) size, not Arrow bytes, reads
+    per-column dictionary settings from version 1.12 on, and takes a
+    compression level for zstd only. Without a codec the session's
+    ``spark.sql.parquet.compression.codec`` is left as it is.
+    """
+    conf = {
+        "parquet.page.size": str(profile.page_bytes),
+        "parquet.dictionary.page.size": str(profile.dictionary_page_bytes),
+        "parquet.enable.dictionary": str(profile.dictionary is True).lower(),
+    }
+    if profile.codec is not None:
+        conf["spark.sql.parquet.compression.codec"] = profile.codec
+    if profile.row_group_bytes is not None:
+        conf["parquet.block.size"] = str(profile.row_group_bytes)
+    if profile.compression_level is not None and profile.codec in (None, "zstd"):
+        conf["parquet.compression.codec.zstd.level"] = str(profile.compression_level)
+    if isinstance(profile.dictionary, tuple):
+        conf.update({f"parquet.enable.dictionary#{column}": "true" for column in profile.dictionary})
+    return conf